@@ -7,6 +7,7 @@
 import json
 import os
 from utils.logger import logger
+from utils.json_io import dumps_json, write_text_atomic
 from config.secret_cipher import decrypt_if_encrypted, encrypt_if_available
 
 # 存于 assistants/current.json 的键（current_assistant 为 data.json 中的 bot_id，如 bot00001）
@@ -45,6 +46,8 @@ class Settings:
         self.bootstrap_file = os.path.normpath(os.path.abspath(bootstrap_file))
         self.gateway_file = os.path.normpath(os.path.join(self._config_dir, "gateway.json"))
         self.system_settings_file = os.path.normpath(os.path.join(self._config_dir, "system_settings.json"))
+        self._last_mtimes = None
+        self._written = {}
         self.config = self._load_default()
         self.load()
 
@@ -105,8 +108,26 @@ class Settings:
                 continue
         return value
 
+    def _file_mtimes(self):
+        """三个配置文件的 st_mtime_ns（不存在为 None），用于判断磁盘上是否有变更。"""
+        mtimes = []
+        for path in (self.bootstrap_file, self.gateway_file, self.system_settings_file):
+            try:
+                mtimes.append(os.stat(path).st_mtime_ns)
+            except OSError:
+                mtimes.append(None)
+        return tuple(mtimes)
+
+    def load_if_changed(self):
+        """仅当配置文件自上次 load/save 后有变更时才重新加载；返回是否重新加载。"""
+        if self._last_mtimes is not None and self._file_mtimes() == self._last_mtimes:
+            return False
+        self.load()
+        return True
+
     def load(self):
         """加载：默认 -> current.json -> config/gateway.json -> config/system_settings.json。"""
+        self._last_mtimes = self._file_mtimes()
         self.config.update(self._load_default())
         bootstrap_loaded = False
         if os.path.exists(self.bootstrap_file):
@@ -143,42 +164,70 @@ class Settings:
                 logger.debug(f"加载 config/system_settings.json 失败: {e}")
         return bootstrap_loaded
 
+    def _write_if_changed(self, path, data, unchanged_on_disk, signature=None):
+        """与本实例上次写入的内容比较，相同且文件未被外部修改时跳过写盘；否则原子写入。
+        signature 缺省为序列化文本；加密项每次密文不同，需传入明文序列化结果作为比较依据。"""
+        text = dumps_json(data)
+        if signature is None:
+            signature = text
+        if unchanged_on_disk and self._written.get(path) == signature:
+            return
+        write_text_atomic(path, text)
+        self._written[path] = signature
+
     def save(self):
-        """保存：current.json；config/gateway.json；config/system_settings.json。"""
+        """保存：current.json；config/gateway.json；config/system_settings.json。内容未变的文件不重写。"""
+        unchanged_on_disk = self._last_mtimes is not None and self._file_mtimes() == self._last_mtimes
         os.makedirs(os.path.dirname(self.bootstrap_file), exist_ok=True)
         bootstrap = {k: self.config.get(k) for k in BOOTSTRAP_KEYS if k in self.config}
         try:
-            with open(self.bootstrap_file, "w", encoding="utf-8") as f:
-                json.dump(bootstrap, f, indent=2, ensure_ascii=False)
+            self._write_if_changed(self.bootstrap_file, bootstrap, unchanged_on_disk)
         except OSError as e:
             logger.error(f"保存 current_assistant 配置失败: {e}")
             raise
         os.makedirs(self._config_dir, exist_ok=True)
+        gateway_plain = {k: self.config[k] for k in GATEWAY_KEYS if k in self.config}
         gateway = {}
-        for k in GATEWAY_KEYS:
-            if k not in self.config:
-                continue
-            v = self.config[k]
+        for k, v in gateway_plain.items():
             if k in GATEWAY_SENSITIVE_KEYS and isinstance(v, str) and v:
                 gateway[k] = encrypt_if_available(v, self._config_dir)
             else:
                 gateway[k] = v
         try:
-            with open(self.gateway_file, "w", encoding="utf-8") as f:
-                json.dump(gateway, f, indent=2, ensure_ascii=False)
+            self._write_if_changed(self.gateway_file, gateway, unchanged_on_disk, signature=dumps_json(gateway_plain))
         except OSError as e:
             logger.error(f"保存 config/gateway.json 失败: {e}")
             raise
         system_settings = {k: self.config[k] for k in SYSTEM_SETTINGS_KEYS if k in self.config}
         try:
-            with open(self.system_settings_file, "w", encoding="utf-8") as f:
-                json.dump(system_settings, f, indent=2, ensure_ascii=False)
+            self._write_if_changed(self.system_settings_file, system_settings, unchanged_on_disk)
         except OSError as e:
             logger.error(f"保存 config/system_settings.json 失败: {e}")
             raise
+        self._last_mtimes = self._file_mtimes()
 
     def get(self, key, default=None):
         return self.config.get(key, default)
 
     def set(self, key, value):
         self.config[key] = value
+
+    def update(self, values=None, **kwargs):
+        """批量写入多项（与 dict.update 相同的参数形式），替代逐项 set。"""
+        if values:
+            self.config.update(values)
+        if kwargs:
+            self.config.update(kwargs)
+
+
+_shared_settings = None
+
+
+def shared_settings():
+    """进程内共享的 Settings，供只读取配置的设置卡片使用：首次创建并加载，之后仅在配置文件变更时重新加载。"""
+    global _shared_settings
+    if _shared_settings is None:
+        _shared_settings = Settings()
+    else:
+        _shared_settings.load_if_changed()
+    return _shared_settings
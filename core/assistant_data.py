@@ -6,6 +6,7 @@ import os
 import time
 from datetime import datetime
 from utils.logger import logger
+from utils.json_io import write_json_atomic
 
 
 # 默认配置常量，供 assistant_data 和 assistant_config 共用
@@ -114,8 +115,7 @@ class AssistantData:
         self._position_dirty = False
         self._state_dirty = False
         try:
-            with open(self.data_path, 'w', encoding='utf-8') as f:
-                json.dump(self.data, f, indent=2, ensure_ascii=False)
+            write_json_atomic(self.data_path, self.data)
         except Exception as e:
             logger.error(f"保存助手数据失败 [{self.assistant_name}]: {e}")
 
@@ -67,8 +67,8 @@ class GatewayClient:
         self._thread = None
         self._connected = False
         self._hello_payload = None
-        # req_id -> (callback, method)；agent 需等多段响应（accepted -> ok/error）再回调
-        self._pending: dict[str, tuple[Callable[[bool, Any, Optional[dict]], None], str]] = {}
+        # req_id -> (callback, method, on_main_thread)；agent 需等多段响应（accepted -> ok/error）再回调
+        self._pending: dict[str, tuple[Callable[[bool, Any, Optional[dict]], None], str, bool]] = {}
         self._event_listeners: list[Callable[[str, Any], None]] = []
         self._on_connected_callbacks: list[Callable[[], None]] = []
         self._on_disconnected_callbacks: list[Callable[[], None]] = []
@@ -95,6 +95,10 @@ class GatewayClient:
         else:
             fn()
 
+    def run_on_main(self, fn: Callable[[], None]) -> None:
+        """在主线程执行 fn；供以 on_main_thread=False 发请求、最后再汇总回调到 UI 的调用方使用。"""
+        self._run_on_main(fn)
+
     def on_event(self, callback: Callable[[str, Any], None]) -> None:
         """注册事件回调，事件在主线程触发。"""
         self._event_listeners.append(callback)
@@ -236,7 +240,7 @@ class GatewayClient:
                                 if not entry:
                                     gateway_logger.debug(f"Gateway 响应无对应 callback: req_id={rid}")
                                     continue
-                                cb, method = entry
+                                cb, method, on_main = entry
                                 if method == METHOD_AGENT:
                                     status = (payload or {}).get("status")
                                     if status == "accepted":
@@ -270,7 +274,13 @@ class GatewayClient:
                                     gateway_logger.info(f"Gateway 响应: req_id={rid} ok={ok}")
                                 else:
                                     gateway_logger.debug(f"Gateway 响应: req_id={rid} ok={ok}")
-                                self._run_on_main(lambda c=cb, o=ok, p=payload, e=error: c(o, p, e))
+                                if on_main:
+                                    self._run_on_main(lambda c=cb, o=ok, p=payload, e=error: c(o, p, e))
+                                    continue
+                                try:
+                                    cb(ok, payload, error)
+                                except Exception as e:
+                                    gateway_logger.exception(f"Gateway 回调异常: req_id={rid} {e}")
                                 continue
                             event_name, event_payload = parse_event_frame(data)
                             if event_name is not None:
@@ -375,10 +385,12 @@ class GatewayClient:
         method: str,
         params: Optional[dict] = None,
         callback: Optional[Callable[[bool, Any, Optional[dict]], None]] = None,
+        on_main_thread: bool = True,
     ) -> Optional[str]:
         """
         发送请求。若提供 callback，则在主线程调用 callback(ok, payload, error)。
-        返回请求 id；若未连接则返回 None。
+        on_main_thread=False 时成功收到的响应直接在 WS 线程回调（不可操作 UI，用于批量请求的计数等轻量逻辑）；
+        未连接、队列满、连接关闭等错误仍经主线程回调。返回请求 id；若未连接则返回 None。
         """
         if not self._ws or not self._connected or not self._loop:
             gateway_logger.warning(f"Gateway call 未连接，method={method}")
@@ -394,7 +406,7 @@ class GatewayClient:
             return None
         req_id, frame = build_request_frame(method, params or {})
         if callback:
-            self._pending[req_id] = (callback, method)
+            self._pending[req_id] = (callback, method, on_main_thread)
         if method != "health":
             gateway_logger.info(f"Gateway 请求: method={method} req_id={req_id}")
         else:
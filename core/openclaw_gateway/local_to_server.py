@@ -2,6 +2,7 @@
 本地 -> 服务端：统一封装与 Gateway 的请求发送。
 - 聊天发送、参数发送、参数修改等均由本模块对外提供，便于维护与日志追踪。
 """
+import threading
 import uuid
 from typing import Callable, Any, Optional
 
@@ -348,6 +349,66 @@ def send_cron_remove(
     return req_id
 
 
+def send_cron_remove_many(
+    client,
+    job_ids: list,
+    callback: Optional[Callable[[bool, Any, Optional[dict]], None]] = None,
+    max_batch: int = 50,
+) -> int:
+    """
+    批量删除定时任务：每批最多 max_batch 个 cron.remove 连续发出、不逐个等待往返，上一批全部返回后再发下一批
+    （Gateway 协议无批量帧，且客户端发送队列有上限）。逐条响应在 WS 线程计数，不逐条切回主线程；
+    全部结束后在主线程回调一次：callback(ok, {"removed": [...], "failed": [...]}, error)，ok 表示全部成功。
+    返回待删除的 id 数。
+    """
+    ids = [jid for jid in ((j or "").strip() for j in (job_ids or [])) if jid]
+    removed, failed = [], []
+    if not ids:
+        if callback:
+            callback(True, {"removed": removed, "failed": failed}, None)
+        return 0
+    if not client or not getattr(client, "call", None):
+        if callback:
+            callback(False, {"removed": removed, "failed": ids}, {"message": "Gateway 客户端不可用"})
+        return len(ids)
+    batch = max(1, int(max_batch))
+    last_error = [None]
+    # 成功响应在 WS 线程回调，未连接/繁忙/断开等错误经主线程回调，计数与结果列表需加锁
+    lock = threading.Lock()
+
+    def send_chunk(start):
+        chunk = ids[start:start + batch]
+        waiting = [len(chunk)]
+
+        def on_one(jid):
+            def _cb(ok, _payload, error):
+                with lock:
+                    if ok:
+                        removed.append(jid)
+                    else:
+                        failed.append(jid)
+                        last_error[0] = error
+                    waiting[0] -= 1
+                    if waiting[0] > 0:
+                        return
+                # 本批最后一个响应：在锁外发下一批或回调，避免持锁重入 send_chunk
+                if start + batch < len(ids):
+                    send_chunk(start + batch)
+                elif callback:
+                    result = {"removed": removed, "failed": failed}
+                    client.run_on_main(lambda: callback(not failed, result, last_error[0]))
+            return _cb
+
+        for jid in chunk:
+            req_id = client.call(METHOD_CRON_REMOVE, {"id": jid}, callback=on_one(jid), on_main_thread=False)
+            if req_id:
+                gateway_logger.debug(f"local_to_server: 已发送 cron.remove id={jid} req_id={req_id}")
+
+    gateway_logger.info(f"local_to_server: 批量 cron.remove 共 {len(ids)} 个，每批 {batch}")
+    send_chunk(0)
+    return len(ids)
+
+
 def send_cron_run(
     client,
     job_id: str,
@@ -101,7 +101,7 @@ def main():
         from PyQt5.QtCore import Qt, QTimer, qInstallMessageHandler, QObject, pyqtSignal
         from ui.assistant_window import AssistantWindow
         from ui.startup_dialog import StartupDialog
-        from ui.ui_settings_loader import get_ui_setting, set_ui_setting_and_save
+        from ui.ui_settings_loader import get_ui_setting, set_ui_setting_and_save, flush_ui_settings
         from utils.platform_adapter import get_device_name
         from core.openclaw_gateway.client import GatewayClient
 
@@ -140,6 +140,7 @@ def main():
 
         def _on_quit():
             """退出时保存配置与助手数据，不依赖 finally + SystemExit。"""
+            flush_ui_settings()
             try:
                 if assistant_manager and assistant_manager.current_assistant_name:
                     if settings:
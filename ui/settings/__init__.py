@@ -4,7 +4,6 @@
 - Gateway 与主题由独立窗口/卡片提供（GatewaySettingsWindow / theme_settings）
 """
 from ui.settings.settings_window import SettingsWindow
-from ui.settings.clear_cache_window import ClearCacheWindow
 from ui.settings.chat_settings import create_chat_card
 
 __all__ = [
@@ -12,3 +11,11 @@ __all__ = [
     "ClearCacheWindow",
     "create_chat_card",
 ]
+
+
+def __getattr__(name):
+    # ClearCacheWindow 按需导入，避免导入本包时就加载清除缓存窗口模块
+    if name == "ClearCacheWindow":
+        from ui.settings.clear_cache_window import ClearCacheWindow
+        return ClearCacheWindow
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
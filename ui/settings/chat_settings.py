@@ -2,7 +2,7 @@
 聊天相关设置卡片：文字大小（作用于聊天与会话列表）、弹窗大小（斜杠补全等）。
 """
 from PyQt5.QtWidgets import QGroupBox, QVBoxLayout, QFormLayout, QLabel
-from config.settings import Settings
+from config.settings import shared_settings
 from ui.settings.form_controls import ManualOnlySpinBox, NoWheelComboBox
 from ui.ui_settings_loader import get_ui_setting
 from utils.i18n import t
@@ -46,8 +46,7 @@ def create_chat_card():
     创建「聊天」设置卡片（仅文字大小）。
     返回 (QGroupBox, get_values_func)。
     """
-    settings = Settings()
-    settings.load()
+    settings = shared_settings()
 
     g = QGroupBox(t("chat_card"))
     g.setStyleSheet(_card_style())
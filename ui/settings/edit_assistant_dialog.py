@@ -17,6 +17,7 @@ from utils.logger import logger
 from utils.i18n import t
 from utils.platform_adapter import ui_font_family, ui_font_size_body, ui_window_bg
 from core.assistant_data import DEFAULT_STATE_TO_SPRITE_FOLDER
+from utils.sprite_utils import copy_file_replace
 from ui.ui_settings_loader import get_ui_setting
 from ui.settings.add_assistant_dialog import (
     SPRITE_STATE_KEYS,
@@ -262,7 +263,8 @@ class EditAssistantDialog(QDialog):
                     os.makedirs(state_dir, exist_ok=True)
                     for src_path, target_name in files:
                         dst = os.path.join(state_dir, target_name)
-                        shutil.copy2(src_path, dst)
+                        # 临时文件 + 替换：dst 可能是旧版本留下的硬链接，不能经由链接改写共享内容
+                        copy_file_replace(src_path, dst)
                     logger.debug(f"更新表情: {state_key} -> {len(files)} 张")
 
             with open(data_path, "w", encoding="utf-8") as f:
@@ -3,6 +3,7 @@
 供 settings_window、chat_settings 等复用。
 """
 from PyQt5.QtWidgets import QSpinBox, QDoubleSpinBox, QComboBox
+from PyQt5.QtGui import QStandardItem, QStandardItemModel
 from PyQt5.QtCore import Qt
 
 
@@ -43,3 +44,20 @@ class NoWheelComboBox(QComboBox):
 
     def wheelEvent(self, e):
         e.ignore()
+
+    def set_items(self, items, current_data=None):
+        """一次性填充静态选项 [(label, data), ...]：整列插入新 model，避免逐条 addItem 触发的行插入信号。
+        current_data 命中时选中对应项，否则选中第一项。"""
+        model = QStandardItemModel(self)
+        column = []
+        for label, data in items:
+            item = QStandardItem(label)
+            item.setData(data, Qt.UserRole)
+            column.append(item)
+        model.appendColumn(column)
+        blocked = self.blockSignals(True)
+        try:
+            self.setModel(model)
+            self.setCurrentIndex(max(0, self.findData(current_data)))
+        finally:
+            self.blockSignals(blocked)
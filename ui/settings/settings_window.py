@@ -3,6 +3,12 @@
 信息架构：API 与模型（独立界面入口）、行为与优化、数据与缓存
 界面风格：简洁专业、卡片式分组、统一按钮样式
 """
+import functools
+import importlib.util
+import os
+import string
+import sys
+import time
 from PyQt5.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QScrollArea, QFormLayout,
     QPushButton, QGroupBox, QCheckBox, QSpinBox, QDoubleSpinBox,
@@ -17,71 +23,173 @@ from utils.async_runner import run_in_thread
 from ui.settings.chat_settings import create_chat_card
 from ui.settings.form_controls import ManualOnlySpinBox, ManualOnlyDoubleSpinBox, NoWheelComboBox
 from ui.ui_settings_loader import get_ui_setting, set_ui_setting_and_save, save_ui_settings_geometry
-from utils.i18n import t, get_locale, invalidate_locale_cache
+from utils.i18n import t, translator, get_locale, invalidate_locale_cache
 
 
-def _card_style():
-    c = get_ui_setting("settings_window.card") or {}
-    return """
-        QGroupBox {
+# 项目根目录（ui/settings/ 上两级），模块加载时解析一次
+_BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@functools.lru_cache(maxsize=4)
+def _resolve_assistants_dir(assistants_dir):
+    """assistants_dir 配置值 -> 规范化绝对路径。"""
+    return os.path.normpath(os.path.join(_BASE_DIR, assistants_dir))
+
+
+def _form_layout(parent=None):
+    """卡片内表单：固定换行与字段伸展策略，避免随平台样式推导并在逐行添加时反复重排。"""
+    fl = QFormLayout(parent) if parent is not None else QFormLayout()
+    fl.setRowWrapPolicy(QFormLayout.DontWrapRows)
+    fl.setFieldGrowthPolicy(QFormLayout.AllNonFixedFieldsGrow)
+    return fl
+
+
+def _lazy_module(name):
+    """返回延迟加载的模块代理：首次访问属性时才真正执行模块，之后与普通模块无异。"""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    spec = importlib.util.find_spec(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+# 子窗口模块：导入时只登记代理，打开对应窗口时才加载
+_gateway_settings_mod = _lazy_module("ui.settings.gateway_settings_window")
+_log_tail_mod = _lazy_module("ui.settings.log_tail_window")
+_add_assistant_mod = _lazy_module("ui.settings.add_assistant_dialog")
+_edit_assistant_mod = _lazy_module("ui.settings.edit_assistant_dialog")
+_clear_cache_mod = _lazy_module("ui.settings.clear_cache_window")
+
+
+_CARD_CSS_TEMPLATE = """
+        QGroupBox {{
             font-weight: 500;
-            border: %s;
-            border-radius: %dpx;
-            margin-top: %dpx;
-            padding: %s;
+            border: {border};
+            border-radius: {border_radius_px}px;
+            margin-top: {margin_top_px}px;
+            padding: {padding};
             background: #ffffff;
-        }
-        QGroupBox::title {
+        }}
+        QGroupBox::title {{
             subcontrol-origin: margin;
             subcontrol-position: top left;
             left: 14px;
             padding: 0 8px;
             background: transparent;
-            color: %s;
-            font-size: %dpx;
-        }
-    """ % (
-        c.get("border", "1px solid #e5e7eb"),
-        int(c.get("border_radius_px", 10)),
-        int(c.get("margin_top_px", 12)),
-        c.get("padding", "16px 14px 10px 14px"),
-        c.get("title_color", "#374151"),
-        int(c.get("title_font_size_px", 13)),
-    )
-
-
-def _primary_btn():
-    b = get_ui_setting("settings_window.button.primary") or {}
-    return """
-        QPushButton {
-            background: %s;
+            color: {title_color};
+            font-size: {title_font_size_px}px;
+        }}
+    """
+_CARD_CSS_VALUES = {
+    "border": "1px solid #e5e7eb",
+    "border_radius_px": 10,
+    "margin_top_px": 12,
+    "padding": "16px 14px 10px 14px",
+    "title_color": "#374151",
+    "title_font_size_px": 13,
+}
+
+_PRIMARY_BTN_CSS_TEMPLATE = """
+        QPushButton {{
+            background: {background};
             color: white;
             border: none;
-            border-radius: %dpx;
+            border-radius: {border_radius_px}px;
             padding: 10px 20px;
             font-weight: 500;
             min-height: 20px;
-        }
-        QPushButton:hover { background: #1d4ed8; }
-        QPushButton:pressed { background: #1e40af; }
-    """ % (b.get("background", "#2563eb"), int(b.get("border_radius_px", 8)))
-
-
-def _secondary_btn():
-    b = get_ui_setting("settings_window.button.secondary") or {}
-    return """
-        QPushButton {
-            background: %s;
+        }}
+        QPushButton:hover {{ background: #1d4ed8; }}
+        QPushButton:pressed {{ background: #1e40af; }}
+    """
+_PRIMARY_BTN_CSS_VALUES = {"background": "#2563eb", "border_radius_px": 8}
+
+_SECONDARY_BTN_CSS_TEMPLATE = """
+        QPushButton {{
+            background: {background};
             color: #374151;
-            border: %s;
-            border-radius: %dpx;
+            border: {border};
+            border-radius: {border_radius_px}px;
             padding: 10px 20px;
             font-weight: 500;
             min-height: 20px;
-        }
-        QPushButton:hover { background: #e5e7eb; }
-        QPushButton:pressed { background: #d1d5db; }
-    """ % (b.get("background", "#f3f4f6"), b.get("border", "1px solid #e5e7eb"), int(b.get("border_radius_px", 8)))
+        }}
+        QPushButton:hover {{ background: #e5e7eb; }}
+        QPushButton:pressed {{ background: #d1d5db; }}
+    """
+_SECONDARY_BTN_CSS_VALUES = {"background": "#f3f4f6", "border": "1px solid #e5e7eb", "border_radius_px": 8}
+
+
+def _render_css(template, defaults, override=None):
+    """用 defaults + override 填充样式模板；*_px 项按整数输出。"""
+    values = dict(defaults)
+    if override:
+        values.update(override)
+    for k in values:
+        if k.endswith("_px"):
+            values[k] = int(values[k])
+    return template.format_map(values)
+
+
+# 默认样式在模块加载时构建一次；仅当 ui_settings.json 覆盖了对应项时才重新拼接
+_CARD_CSS_DEFAULT = _render_css(_CARD_CSS_TEMPLATE, _CARD_CSS_VALUES)
+_PRIMARY_BTN_CSS_DEFAULT = _render_css(_PRIMARY_BTN_CSS_TEMPLATE, _PRIMARY_BTN_CSS_VALUES)
+_SECONDARY_BTN_CSS_DEFAULT = _render_css(_SECONDARY_BTN_CSS_TEMPLATE, _SECONDARY_BTN_CSS_VALUES)
+
+
+def _card_style():
+    c = get_ui_setting("settings_window.card")
+    if not c or c == _CARD_CSS_VALUES:
+        return _CARD_CSS_DEFAULT
+    return _render_css(_CARD_CSS_TEMPLATE, _CARD_CSS_VALUES, c)
+
+
+def _primary_btn():
+    b = get_ui_setting("settings_window.button.primary")
+    if not b or b == _PRIMARY_BTN_CSS_VALUES:
+        return _PRIMARY_BTN_CSS_DEFAULT
+    return _render_css(_PRIMARY_BTN_CSS_TEMPLATE, _PRIMARY_BTN_CSS_VALUES, b)
+
+
+def _secondary_btn():
+    b = get_ui_setting("settings_window.button.secondary")
+    if not b or b == _SECONDARY_BTN_CSS_VALUES:
+        return _SECONDARY_BTN_CSS_DEFAULT
+    return _render_css(_SECONDARY_BTN_CSS_TEMPLATE, _SECONDARY_BTN_CSS_VALUES, b)
+
+
+_WINDOW_QSS_TEMPLATE = string.Template("""
+            QMainWindow {
+                font-family: '$ff';
+                font-size: ${fs}px;
+                background: $bg;
+            }
+            $card_css
+            QSpinBox, QDoubleSpinBox, QLineEdit, QComboBox {
+                padding: $pad;
+                border: $border;
+                border-radius: ${brad}px;
+                background: #fafafa;
+                min-height: ${mh}px;
+            }
+        """)
+
+
+@functools.lru_cache(maxsize=4)
+def _window_qss(ff, fs, bg, card_css, pad, border, brad, mh):
+    """窗口级 QSS；参数不变时重复打开直接复用同一字符串。"""
+    return _WINDOW_QSS_TEMPLATE.substitute(
+        ff=ff, fs=fs, bg=bg, card_css=card_css, pad=pad, border=border, brad=brad, mh=mh,
+    )
+
+
+# 勾选自动交互时预取的 Gateway 会话列表有效期（秒），超时则保存时在后台重新校验
+_GATEWAY_KEYS_CACHE_TTL_SEC = 5.0
 
 
 class SettingsWindow(QMainWindow):
@@ -89,13 +197,16 @@ class SettingsWindow(QMainWindow):
 
     def __init__(self, assistant_window=None, gateway_client=None):
         super().__init__()
+        tr = translator()  # 本次构建期间 locale 只解析一次
         self.assistant_window = assistant_window
+        # assistant_manager 在主窗口生命周期内不变，缓存引用避免各处重复 getattr
+        self._am = getattr(assistant_window, "assistant_manager", None) if assistant_window else None
         self.gateway_client = gateway_client if gateway_client is not None else (getattr(assistant_window, "gateway_client", None) if assistant_window else None)
         # 使用主窗口传入的 Settings 实例，保证与主进程同一份配置并正确持久化；无则新建
         self.settings = getattr(assistant_window, "settings", None) if assistant_window else None
         if self.settings is None:
             self.settings = Settings()
-        self.setWindowTitle(t("settings_title"))
+        self.setWindowTitle(tr("settings_title"))
         geom = get_ui_setting("settings_window.geometry") or {}
         self.setGeometry(
             int(geom.get("x", 400)),
@@ -107,22 +218,16 @@ class SettingsWindow(QMainWindow):
         self._geometry_save_timer = None
         if is_macos():
             self.setUnifiedTitleAndToolBarOnMac(True)
-        ff, fs, bg = ui_font_family(), ui_font_size_body(), ui_window_bg()
-        self.setStyleSheet(f"""
-            QMainWindow {{
-                font-family: '{ff}';
-                font-size: {fs}px;
-                background: {bg};
-            }}
-            {_card_style()}
-            QSpinBox, QDoubleSpinBox, QLineEdit, QComboBox {{
-                padding: {get_ui_setting("settings_window.form_control.padding") or "6px 10px"};
-                border: {get_ui_setting("settings_window.form_control.border") or "1px solid #e5e7eb"};
-                border-radius: {int(get_ui_setting("settings_window.form_control.border_radius_px") or 6)}px;
-                background: #fafafa;
-                min-height: {int(get_ui_setting("settings_window.form_control.min_height_px") or 20)}px;
-            }}
-        """)
+        # 构建期间暂停重绘，所有卡片加入后统一布局一次
+        self.setUpdatesEnabled(False)
+        fc = get_ui_setting("settings_window.form_control") or {}
+        self.setStyleSheet(_window_qss(
+            ui_font_family(), ui_font_size_body(), ui_window_bg(), _card_style(),
+            fc.get("padding") or "6px 10px",
+            fc.get("border") or "1px solid #e5e7eb",
+            int(fc.get("border_radius_px") or 6),
+            int(fc.get("min_height_px") or 20),
+        ))
 
         central = QWidget()
         self.setCentralWidget(central)
@@ -131,7 +236,7 @@ class SettingsWindow(QMainWindow):
         main_layout.setContentsMargins(24, 24, 24, 24)
 
         # 标题
-        title = QLabel(t("settings_title"))
+        title = QLabel(tr("settings_title"))
         tt = get_ui_setting("settings_window.title") or {}
         title.setStyleSheet(
             "font-size: %dpx; font-weight: %d; color: %s;"
@@ -149,34 +254,34 @@ class SettingsWindow(QMainWindow):
         content_layout.setSpacing(16)
 
         # ---------- 卡片：通用（语言） ----------
-        g_lang = QGroupBox(t("general_card"))
+        g_lang = QGroupBox(tr("general_card"))
         lang_layout = QVBoxLayout(g_lang)
-        fl_lang = QFormLayout()
+        fl_lang = _form_layout()
         self.locale_combo = NoWheelComboBox()
-        self.locale_combo.addItem(t("language_zh"), "zh")
-        self.locale_combo.addItem(t("language_en"), "en")
         loc = (self.settings.get("locale") or "zh").strip().lower()
-        idx = self.locale_combo.findData("en" if loc == "en" else "zh")
-        self.locale_combo.setCurrentIndex(max(0, idx))
-        self.locale_combo.setToolTip(t("locale_tooltip"))
-        fl_lang.addRow(t("language_label"), self.locale_combo)
+        self.locale_combo.set_items(
+            ((tr("language_zh"), "zh"), (tr("language_en"), "en")),
+            current_data="en" if loc == "en" else "zh",
+        )
+        self.locale_combo.setToolTip(tr("locale_tooltip"))
+        fl_lang.addRow(tr("language_label"), self.locale_combo)
         lang_layout.addLayout(fl_lang)
         content_layout.addWidget(g_lang)
 
         # ---------- 卡片：Gateway 设置（入口按钮，进入独立页面） ----------
-        g_gateway = QGroupBox(t("connection_card"))
+        g_gateway = QGroupBox(tr("connection_card"))
         gateway_layout = QVBoxLayout(g_gateway)
-        gateway_desc = QLabel(t("gateway_card_desc"))
+        gateway_desc = QLabel(tr("gateway_card_desc"))
         gateway_desc.setStyleSheet("color: #6b7280; font-size: 12px; margin-bottom: 12px;")
         gateway_desc.setWordWrap(True)
         gateway_layout.addWidget(gateway_desc)
-        self.btn_gateway_settings = QPushButton(t("gateway_settings_btn"))
+        self.btn_gateway_settings = QPushButton(tr("gateway_settings_btn"))
         self.btn_gateway_settings.setCursor(Qt.PointingHandCursor)
         self.btn_gateway_settings.setFocusPolicy(Qt.StrongFocus)
         self.btn_gateway_settings.setMinimumHeight(40)
         self.btn_gateway_settings.setStyleSheet(_secondary_btn())
-        self.btn_gateway_settings.setToolTip(t("gateway_settings_tooltip"))
-        self.btn_gateway_settings.clicked.connect(self._on_click_gateway_settings)
+        self.btn_gateway_settings.setToolTip(tr("gateway_settings_tooltip"))
+        self.btn_gateway_settings.clicked.connect(lambda _=False, fn=self._open_gateway_settings: self._defer(fn))
         gateway_layout.addWidget(self.btn_gateway_settings)
         content_layout.addWidget(g_gateway)
 
@@ -185,183 +290,186 @@ class SettingsWindow(QMainWindow):
         content_layout.addWidget(self._chat_card)
 
         # ---------- 卡片：行为与优化 ----------
-        g_other = QGroupBox(t("behavior_card"))
-        fl_other = QFormLayout(g_other)
+        g_other = QGroupBox(tr("behavior_card"))
+        fl_other = _form_layout(g_other)
         fl_other.setSpacing(10)
-        self.auto_interaction_checkbox = QCheckBox(t("auto_interaction"))
+        self.auto_interaction_checkbox = QCheckBox(tr("auto_interaction"))
         self.auto_interaction_checkbox.setChecked(self.settings.get("auto_interaction_enabled", True))
-        self.auto_interaction_checkbox.setToolTip(t("auto_interaction_tooltip"))
+        self.auto_interaction_checkbox.setToolTip(tr("auto_interaction_tooltip"))
+        self._cached_gateway_keys = None
+        self.auto_interaction_checkbox.toggled.connect(self._on_auto_interaction_toggled)
         fl_other.addRow(self.auto_interaction_checkbox)
         self.auto_interaction_interval = ManualOnlySpinBox()
         self.auto_interaction_interval.setMinimum(1)
         self.auto_interaction_interval.setButtonSymbols(QSpinBox.NoButtons)  # 取消右侧上下箭头
-        self.auto_interaction_interval.setSuffix(t("interval_minutes_suffix"))
+        self.auto_interaction_interval.setSuffix(tr("interval_minutes_suffix"))
         self.auto_interaction_interval.setValue(self.settings.get("auto_interaction_interval_minutes", 10))
-        self.auto_interaction_interval.setToolTip(t("interval_tooltip"))
-        fl_other.addRow(t("interaction_interval"), self.auto_interaction_interval)
+        self.auto_interaction_interval.setToolTip(tr("interval_tooltip"))
+        fl_other.addRow(tr("interaction_interval"), self.auto_interaction_interval)
         _cooldown_sec = self.settings.get("auto_interaction_cooldown_sec", 180)
         _cooldown_min = max(1, int(_cooldown_sec) // 60)
         self.auto_interaction_cooldown = ManualOnlySpinBox()
         self.auto_interaction_cooldown.setMinimum(1)
         self.auto_interaction_cooldown.setButtonSymbols(QSpinBox.NoButtons)
-        self.auto_interaction_cooldown.setSuffix(t("interval_minutes_suffix"))
+        self.auto_interaction_cooldown.setSuffix(tr("interval_minutes_suffix"))
         self.auto_interaction_cooldown.setValue(_cooldown_min)
-        self.auto_interaction_cooldown.setToolTip(t("cooldown_tooltip"))
-        fl_other.addRow(t("cooldown_window"), self.auto_interaction_cooldown)
+        self.auto_interaction_cooldown.setToolTip(tr("cooldown_tooltip"))
+        fl_other.addRow(tr("cooldown_window"), self.auto_interaction_cooldown)
         self.auto_interaction_session_edit = QLineEdit()
-        self.auto_interaction_session_edit.setPlaceholderText(t("session_key_placeholder"))
+        self.auto_interaction_session_edit.setPlaceholderText(tr("session_key_placeholder"))
         self.auto_interaction_session_edit.setText(self.settings.get("auto_interaction_session") or "")
-        self.auto_interaction_session_edit.setToolTip(t("session_key_tooltip"))
-        fl_other.addRow(t("session_key_label"), self.auto_interaction_session_edit)
+        self.auto_interaction_session_edit.setToolTip(tr("session_key_tooltip"))
+        fl_other.addRow(tr("session_key_label"), self.auto_interaction_session_edit)
         content_layout.addWidget(g_other)
 
         # ---------- 卡片：添加助手 ----------
-        g_add_assistant = QGroupBox(t("add_character_btn"))
+        g_add_assistant = QGroupBox(tr("add_character_btn"))
         add_assistant_layout = QVBoxLayout(g_add_assistant)
-        add_assistant_desc = QLabel(t("add_character_tooltip"))
+        add_assistant_desc = QLabel(tr("add_character_tooltip"))
         add_assistant_desc.setStyleSheet("color: #6b7280; font-size: 12px; margin-bottom: 12px;")
         add_assistant_desc.setWordWrap(True)
         add_assistant_layout.addWidget(add_assistant_desc)
-        self.btn_add_character = QPushButton(t("add_character_btn"))
+        self.btn_add_character = QPushButton(tr("add_character_btn"))
         self.btn_add_character.setCursor(Qt.PointingHandCursor)
         self.btn_add_character.setFocusPolicy(Qt.StrongFocus)
         self.btn_add_character.setMinimumHeight(40)
         self.btn_add_character.setStyleSheet(_secondary_btn())
-        self.btn_add_character.setToolTip(t("add_character_tooltip"))
-        self.btn_add_character.clicked.connect(self._on_click_add_character)
+        self.btn_add_character.setToolTip(tr("add_character_tooltip"))
+        self.btn_add_character.clicked.connect(lambda _=False, fn=self._open_add_character: self._defer(fn))
         add_assistant_layout.addWidget(self.btn_add_character)
-        self.btn_edit_assistant = QPushButton(t("edit_assistant_btn"))
+        self.btn_edit_assistant = QPushButton(tr("edit_assistant_btn"))
         self.btn_edit_assistant.setCursor(Qt.PointingHandCursor)
         self.btn_edit_assistant.setFocusPolicy(Qt.StrongFocus)
         self.btn_edit_assistant.setMinimumHeight(40)
         self.btn_edit_assistant.setStyleSheet(_secondary_btn())
-        self.btn_edit_assistant.setToolTip(t("edit_assistant_tooltip"))
-        self.btn_edit_assistant.clicked.connect(self._on_click_edit_assistant)
+        self.btn_edit_assistant.setToolTip(tr("edit_assistant_tooltip"))
+        self.btn_edit_assistant.clicked.connect(lambda _=False, fn=self._open_edit_assistant: self._defer(fn))
         add_assistant_layout.addWidget(self.btn_edit_assistant)
         content_layout.addWidget(g_add_assistant)
 
         # ---------- 卡片：任务管理 ----------
-        g_task = QGroupBox(t("task_manager_menu"))
+        g_task = QGroupBox(tr("task_manager_menu"))
         task_layout = QVBoxLayout(g_task)
-        task_desc = QLabel(t("task_manager_card_desc"))
+        task_desc = QLabel(tr("task_manager_card_desc"))
         task_desc.setStyleSheet("color: #6b7280; font-size: 12px; margin-bottom: 12px;")
         task_desc.setWordWrap(True)
         task_layout.addWidget(task_desc)
-        self.btn_task_manager = QPushButton(t("task_manager_open_btn"))
+        self.btn_task_manager = QPushButton(tr("task_manager_open_btn"))
         self.btn_task_manager.setCursor(Qt.PointingHandCursor)
         self.btn_task_manager.setFocusPolicy(Qt.StrongFocus)
         self.btn_task_manager.setMinimumHeight(40)
         self.btn_task_manager.setStyleSheet(_secondary_btn())
-        self.btn_task_manager.setToolTip(t("task_manager_title"))
-        self.btn_task_manager.clicked.connect(self._on_click_task_manager)
+        self.btn_task_manager.setToolTip(tr("task_manager_title"))
+        self.btn_task_manager.clicked.connect(lambda _=False, fn=self._open_task_manager: self._defer(fn))
         task_layout.addWidget(self.btn_task_manager)
         content_layout.addWidget(g_task)
 
         # ---------- 卡片：助手基础 ----------
-        assistant = assistant_window.assistant_manager.get_current_assistant() if (assistant_window and getattr(assistant_window, "assistant_manager", None)) else None
-        cfg = assistant_window.assistant_manager.get_current_assistant_config() if (assistant_window and getattr(assistant_window, "assistant_manager", None)) else None
-        g_assistant = QGroupBox(t("assistant_card"))
-        fl_assistant = QFormLayout(g_assistant)
+        am = self._am
+        assistant = am.get_current_assistant() if am else None
+        cfg = am.get_current_assistant_config() if am else None
+        g_assistant = QGroupBox(tr("assistant_card"))
+        fl_assistant = _form_layout(g_assistant)
         fl_assistant.setSpacing(10)
         self.assistant_name_edit = QLineEdit()
-        self.assistant_name_edit.setPlaceholderText(t("assistant_name_placeholder"))
+        self.assistant_name_edit.setPlaceholderText(tr("assistant_name_placeholder"))
         self.assistant_name_edit.setText((assistant.data.get("name", "") or "") if assistant and getattr(assistant, "data", None) else "")
-        self.assistant_name_edit.setToolTip(t("assistant_name_tooltip"))
-        fl_assistant.addRow(t("assistant_name_label"), self.assistant_name_edit)
+        self.assistant_name_edit.setToolTip(tr("assistant_name_tooltip"))
+        fl_assistant.addRow(tr("assistant_name_label"), self.assistant_name_edit)
         self.assistant_size_combo = NoWheelComboBox()
-        self.assistant_size_combo.addItems([t("assistant_size_1"), t("assistant_size_2"), t("assistant_size_3")])
+        self.assistant_size_combo.addItems([tr("assistant_size_1"), tr("assistant_size_2"), tr("assistant_size_3")])
         assistant_size_val = int(cfg.get_assistant_size()) if cfg else 2
         self.assistant_size_combo.setCurrentIndex(max(0, min(2, assistant_size_val - 1)))
-        self.assistant_size_combo.setToolTip(t("assistant_size_tooltip"))
-        fl_assistant.addRow(t("assistant_size_label"), self.assistant_size_combo)
+        self.assistant_size_combo.setToolTip(tr("assistant_size_tooltip"))
+        fl_assistant.addRow(tr("assistant_size_label"), self.assistant_size_combo)
         content_layout.addWidget(g_assistant)
 
         # ---------- 卡片：气泡 ----------
-        g_bubble = QGroupBox(t("bubble_card"))
-        fl_bubble = QFormLayout(g_bubble)
+        g_bubble = QGroupBox(tr("bubble_card"))
+        fl_bubble = _form_layout(g_bubble)
         fl_bubble.setSpacing(10)
-        self.bubble_enabled_checkbox = QCheckBox(t("bubble_enabled"))
+        self.bubble_enabled_checkbox = QCheckBox(tr("bubble_enabled"))
         self.bubble_enabled_checkbox.setChecked(bool(cfg.get_bubble_enabled()) if cfg else True)
-        self.bubble_enabled_checkbox.setToolTip(t("bubble_tooltip"))
+        self.bubble_enabled_checkbox.setToolTip(tr("bubble_tooltip"))
         fl_bubble.addRow(self.bubble_enabled_checkbox)
         content_layout.addWidget(g_bubble)
 
         # ---------- 卡片：状态与动画 ----------
         _t = cfg.get_timing if cfg else lambda k, d: d
-        g_anim = QGroupBox(t("anim_card"))
-        fl_anim = QFormLayout(g_anim)
+        g_anim = QGroupBox(tr("anim_card"))
+        fl_anim = _form_layout(g_anim)
         fl_anim.setSpacing(10)
         self.anim_interval_ms = ManualOnlySpinBox()
         self.anim_interval_ms.setMinimum(50)
         self.anim_interval_ms.setMaximum(2000)
         self.anim_interval_ms.setSingleStep(50)
-        self.anim_interval_ms.setSuffix(t("ms_suffix"))
+        self.anim_interval_ms.setSuffix(tr("ms_suffix"))
         self.anim_interval_ms.setValue(int(cfg.get_anim_interval_ms()) if cfg else 100)
-        self.anim_interval_ms.setToolTip(t("anim_interval_tooltip"))
-        fl_anim.addRow(t("anim_interval_label"), self.anim_interval_ms)
+        self.anim_interval_ms.setToolTip(tr("anim_interval_tooltip"))
+        fl_anim.addRow(tr("anim_interval_label"), self.anim_interval_ms)
         self.pause_resume_delay = ManualOnlyDoubleSpinBox()
         self.pause_resume_delay.setMinimum(1.0)
         self.pause_resume_delay.setMaximum(60.0)
         self.pause_resume_delay.setSingleStep(1.0)
-        self.pause_resume_delay.setSuffix(t("seconds_suffix"))
+        self.pause_resume_delay.setSuffix(tr("seconds_suffix"))
         self.pause_resume_delay.setValue(float(cfg.get_pause_resume_delay()) if cfg else 10.0)
-        self.pause_resume_delay.setToolTip(t("pause_resume_tooltip"))
-        fl_anim.addRow(t("pause_resume_label"), self.pause_resume_delay)
+        self.pause_resume_delay.setToolTip(tr("pause_resume_tooltip"))
+        fl_anim.addRow(tr("pause_resume_label"), self.pause_resume_delay)
         self.move_interval = ManualOnlyDoubleSpinBox()
         self.move_interval.setMinimum(0.5)
         self.move_interval.setMaximum(30.0)
         self.move_interval.setSingleStep(0.5)
-        self.move_interval.setSuffix(t("seconds_suffix"))
+        self.move_interval.setSuffix(tr("seconds_suffix"))
         self.move_interval.setValue(float(cfg.get_move_interval()) if cfg else 2.0)
-        self.move_interval.setToolTip(t("move_interval_tooltip"))
-        fl_anim.addRow(t("move_interval_label"), self.move_interval)
+        self.move_interval.setToolTip(tr("move_interval_tooltip"))
+        fl_anim.addRow(tr("move_interval_label"), self.move_interval)
         self.state_hold_sec = ManualOnlySpinBox()
         self.state_hold_sec.setMinimum(5)
         self.state_hold_sec.setMaximum(300)
         self.state_hold_sec.setValue(int(_t("state_hold_sec", 30)))
-        self.state_hold_sec.setSuffix(t("seconds_suffix"))
-        self.state_hold_sec.setToolTip(t("state_hold_tooltip"))
-        fl_anim.addRow(t("state_hold_label"), self.state_hold_sec)
+        self.state_hold_sec.setSuffix(tr("seconds_suffix"))
+        self.state_hold_sec.setToolTip(tr("state_hold_tooltip"))
+        fl_anim.addRow(tr("state_hold_label"), self.state_hold_sec)
         self.happy_after_action_sec = ManualOnlySpinBox()
         self.happy_after_action_sec.setMinimum(10)
         self.happy_after_action_sec.setMaximum(600)
         self.happy_after_action_sec.setValue(int(_t("happy_after_action_sec", 60)))
-        self.happy_after_action_sec.setSuffix(t("seconds_suffix"))
-        self.happy_after_action_sec.setToolTip(t("happy_hold_tooltip"))
-        fl_anim.addRow(t("happy_hold_label"), self.happy_after_action_sec)
+        self.happy_after_action_sec.setSuffix(tr("seconds_suffix"))
+        self.happy_after_action_sec.setToolTip(tr("happy_hold_tooltip"))
+        fl_anim.addRow(tr("happy_hold_label"), self.happy_after_action_sec)
         content_layout.addWidget(g_anim)
 
         # ---------- 卡片：日志 ----------
-        g_logs = QGroupBox(t("logs_card"))
+        g_logs = QGroupBox(tr("logs_card"))
         logs_layout = QVBoxLayout(g_logs)
-        logs_desc = QLabel(t("logs_card_desc"))
+        logs_desc = QLabel(tr("logs_card_desc"))
         logs_desc.setStyleSheet("color: #6b7280; font-size: 12px; margin-bottom: 12px;")
         logs_desc.setWordWrap(True)
         logs_layout.addWidget(logs_desc)
-        self.btn_log_tail = QPushButton(t("logs_tail_btn"))
+        self.btn_log_tail = QPushButton(tr("logs_tail_btn"))
         self.btn_log_tail.setCursor(Qt.PointingHandCursor)
         self.btn_log_tail.setFocusPolicy(Qt.StrongFocus)
         self.btn_log_tail.setMinimumHeight(40)
         self.btn_log_tail.setStyleSheet(_secondary_btn())
-        self.btn_log_tail.setToolTip(t("log_tail_tooltip"))
-        self.btn_log_tail.clicked.connect(self._on_click_log_tail)
+        self.btn_log_tail.setToolTip(tr("log_tail_tooltip"))
+        self.btn_log_tail.clicked.connect(lambda _=False, fn=self._open_log_tail: self._defer(fn))
         logs_layout.addWidget(self.btn_log_tail)
         content_layout.addWidget(g_logs)
 
         # ---------- 卡片：数据与缓存 ----------
-        g_cache = QGroupBox(t("cache_card"))
+        g_cache = QGroupBox(tr("cache_card"))
         cache_layout = QVBoxLayout(g_cache)
-        cache_desc = QLabel(t("cache_card_desc"))
+        cache_desc = QLabel(tr("cache_card_desc"))
         cache_desc.setStyleSheet("color: #6b7280; font-size: 12px; margin-bottom: 12px;")
         cache_desc.setWordWrap(True)
         cache_layout.addWidget(cache_desc)
-        self.btn_clear_cache = QPushButton(t("clear_cache_btn"))
+        self.btn_clear_cache = QPushButton(tr("clear_cache_btn"))
         self.btn_clear_cache.setCursor(Qt.PointingHandCursor)
         self.btn_clear_cache.setFocusPolicy(Qt.StrongFocus)
         self.btn_clear_cache.setMinimumHeight(40)
         self.btn_clear_cache.setStyleSheet(_secondary_btn())
-        self.btn_clear_cache.setToolTip(t("clear_cache_tooltip_btn"))
-        self.btn_clear_cache.clicked.connect(self._on_click_clear_cache)
+        self.btn_clear_cache.setToolTip(tr("clear_cache_tooltip_btn"))
+        self.btn_clear_cache.clicked.connect(lambda _=False, fn=self._open_clear_cache: self._defer(fn))
         cache_layout.addWidget(self.btn_clear_cache)
         content_layout.addWidget(g_cache)
 
@@ -370,11 +478,12 @@ class SettingsWindow(QMainWindow):
         main_layout.addWidget(scroll)
 
         # 底部保存
-        self._save_btn = QPushButton(t("save"))
+        self._save_btn = QPushButton(tr("save"))
         self._save_btn.setCursor(Qt.PointingHandCursor)
         self._save_btn.setStyleSheet(_primary_btn())
         self._save_btn.clicked.connect(self._save)
         main_layout.addWidget(self._save_btn)
+        self.setUpdatesEnabled(True)
 
     def _schedule_save_geometry(self):
         if getattr(self, "_geometry_save_timer", None):
@@ -396,32 +505,54 @@ class SettingsWindow(QMainWindow):
         super().moveEvent(event)
         self._schedule_save_geometry()
 
-    def _get_gateway_session_keys(self):
-        """从 gateway_memory 的 health 结果中收集当前会话列表中的所有 sessionKey。"""
+    @staticmethod
+    def _iter_gateway_session_keys():
+        """逐个产出 gateway_memory 的 health 会话列表中的 sessionKey（已 strip，跳过空值）。"""
         ok, payload, _ = gateway_memory.get_health()
-        keys = set()
         if not ok or not payload:
-            return keys
-        agents = payload.get("agents") or []
-        for a in agents:
-            sessions = (a.get("sessions") or {}).get("recent") or []
-            for r in sessions:
-                k = (r.get("key") or "").strip()
-                if k:
-                    keys.add(k)
-        if not agents and isinstance(payload.get("sessions"), dict):
-            for r in (payload["sessions"].get("recent") or []):
-                k = (r.get("key") or "").strip()
-                if k:
-                    keys.add(k)
-        return keys
+            return
+        agents = payload.get("agents") or ()
+        if agents:
+            recent = (r for a in agents for r in ((a.get("sessions") or {}).get("recent") or ()))
+        elif isinstance(payload.get("sessions"), dict):
+            recent = payload["sessions"].get("recent") or ()
+        else:
+            return
+        for r in recent:
+            k = (r.get("key") or "").strip()
+            if k:
+                yield k
+
+    def _gateway_session_key_exists(self, session_key):
+        """判断 session_key 是否在 Gateway 会话列表中；命中即返回，不构建完整 key 集合。"""
+        return bool(session_key) and any(k == session_key for k in self._iter_gateway_session_keys())
+
+    def _on_auto_interaction_toggled(self, checked):
+        """勾选自动交互时在后台预取会话列表，保存时可直接校验，不再阻塞界面。"""
+        if not checked:
+            return
+        run_in_thread(
+            lambda: frozenset(self._iter_gateway_session_keys()),
+            on_done=self._cache_gateway_keys,
+        )
+
+    def _cache_gateway_keys(self, keys):
+        self._cached_gateway_keys = (time.monotonic(), keys)
+
+    def _fresh_gateway_keys(self):
+        """返回 _GATEWAY_KEYS_CACHE_TTL_SEC 内预取的会话 key 集合；过期或未预取返回 None。"""
+        cached = self._cached_gateway_keys
+        if cached is None or time.monotonic() - cached[0] > _GATEWAY_KEYS_CACHE_TTL_SEC:
+            return None
+        return cached[1]
 
     def _refresh_assistant_form(self):
         """从当前助手与配置刷新「助手基础」「气泡」「状态与动画」表单，编辑/删除助手后调用。"""
-        if not self.assistant_window or not getattr(self.assistant_window, "assistant_manager", None):
+        am = self._am
+        if not am:
             return
-        assistant = self.assistant_window.assistant_manager.get_current_assistant()
-        cfg = self.assistant_window.assistant_manager.get_current_assistant_config()
+        assistant = am.get_current_assistant()
+        cfg = am.get_current_assistant_config()
         if assistant and getattr(assistant, "data", None):
             self.assistant_name_edit.setText((assistant.data.get("name", "") or "").strip())
         if cfg:
@@ -434,14 +565,16 @@ class SettingsWindow(QMainWindow):
             self.state_hold_sec.setValue(int(_t("state_hold_sec", 30)))
             self.happy_after_action_sec.setValue(int(_t("happy_after_action_sec", 60)))
 
+    def _warn_session_invalid(self):
+        QMessageBox.warning(
+            self, t("auto_interaction"),
+            t("auto_interaction_session_invalid"),
+        )
+        self.auto_interaction_checkbox.setChecked(False)
+
     def _save(self):
-        try:
-            self.settings.load()  # 先拉取最新配置，避免覆盖在 API 窗口中保存的 API/模型
-        except Exception as e:
-            logger.exception(f"设置加载失败: {e}")
-            QMessageBox.warning(self, t("save_failed"), t("load_failed_message"))
-            return
         want_auto = self.auto_interaction_checkbox.isChecked()
+        check_session = False
         session_key = (self.auto_interaction_session_edit.text() or "").strip()
         # 勾选自动交互时：必须有 sessionKey 且该 key 在 Gateway 会话列表中，否则不启用
         if want_auto:
@@ -453,24 +586,23 @@ class SettingsWindow(QMainWindow):
                 want_auto = False
                 self.auto_interaction_checkbox.setChecked(False)
             else:
-                valid_keys = self._get_gateway_session_keys()
-                if session_key not in valid_keys:
-                    QMessageBox.warning(
-                        self, t("auto_interaction"),
-                        t("auto_interaction_session_invalid"),
-                    )
+                valid_keys = self._fresh_gateway_keys()
+                if valid_keys is not None and session_key not in valid_keys:
+                    self._warn_session_invalid()
                     want_auto = False
-                    self.auto_interaction_checkbox.setChecked(False)
-        self.settings.set("auto_interaction_enabled", want_auto)
-        self.settings.set("auto_interaction_interval_minutes", self.auto_interaction_interval.value())
-        self.settings.set("auto_interaction_cooldown_sec", max(60, self.auto_interaction_cooldown.value() * 60))
-        self.settings.set("auto_interaction_session", session_key)
-        loc = (self.locale_combo.currentData() or "zh") if getattr(self, "locale_combo", None) else self.settings.get("locale") or "zh"
-        self.settings.set("locale", loc)
+                # 无新鲜预取结果时，由 _save_worker 在后台校验
+                check_session = valid_keys is None
+        values = {
+            "auto_interaction_enabled": want_auto,
+            "auto_interaction_interval_minutes": self.auto_interaction_interval.value(),
+            "auto_interaction_cooldown_sec": max(60, self.auto_interaction_cooldown.value() * 60),
+            "auto_interaction_session": session_key,
+        }
+        if getattr(self, "locale_combo", None):
+            values["locale"] = self.locale_combo.currentData() or "zh"
         if hasattr(self, "_get_chat_values") and callable(self._get_chat_values):
-            for k, v in self._get_chat_values().items():
-                self.settings.set(k, v)
-        assistant = self.assistant_window.assistant_manager.get_current_assistant() if (self.assistant_window and getattr(self.assistant_window, "assistant_manager", None)) else None
+            values.update(self._get_chat_values())
+        assistant = self._am.get_current_assistant() if self._am else None
         if assistant and getattr(assistant, "data", None):
             # 助手基础（系统级参数已迁至 config/system_settings.json，不再写回 data.json app_settings）
             name_text = (self.assistant_name_edit.text() or "").strip()
@@ -490,9 +622,30 @@ class SettingsWindow(QMainWindow):
             if getattr(self, "_save_btn", None):
                 self._save_btn.setEnabled(False)
                 self._save_btn.setText(t("saving"))
+            if check_session:
+                run_in_thread(
+                    lambda: not self._gateway_session_key_exists(session_key),
+                    on_done=lambda invalid: self._apply_and_save(values, invalid),
+                    on_error=lambda e: self._on_save_error(e),
+                )
+            else:
+                self._apply_and_save(values, False)
+        except Exception as e:
+            logger.exception(f"保存启动失败: {e}")
+            self._restore_save_btn()
+            QMessageBox.warning(self, t("save_failed"), t("save_failed"))
+
+    def _apply_and_save(self, values, session_invalid):
+        """主线程：写入共享 settings 后交后台落盘。settings 为全局共享对象，重新加载与写入只在主线程进行。
+        配置文件有外部变更（如 API 窗口已保存）时先重新加载，避免覆盖；load_if_changed 无变更时仅 stat。"""
+        try:
+            if session_invalid:
+                values["auto_interaction_enabled"] = False
+            self.settings.load_if_changed()
+            self.settings.update(values)
             run_in_thread(
                 self._save_worker,
-                on_done=lambda _: self._on_save_done(),
+                on_done=lambda _: self._on_save_done(session_invalid),
                 on_error=lambda e: self._on_save_error(e),
             )
         except Exception as e:
@@ -502,7 +655,7 @@ class SettingsWindow(QMainWindow):
 
     def _save_worker(self):
         """后台执行：助手 data 落盘 + 系统设置落盘；任一步失败则抛异常，由 on_error 弹窗。"""
-        assistant = self.assistant_window.assistant_manager.get_current_assistant() if (self.assistant_window and getattr(self.assistant_window, "assistant_manager", None)) else None
+        assistant = self._am.get_current_assistant() if self._am else None
         if assistant and getattr(assistant, "data", None):
             assistant.save()
         self.settings.save()
@@ -512,10 +665,12 @@ class SettingsWindow(QMainWindow):
             self._save_btn.setEnabled(True)
             self._save_btn.setText(t("save"))
 
-    def _on_save_done(self):
+    def _on_save_done(self, session_invalid=False):
         try:
             invalidate_locale_cache()
             self._restore_save_btn()
+            if session_invalid:
+                self._warn_session_invalid()
             if self.assistant_window:
                 pt = self.settings.get("chat_font_pt")
                 if pt is not None:
@@ -567,14 +722,16 @@ class SettingsWindow(QMainWindow):
         self._restore_save_btn()
         QMessageBox.warning(None, t("save_failed"), t("save_failed"))
 
-    def _on_click_gateway_settings(self):
-        """打开 Gateway 设置独立页面"""
-        QTimer.singleShot(0, self._open_gateway_settings)
+    def _assistants_dir(self):
+        return _resolve_assistants_dir(self.settings.get("assistants_dir", "assistants"))
+
+    def _defer(self, fn):
+        """延迟一帧执行 fn：避免在滚动区内点击被吞掉，各入口按钮共用。"""
+        QTimer.singleShot(0, fn)
 
     def _open_gateway_settings(self):
         try:
-            from ui.settings.gateway_settings_window import GatewaySettingsWindow
-            w = GatewaySettingsWindow(parent=self, assistant_window=self.assistant_window, gateway_client=self.gateway_client)
+            w = _gateway_settings_mod.GatewaySettingsWindow(parent=self, assistant_window=self.assistant_window, gateway_client=self.gateway_client)
             w.setWindowModality(Qt.NonModal)
             w.show()
             w.raise_()
@@ -582,14 +739,9 @@ class SettingsWindow(QMainWindow):
         except Exception as e:
             logger.exception(f"打开 Gateway 设置失败: {e}")
 
-    def _on_click_log_tail(self):
-        """打开日志 tail 窗口"""
-        QTimer.singleShot(0, self._open_log_tail)
-
     def _open_log_tail(self):
         try:
-            from ui.settings.log_tail_window import LogTailWindow
-            w = LogTailWindow(self, gateway_client=self.gateway_client)
+            w = _log_tail_mod.LogTailWindow(self, gateway_client=self.gateway_client)
             w.setWindowModality(Qt.NonModal)
             w.show()
             w.raise_()
@@ -597,47 +749,30 @@ class SettingsWindow(QMainWindow):
         except Exception as e:
             logger.exception(f"打开日志 tail 失败: {e}")
 
-    def _on_click_add_character(self):
-        """打开添加助手弹窗；成功后刷新助手列表。"""
-        QTimer.singleShot(0, self._open_add_character)
-
     def _open_add_character(self):
         try:
-            import os
-            assistants_dir = os.path.normpath(os.path.join(
-                os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
-                self.settings.get("assistants_dir", "assistants"),
-            ))
-            from ui.settings.add_assistant_dialog import AddAssistantDialog
-            dlg = AddAssistantDialog(assistants_dir, parent=self)
+            assistants_dir = self._assistants_dir()
+            dlg = _add_assistant_mod.AddAssistantDialog(assistants_dir, parent=self)
             dlg.setWindowModality(Qt.ApplicationModal)
             if dlg.exec_() == QDialog.Accepted:
-                if self.assistant_window and getattr(self.assistant_window, "assistant_manager", None):
-                    self.assistant_window.assistant_manager.load_all_assistants()
+                if self._am:
+                    self._am.load_all_assistants()
                     logger.info("添加助手后已刷新助手列表")
         except Exception as e:
             logger.exception(f"打开添加助手弹窗失败: {e}")
             QMessageBox.warning(self, t("add_assistant_failed"), str(e))
 
-    def _on_click_edit_assistant(self):
-        QTimer.singleShot(0, self._open_edit_assistant)
-
     def _open_edit_assistant(self):
         try:
-            import os
-            assistants_dir = os.path.normpath(os.path.join(
-                os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
-                self.settings.get("assistants_dir", "assistants"),
-            ))
-            from ui.settings.edit_assistant_dialog import EditAssistantDialog, _list_assistant_folders
-            if not _list_assistant_folders(assistants_dir):
+            assistants_dir = self._assistants_dir()
+            if not _edit_assistant_mod._list_assistant_folders(assistants_dir):
                 QMessageBox.information(self, t("tip_title"), t("edit_assistant_no_assistants"))
                 return
-            dlg = EditAssistantDialog(assistants_dir, parent=self)
+            dlg = _edit_assistant_mod.EditAssistantDialog(assistants_dir, parent=self)
             dlg.setWindowModality(Qt.ApplicationModal)
             if dlg.exec_() == QDialog.Accepted:
-                if self.assistant_window and getattr(self.assistant_window, "assistant_manager", None):
-                    pm = self.assistant_window.assistant_manager
+                if self._am:
+                    pm = self._am
                     pm.load_all_assistants()
                     assistant = pm.get_current_assistant()
                     if assistant and hasattr(assistant, "load"):
@@ -650,9 +785,6 @@ class SettingsWindow(QMainWindow):
             logger.exception(f"打开编辑助手弹窗失败: {e}")
             QMessageBox.warning(self, t("add_assistant_failed"), str(e))
 
-    def _on_click_task_manager(self):
-        QTimer.singleShot(0, self._open_task_manager)
-
     def _open_task_manager(self):
         try:
             if self.assistant_window and hasattr(self.assistant_window, "open_task_manager"):
@@ -663,19 +795,14 @@ class SettingsWindow(QMainWindow):
             logger.exception(f"打开任务管理失败: {e}")
             QMessageBox.warning(self, t("add_assistant_failed"), str(e))
 
-    def _on_click_clear_cache(self):
-        """延迟一帧打开，避免在滚动区内点击被吞掉"""
-        QTimer.singleShot(0, self._open_clear_cache)
-
     def _open_clear_cache(self):
         try:
-            from ui.settings.clear_cache_window import ClearCacheWindow
             bot_id = "bot00001"
-            if self.assistant_window and getattr(self.assistant_window, "assistant_manager", None):
-                assistant = self.assistant_window.assistant_manager.get_current_assistant()
+            if self._am:
+                assistant = self._am.get_current_assistant()
                 if assistant:
                     bot_id = (assistant.get("bot_id") if hasattr(assistant, "get") else getattr(assistant, "assistant_name", None)) or bot_id
-            self._clear_cache_window = ClearCacheWindow(bot_id, self.assistant_window)
+            self._clear_cache_window = _clear_cache_mod.ClearCacheWindow(bot_id, self.assistant_window)
             w = self._clear_cache_window
             w.setWindowModality(Qt.NonModal)
             w.show()
@@ -2,7 +2,7 @@
 主题设置卡片（与 Web UI 的 theme: system / dark / light 对齐）
 """
 from PyQt5.QtWidgets import QGroupBox, QVBoxLayout, QFormLayout, QComboBox, QLabel
-from config.settings import Settings
+from config.settings import shared_settings
 from utils.i18n import t
 
 
@@ -10,8 +10,7 @@ def _theme_options():
     return [(t("theme_follow_system"), "system"), (t("theme_light"), "light"), (t("theme_dark"), "dark")]
 
 
-def _card_style():
-    return """
+_CARD_QSS = """
         QGroupBox {
             font-weight: 500;
             border: 1px solid #e5e7eb;
@@ -37,11 +36,10 @@ def create_theme_card():
     创建「主题」设置卡片。
     返回 (QGroupBox, get_theme_func, set_theme_func)。
     """
-    settings = Settings()
-    settings.load()
+    settings = shared_settings()
 
     g = QGroupBox(t("theme_card"))
-    g.setStyleSheet(_card_style())
+    g.setStyleSheet(_CARD_QSS)
     layout = QVBoxLayout(g)
     desc = QLabel(t("theme_desc"))
     desc.setStyleSheet("color: #6b7280; font-size: 12px; margin-bottom: 12px;")
@@ -55,8 +53,7 @@ def create_theme_card():
     current = (settings.get("theme") or "system").strip().lower()
     if current not in ("system", "light", "dark"):
         current = "system"
-    idx = next((i for i in range(combo.count()) if combo.itemData(i) == current), 0)
-    combo.setCurrentIndex(idx)
+    combo.setCurrentIndex(max(0, combo.findData(current)))
     combo.setToolTip(t("theme_tooltip"))
     fl.addRow(t("theme_label"), combo)
     layout.addLayout(fl)
@@ -68,7 +65,6 @@ def create_theme_card():
         value = (value or "system").strip().lower()
         if value not in ("system", "light", "dark"):
             value = "system"
-        idx = next((i for i in range(combo.count()) if combo.itemData(i) == value), 0)
-        combo.setCurrentIndex(idx)
+        combo.setCurrentIndex(max(0, combo.findData(value)))
 
     return g, get_theme, set_theme
@@ -1,15 +1,24 @@
 """
 聊天气泡组件 - 漫画风格白底黑边 + 左下尖角指向助手，默认 15 秒关闭；支持多屏跟随
 """
+import time
+from functools import lru_cache
+from types import MappingProxyType
+
 from PyQt5.QtCore import Qt, QTimer, QPoint, QPointF, QRect, QRectF, pyqtSignal
-from PyQt5.QtGui import QFont, QPainter, QPainterPath, QColor, QPen, QFontMetrics
+from PyQt5.QtGui import QFont, QPainter, QPainterPath, QPixmap, QColor, QPen, QFontMetrics
 from PyQt5.QtWidgets import QWidget, QLabel, QVBoxLayout, QApplication, QScrollArea, QPushButton, QHBoxLayout
 
 from utils.platform_adapter import ui_bubble_font_family, ui_bubble_font_size
 
 
+@lru_cache(maxsize=1)
 def _bubble_cfg():
-    """从 config/ui_settings.json 读取气泡参数，缺失时用默认。"""
+    """从 config/ui_settings.json 读取气泡参数，缺失时用默认。进程内只解析一次，返回只读映射供各气泡共享。"""
+    return MappingProxyType(_read_bubble_cfg())
+
+
+def _read_bubble_cfg():
     try:
         from ui.ui_settings_loader import get_ui_setting
         sb = get_ui_setting("speech_bubble") or {}
@@ -41,15 +50,37 @@ def _bubble_cfg():
         }
 
 
+# 按坐标查找屏幕结果的缓存时长（秒），仅在 Qt 不支持 QWidget.screen() 时使用
+_SCREEN_CACHE_SEC = 0.2
+
+_CLOSE_BTN_QSS = """
+        QPushButton {
+            background-color: rgba(200, 200, 200, 200);
+            border: 1px solid rgba(100, 100, 100, 200);
+            border-radius: 10px;
+            color: black;
+        }
+        QPushButton:hover {
+            background-color: rgba(255, 100, 100, 255);
+            border: 1px solid rgba(200, 50, 50, 255);
+        }
+    """
+
+
 def _filter_bubble_text(text):
     """过滤气泡框文字：去掉 Markdown 粗体标记「 **」「** 」及成对 **，避免在气泡中显示。"""
     if not text or not isinstance(text, str):
         return text or ""
+    if "**" not in text:
+        return text.strip()
+    return _strip_bold_markers(text)
+
+
+@lru_cache(maxsize=256)
+def _strip_bold_markers(text):
     s = text.replace(" **", "").replace("** ", "")
-    # 去掉首尾或句中成对的 **（粗体包裹）
-    while "**" in s:
-        s = s.replace("**", "", 1)
-    return s.strip()
+    # 去掉首尾或句中成对的 **（粗体包裹）；一次 replace 与逐个删除结果相同
+    return s.replace("**", "").strip()
 
 
 class SpeechBubble(QWidget):
@@ -62,18 +93,24 @@ class SpeechBubble(QWidget):
         self.parent_widget = parent_widget
         self.duration_ms = duration_ms if duration_ms is not None else cfg["default_duration_ms"]
         self.is_showing = False
-        self._hide_timer = None
+        # 自动关闭定时器：单次触发，start() 会自动重启计时
+        self._hide_timer = QTimer(self)
+        self._hide_timer.setSingleShot(True)
+        self._hide_timer.timeout.connect(self._do_hide)
         self.on_hide = on_hide  # 气泡关闭时回调（完事后可用来触发 20 秒切回 walk）
         self._voice_process = None  # 存储语音播放进程，用于停止
-        self._tail_w = cfg["tail_w"]
-        self._tail_h = cfg["tail_h"]
-        self._border_px = cfg["border_px"]
-        self._close_btn = cfg["close_button_size_px"]
-        self._radius_px = cfg["radius_px"]
-        self._gap_above_assistant = cfg["gap_above_assistant_px"]
+        self._cached_path = None  # paintEvent 用的合成路径，按 _cached_size 缓存
+        self._cached_size = None
+        self._chrome_pix = None  # 预渲染的气泡外观，按 _chrome_key (w, h, dpr) 缓存
+        self._chrome_key = None
+        self._last_parent_geo = None  # 上次 _reposition 时的 (px, py, pw, ph, bw, bh)
+        self._cached_screen = None  # 无 QWidget.screen() 时按坐标查到的屏幕，短时缓存
+        self._cached_screen_ts = 0.0
+        # 尾巴/边框/圆角等布局参数统一经共享只读映射访问，不再逐项复制成实例属性
+        self._cfg = cfg
+        border, tail_h, close_btn = cfg["border_px"], cfg["tail_h"], cfg["close_button_size_px"]
         _chars = cfg["chars_per_line"]
-        self._lines_height = cfg["lines_height"]  # 最大显示行数，供 _adjust_height 使用
-        _lines = self._lines_height
+        _lines = cfg["lines_height"]
         _max_w = (max_width if max_width is not None else cfg["max_width_px"])
 
         self.setWindowFlags(Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint | Qt.Tool)
@@ -82,38 +119,27 @@ class SpeechBubble(QWidget):
 
         # 计算宽度和高度（基于字体大小）
         font = QFont(ui_bubble_font_family(), ui_bubble_font_size())
-        fm = QFontMetrics(font)
-        char_width = fm.width("中")  # 使用中文字符宽度
+        fm = self._fm = QFontMetrics(font)  # 与 label 字体一致，_adjust_height 复用，换字体时经 set_font 重建
+        char_width = fm.horizontalAdvance("中")  # 使用中文字符宽度
         line_height = fm.height()
         self.char_width = char_width
         self.line_height = line_height
         # 宽度：N个字 + 左右padding + 边框 + 关闭按钮空间
-        self.bubble_width = min(_max_w, char_width * _chars + 24 + 2 * self._border_px + self._close_btn + 8)
+        self.bubble_width = min(_max_w, char_width * _chars + 24 + 2 * border + close_btn + 8)
         # 最大高度：N行 + 上下padding + 边框 + 尖角 + 关闭按钮空间
-        self.max_bubble_height = line_height * _lines + 20 + 2 * self._border_px + self._tail_h + self._close_btn + 4
-        self.min_bubble_height = line_height * 2 + 20 + 2 * self._border_px + self._tail_h + self._close_btn + 4  # 最少2行
+        self.max_bubble_height = line_height * _lines + 20 + 2 * border + tail_h + close_btn + 4
+        self.min_bubble_height = line_height * 2 + 20 + 2 * border + tail_h + close_btn + 4  # 最少2行
 
         # 主布局（包含内边距，用于绘制边框）
         main_layout = QVBoxLayout(self)
-        main_layout.setContentsMargins(self._border_px, self._border_px, self._border_px, self._border_px + self._tail_h)
+        main_layout.setContentsMargins(border, border, border, border + tail_h)
         main_layout.setSpacing(0)
 
         # 顶部布局：关闭按钮（绝对定位在右上角）
         self.close_button = QPushButton("×", self)
-        self.close_button.setFixedSize(self._close_btn, self._close_btn)
+        self.close_button.setFixedSize(close_btn, close_btn)
         self.close_button.setFont(QFont(ui_bubble_font_family(), ui_bubble_font_size() - 2))
-        self.close_button.setStyleSheet("""
-            QPushButton {
-                background-color: rgba(200, 200, 200, 200);
-                border: 1px solid rgba(100, 100, 100, 200);
-                border-radius: 10px;
-                color: black;
-            }
-            QPushButton:hover {
-                background-color: rgba(255, 100, 100, 255);
-                border: 1px solid rgba(200, 50, 50, 255);
-            }
-        """)
+        self.close_button.setStyleSheet(_CLOSE_BTN_QSS)
         self.close_button.clicked.connect(self._on_close_clicked)
         self.close_button.raise_()  # 确保按钮在最上层
 
@@ -141,46 +167,56 @@ class SpeechBubble(QWidget):
             self.label.setText(_filter_bubble_text(text))
             # 根据内容动态调整高度
             self._adjust_height()
-        if self._hide_timer:
-            self._hide_timer.stop()
         self._reposition()
-        self.show()
-        self.raise_()
+        if not self.isVisible():
+            self.show()
+            self.raise_()
+        else:
+            # 已显示（置顶窗口）时只需按新内容重绘，不再重复 raise_
+            self.update()
         self.is_showing = True
-        if self._hide_timer is None:
-            self._hide_timer = QTimer(self)
-            self._hide_timer.timeout.connect(self._do_hide)
         self._hide_timer.start(self.duration_ms)
     
     def _adjust_height(self):
-        """根据文本内容动态调整气泡高度（PyQt5 无 lineCount，用 boundingRect 算换行行数）"""
+        """根据文本内容动态调整气泡高度（PyQt5 无 lineCount：单段按文字总宽估算行数，含换行时用 boundingRect）"""
         text = self.label.text()
         if not text:
             return
-        fm = QFontMetrics(self.label.font())
-        available_width = self.bubble_width - 2 * self._border_px - self._close_btn - 8 - 16  # 减去padding
+        fm = self._fm
+        cfg = self._cfg
+        border, tail_h, close_btn = cfg["border_px"], cfg["tail_h"], cfg["close_button_size_px"]
+        available_width = self.bubble_width - 2 * border - close_btn - 8 - 16  # 减去padding
         if available_width <= 0:
             available_width = 100
-        rect = fm.boundingRect(QRect(0, 0, available_width, 9999), Qt.TextWordWrap, text)
-        text_lines = max(1, rect.height() // fm.height())
-        # 限制在最小2行和最大 _lines_height 行之间
-        actual_lines = max(2, min(text_lines, self._lines_height))
+        if "\n" in text:
+            rect = fm.boundingRect(QRect(0, 0, available_width, 9999), Qt.TextWordWrap, text)
+            text_lines = max(1, rect.height() // fm.height())
+        else:
+            # 单段文本按总宽度估算行数（向上取整），避免对长文本做完整换行排版
+            text_lines = max(1, -(-fm.horizontalAdvance(text) // available_width))
+        # 限制在最小2行和最大 lines_height 行之间
+        actual_lines = max(2, min(text_lines, cfg["lines_height"]))
         # 计算实际高度
-        actual_height = self.line_height * actual_lines + 20 + 2 * self._border_px + self._tail_h + self._close_btn + 4
+        actual_height = self.line_height * actual_lines + 20 + 2 * border + tail_h + close_btn + 4
         actual_height = max(self.min_bubble_height, min(actual_height, self.max_bubble_height))
         # 设置固定高度
         self.setFixedHeight(actual_height)
         # 更新滚动区域大小
         self.scroll_area.setFixedSize(
-            self.bubble_width - 2 * self._border_px - self._close_btn - 8,
-            actual_height - 2 * self._border_px - self._tail_h - self._close_btn - 4
+            self.bubble_width - 2 * border - close_btn - 8,
+            actual_height - 2 * border - tail_h - close_btn - 4
         )
 
+    def set_font(self, font):
+        """更换气泡文字字体，并同步缓存的 QFontMetrics。"""
+        self.label.setFont(font)
+        self._fm = QFontMetrics(font)
+        self._adjust_height()
+
     def set_duration_ms(self, ms: int):
         """动态设置关闭时长（毫秒），若气泡正在显示则重启关闭定时器。"""
         self.duration_ms = max(1000, int(ms))
-        if self.is_showing and self._hide_timer:
-            self._hide_timer.stop()
+        if self.is_showing:
             self._hide_timer.start(self.duration_ms)
 
     def _reposition(self):
@@ -195,12 +231,17 @@ class SpeechBubble(QWidget):
         pw = self.parent_widget.width()
         ph = self.parent_widget.height()
         bw, bh = self.width(), self.height()
-        # 气泡在助手正上方，紧贴（_gap_above_assistant 像素）
+        # 助手位置与气泡尺寸都未变时，上次的位置仍然有效
+        geo_key = (px, py, pw, ph, bw, bh)
+        if geo_key == self._last_parent_geo:
+            return
+        self._last_parent_geo = geo_key
+        # 气泡在助手正上方，紧贴（gap_above_assistant_px 像素）
         bx = px + (pw - bw) // 2
-        by = py - bh - self._gap_above_assistant
+        by = py - bh - self._cfg["gap_above_assistant_px"]
         # 限制在虚拟桌面内，避免被裁到屏幕外
         try:
-            screen = QApplication.screenAt(QPoint(px + pw // 2, py))
+            screen = self._parent_screen(px + pw // 2, py)
             if screen:
                 geo = screen.availableGeometry()
                 bx = max(geo.x(), min(bx, geo.x() + geo.width() - bw))
@@ -210,15 +251,26 @@ class SpeechBubble(QWidget):
             by = max(0, by)
         self.move(bx, by)
         # 更新关闭按钮位置（右上角）
-        self.close_button.move(bw - self._close_btn - self._border_px - 4, self._border_px + 2)
+        border = self._cfg["border_px"]
+        self.close_button.move(bw - self._cfg["close_button_size_px"] - border - 4, border + 2)
+
+    def _parent_screen(self, x, y):
+        """助手所在屏幕：优先 QWidget.screen()（Qt 5.14+，O(1)）；否则按坐标查找并缓存 _SCREEN_CACHE_SEC。"""
+        screen_fn = getattr(self.parent_widget, "screen", None)
+        if callable(screen_fn):
+            return screen_fn()
+        now = time.monotonic()
+        if self._cached_screen is not None and now - self._cached_screen_ts < _SCREEN_CACHE_SEC:
+            return self._cached_screen
+        self._cached_screen = QApplication.screenAt(QPoint(x, y))
+        self._cached_screen_ts = now
+        return self._cached_screen
 
     def _on_close_clicked(self):
         """关闭按钮点击事件：先立即停止语音，再隐藏气泡，使用户点击 X 后声音马上停"""
         self._stop_voice()
         self.is_showing = False
-        if self._hide_timer:
-            self._hide_timer.stop()
-            self._hide_timer = None
+        self._hide_timer.stop()
         if callable(getattr(self, "on_hide", None)):
             self.on_hide()
         self.hide()
@@ -239,6 +291,7 @@ class SpeechBubble(QWidget):
 
     def _do_hide(self):
         self.is_showing = False
+        self._hide_timer.stop()  # 外部直接调用时，避免定时器之后再触发一次
         self._stop_voice()
         if callable(getattr(self, "on_hide", None)):
             self.on_hide()
@@ -248,34 +301,73 @@ class SpeechBubble(QWidget):
         if self.is_showing and self.isVisible():
             self._reposition()
 
-    def paintEvent(self, event):
-        """自绘：白底、粗黑边、正下方尖角（从助手正上方映出的说话效果）"""
-        w, h = self.width(), self.height()
+    def _bubble_path(self, w, h):
+        """主体圆角矩形 + 底部尖角的合成路径；按 (w, h) 缓存，尺寸变化时才重建。"""
+        if self._cached_path is not None and self._cached_size == (w, h):
+            return self._cached_path
+        cfg = self._cfg
+        border, tail_h = cfg["border_px"], cfg["tail_h"]
         # 主体圆角矩形（不含尖角区域）
-        body = QRectF(self._border_px, self._border_px, w - 2 * self._border_px, h - 2 * self._border_px - self._tail_h)
-        tail_top = body.bottom()
-        cx = body.left() + body.width() / 2
-        # 尖角：底部正中小三角，垂直指向下方（助手头顶）
-        tail_poly = [
-            QPointF(cx - self._tail_w / 2, tail_top),
-            QPointF(cx, tail_top + self._tail_h),
-            QPointF(cx + self._tail_w / 2, tail_top),
-        ]
-
-        path = QPainterPath()
-        path.addRoundedRect(body, self._radius_px, self._radius_px)
-        tail_path = QPainterPath()
-        tail_path.moveTo(tail_poly[0])
-        tail_path.lineTo(tail_poly[1])
-        tail_path.lineTo(tail_poly[2])
-        tail_path.closeSubpath()
-        path = path.united(tail_path)
+        body = QRectF(border, border, w - 2 * border, h - 2 * border - tail_h)
+        left, top, right, bottom = body.left(), body.top(), body.right(), body.bottom()
+        r = min(cfg["radius_px"], body.width() / 2, body.height() / 2)
+        d = 2 * r
+        cx = left + body.width() / 2
+        half_tail = cfg["tail_w"] / 2
+        # 顺时针一笔画出圆角矩形，并在底边正中插入尖角（垂直指向下方的助手头顶）；
+        # 单一轮廓无需 united 布尔运算，描边时尖角与主体之间也不会多出一条底边线
+        path = QPainterPath(QPointF(left + r, top))
+        path.lineTo(right - r, top)
+        path.arcTo(QRectF(right - d, top, d, d), 90, -90)
+        path.lineTo(right, bottom - r)
+        path.arcTo(QRectF(right - d, bottom - d, d, d), 0, -90)
+        path.lineTo(cx + half_tail, bottom)
+        path.lineTo(cx, bottom + tail_h)
+        path.lineTo(cx - half_tail, bottom)
+        path.lineTo(left + r, bottom)
+        path.arcTo(QRectF(left, bottom - d, d, d), 270, -90)
+        path.lineTo(left, top + r)
+        path.arcTo(QRectF(left, top, d, d), 180, -90)
+        path.closeSubpath()
+        self._cached_path = path
+        self._cached_size = (w, h)
+        return self._cached_path
 
-        p = QPainter(self)
+    def _render_chrome_pixmap(self, w, h):
+        """把白底、粗黑边与尖角预渲染到透明 QPixmap（按设备像素比），paintEvent 只需贴图。"""
+        dpr = self.devicePixelRatioF()
+        pix = QPixmap(max(1, int(w * dpr)), max(1, int(h * dpr)))
+        pix.setDevicePixelRatio(dpr)
+        pix.fill(Qt.transparent)
+        p = QPainter(pix)
         p.setRenderHint(QPainter.Antialiasing)
         p.setRenderHint(QPainter.SmoothPixmapTransform)
         # 粗黑边
-        p.setPen(QPen(QColor(0, 0, 0), self._border_px, Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin))
+        p.setPen(QPen(QColor(0, 0, 0), self._cfg["border_px"], Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin))
         p.setBrush(QColor(255, 255, 255))
-        p.drawPath(path)
+        p.drawPath(self._bubble_path(w, h))
+        p.end()
+        self._chrome_pix = pix
+        self._chrome_key = (w, h, dpr)
+        return pix
+
+    def resizeEvent(self, event):
+        self._cached_path = None
+        self._chrome_pix = None
+        super().resizeEvent(event)
+
+    def paintEvent(self, event):
+        """自绘：白底、粗黑边、正下方尖角（从助手正上方映出的说话效果）；外观预渲染为 QPixmap 后贴图。"""
+        dirty = event.rect() & self.rect()
+        if dirty.isEmpty():
+            return
+        w, h = self.width(), self.height()
+        dpr = self.devicePixelRatioF()
+        pix = self._chrome_pix
+        if pix is None or self._chrome_key != (w, h, dpr):
+            pix = self._render_chrome_pixmap(w, h)
+        p = QPainter(self)
+        # 只贴脏区域；源矩形以 pixmap 的物理像素计，需乘设备像素比
+        src = QRectF(dirty.x() * dpr, dirty.y() * dpr, dirty.width() * dpr, dirty.height() * dpr)
+        p.drawPixmap(QRectF(dirty), pix, src)
         p.end()
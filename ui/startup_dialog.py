@@ -14,10 +14,12 @@ from utils.platform_adapter import ui_font_family, ui_font_size_body, ui_window_
 from core.openclaw_gateway import local_to_server as l2s
 from core.openclaw_gateway.gateway_memory import gateway_memory
 from utils.ssh_tunnel import start_ssh_tunnel
+from utils.async_runner import run_in_thread
 
 
 DEFAULT_HOST = "127.0.0.1"
 DEFAULT_PORT = 18789
+_WS_RE = re.compile(r"^wss?://([^:/]+)(?::(\d+))?/?$", re.IGNORECASE)
 
 
 def parse_ws_url(url: str) -> tuple[str, int]:
@@ -25,7 +27,7 @@ def parse_ws_url(url: str) -> tuple[str, int]:
     url = (url or "").strip()
     if not url:
         return DEFAULT_HOST, DEFAULT_PORT
-    m = re.match(r"^wss?://([^:/]+)(?::(\d+))?/?$", url, re.IGNORECASE)
+    m = _WS_RE.match(url)
     if m:
         host = m.group(1).strip() or DEFAULT_HOST
         port_str = m.group(2)
@@ -141,8 +143,8 @@ class StartupDialog(QDialog):
     def _fill_from_settings(self):
         """从 config/gateway.json（经 Settings 加载）预填：Gateway 与 SSH 相关。"""
         self.settings.load()
-        url = (self.settings.get("gateway_ws_url") or "").strip() or build_ws_url(DEFAULT_HOST, DEFAULT_PORT)
-        host, port = parse_ws_url(url)
+        url = (self.settings.get("gateway_ws_url") or "").strip()
+        host, port = parse_ws_url(url) if url else (DEFAULT_HOST, DEFAULT_PORT)
         self._host_edit.setText(host)
         self._port_edit.setText(str(port))
         self._token_edit.setText((self.settings.get("gateway_token") or "").strip())
@@ -154,26 +156,52 @@ class StartupDialog(QDialog):
         self._ssh_server_edit.setText(ssh_server or host)
         self._ssh_password_edit.setText((self.settings.get("ssh_password") or "").strip())
 
-    def _do_connect(self):
-        """执行连接：若勾选 SSH 则先起隧道再连 Gateway；返回 (ok, err)。"""
-        host = (self._host_edit.text() or "").strip() or DEFAULT_HOST
-        port_str = (self._port_edit.text() or "").strip()
+    def _read_form(self):
+        """在主线程读取表单，供 _do_connect / _connect_worker（可在后台线程执行）使用。"""
+        return {
+            "host": (self._host_edit.text() or "").strip() or DEFAULT_HOST,
+            "port": (self._port_edit.text() or "").strip(),
+            "token": (self._token_edit.text() or "").strip(),
+            "ssh_enabled": self._ssh_enabled_cb.isChecked(),
+            "ssh_user": (self._ssh_user_edit.text() or "").strip(),
+            "ssh_server": (self._ssh_server_edit.text() or "").strip(),
+            "ssh_password": (self._ssh_password_edit.text() or "").strip(),
+        }
+
+    def _save_ssh_form(self, form):
+        """主线程：把表单中的 SSH 项写入共享 settings 并落盘（settings 与助手窗口共用，不在后台线程读写）。"""
+        self.settings.load()
+        self.settings.update({
+            "ssh_enabled": form["ssh_enabled"],
+            "ssh_username": form["ssh_user"],
+            "ssh_server": form["ssh_server"],
+            "ssh_password": form["ssh_password"],
+        })
+        self.settings.save()
+
+    def _do_connect(self, form):
+        """执行连接（主线程）：校验端口、保存 SSH 项后连接；返回 (ok, err)。"""
+        port_str = form["port"]
+        try:
+            int(port_str) if port_str else DEFAULT_PORT
+        except ValueError:
+            return False, "端口请输入数字"
+        self._save_ssh_form(form)
+        return self._connect_worker(form, (self.settings.get("gateway_password") or "").strip())
+
+    def _connect_worker(self, form, password):
+        """若勾选 SSH 则先起隧道再连 Gateway；返回 (ok, err)。只用传入的值，不访问控件与 settings，可在后台线程调用。"""
+        host = form["host"]
+        port_str = form["port"]
         try:
             port = int(port_str) if port_str else DEFAULT_PORT
         except ValueError:
             return False, "端口请输入数字"
-        token = (self._token_edit.text() or "").strip()
-        password = (self.settings.get("gateway_password") or "").strip()
-        ssh_enabled = self._ssh_enabled_cb.isChecked()
-        ssh_user = (self._ssh_user_edit.text() or "").strip()
-        ssh_server = (self._ssh_server_edit.text() or "").strip()
-        ssh_password = (self._ssh_password_edit.text() or "").strip()
-        self.settings.load()
-        self.settings.set("ssh_enabled", ssh_enabled)
-        self.settings.set("ssh_username", ssh_user)
-        self.settings.set("ssh_server", ssh_server)
-        self.settings.set("ssh_password", ssh_password)
-        self.settings.save()
+        token = form["token"]
+        ssh_enabled = form["ssh_enabled"]
+        ssh_user = form["ssh_user"]
+        ssh_server = form["ssh_server"]
+        ssh_password = form["ssh_password"]
         if ssh_enabled:
             if not ssh_user or not ssh_server:
                 return False, "勾选 SSH 时，用户名与服务器地址必填"
@@ -184,7 +212,8 @@ class StartupDialog(QDialog):
         return self.gateway_client.connect(ws_url, token, password)
 
     def _try_auto_login(self):
-        """若 gateway.json 中 auto_login 为 true 且已有地址，则自动连接；成功/失败均不修改 auto_login（仅用户显式勾选/保存时才改）。"""
+        """若 gateway.json 中 auto_login 为 true 且已有地址，则在后台线程自动连接，不阻塞启动页；
+        成功/失败均不修改 auto_login（仅用户显式勾选/保存时才改）。"""
         if not bool(self.settings.get("auto_login")):
             return
         url = (self.settings.get("gateway_ws_url") or "").strip()
@@ -192,7 +221,20 @@ class StartupDialog(QDialog):
             return
         self._connect_btn.setEnabled(False)
         self._connect_btn.setText(t("auto_login_connecting"))
-        ok, err = self._do_connect()
+        form = self._read_form()
+        self._save_ssh_form(form)
+        password = (self.settings.get("gateway_password") or "").strip()
+        run_in_thread(
+            lambda: self._connect_worker(form, password),
+            on_done=self._on_auto_login_done,
+            on_error=lambda e: self._on_auto_login_done((False, str(e))),
+        )
+
+    def _on_auto_login_done(self, result):
+        # 启动页非模态，用户可能已在连接期间关闭：不再操作隐藏窗口或弹窗
+        if not self.isVisible():
+            return
+        ok, err = result
         self._connect_btn.setEnabled(True)
         self._connect_btn.setText(t("connect_and_start"))
         if ok:
@@ -212,7 +254,7 @@ class StartupDialog(QDialog):
         """用户点击「连接并启动」：成功则保存并关闭窗口，失败则提示错误可重试。"""
         self._connect_btn.setEnabled(False)
         self._connect_btn.setText(t("connecting"))
-        ok, err = self._do_connect()
+        ok, err = self._do_connect(self._read_form())
         self._connect_btn.setEnabled(True)
         self._connect_btn.setText(t("connect_and_start"))
 
@@ -223,12 +265,14 @@ class StartupDialog(QDialog):
             )
             token = (self._token_edit.text() or "").strip()
             password = (self.settings.get("gateway_password") or "").strip()
-            self.settings.set("gateway_ws_url", ws_url)
-            self.settings.set("gateway_token", token)
+            # 仅在此处按用户勾选写入 auto_login（用户点击连接并成功时）
+            self.settings.update(
+                gateway_ws_url=ws_url,
+                gateway_token=token,
+                auto_login=self._auto_login_cb.isChecked(),
+            )
             if password:
                 self.settings.set("gateway_password", password)
-            # 仅在此处按用户勾选写入 auto_login（用户点击连接并成功时）
-            self.settings.set("auto_login", self._auto_login_cb.isChecked())
             self.settings.save()
             logger.info(f"Gateway 已连接: {ws_url}，配置已保存")
             # 接通后拉取一次 config 并存内存，供会话列表等使用
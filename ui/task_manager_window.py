@@ -4,24 +4,108 @@
 """
 import os
 import time
+from collections import namedtuple
+from functools import lru_cache
+from itertools import islice
 from PyQt5.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QTableWidget, QTableWidgetItem, QLineEdit, QPushButton, QLabel, QCheckBox,
+    QTableView, QAbstractItemView, QLineEdit, QPushButton, QLabel,
     QMessageBox, QHeaderView, QDialog, QFormLayout, QComboBox, QSpinBox, QDateTimeEdit,
     QDialogButtonBox,
 )
-from PyQt5.QtCore import Qt, QDateTime, QTimer
-from PyQt5.QtGui import QFont, QIcon
+from PyQt5.QtCore import Qt, QDateTime, QTimer, QAbstractTableModel, QModelIndex
+from PyQt5.QtGui import QFont, QIcon, QColor
 from utils.logger import logger
-from utils.i18n import t
+from utils.i18n import t, t_many
 from utils.platform_adapter import ui_font_family, ui_font_size_body, ui_window_bg, is_macos
 from utils.async_runner import run_in_thread
 from core.openclaw_gateway import local_to_server as l2s
 
 _UI_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+@lru_cache(maxsize=64)
 def _svg(path): return os.path.join(_UI_DIR, "svg_file", path)
 
 
+_TASK_ICON = _svg("task_windows_task.svg")
+_HAS_TASK_ICON = os.path.exists(_TASK_ICON)  # 随安装包分发的图标，运行期间不会变化
+
+# 任务行：cells 为第 1~4 列的显示文本（已规整为 str，模型 data() 直接返回），tid 为任务/job id，
+# extra 本地为是否未完成、Gateway 为 job dict。namedtuple 无实例 __dict__，大量行时更省内存
+TaskRow = namedtuple("TaskRow", "cells tid extra")
+# 分段行（「已完成」分隔、「显示更多」）：跨整行显示，点击时按 action 处理
+SectionRow = namedtuple("SectionRow", "text action")
+# 重要级别 1~3 的显示文本，避免每行 str()
+_PRIORITY_TEXT = {1: "1", 2: "2", 3: "3"}
+SECTION_EXPAND_DONE = "expand_done"
+SECTION_COLLAPSE_DONE = "collapse_done"
+SECTION_MORE_DONE = "more_done"
+# 展开已完成段时每次显示的条数
+_COMPLETED_PAGE = 50
+# cron.list 等待响应的上限（毫秒），超时视为丢失并重新拉取
+_CRON_LIST_TIMEOUT_MS = 15000
+
+
+# 以下两个函数把任务数据转换为 TaskTableModel 的行（不涉及 Qt 控件），填表热路径集中于此。
+def _build_gateway_rows(jobs, keyword):
+    """Gateway jobs -> 行列表；keyword 为已小写的搜索词，按 job["_name_lc"] 过滤。"""
+    # 行内文案在循环外一次解析（每次填表时取，切换语言后下次填表即生效）
+    lbl_timed, lbl_rec, lbl_cron, lbl_unnamed, lbl_on, lbl_off = t_many(
+        "task_type_timed", "task_type_recurring", "task_type_cron",
+        "task_unnamed", "task_enabled", "task_disabled",
+    )
+    type_labels = {"at": lbl_timed, "cron": lbl_cron}
+    rows = []
+    append = rows.append
+    for job in jobs:
+        if keyword and keyword not in job["_name_lc"]:
+            continue
+        name = (job.get("name") or "").strip() or lbl_unnamed
+        sched = job.get("schedule") or {}
+        type_label = type_labels.get((sched.get("kind") or "").strip(), lbl_rec)
+        state = job.get("state") or {}
+        last_status = (state.get("lastStatus") or "").strip() or "-"
+        enabled_label = lbl_on if job.get("enabled", True) else lbl_off
+        append(TaskRow((enabled_label, type_label, name, last_status), job.get("id"), job))
+    return rows
+
+
+def _build_local_rows(pending_rows, completed_tasks, keyword, completed_expanded=False, completed_limit=_COMPLETED_PAGE):
+    """本地任务 -> 行列表。pending_rows 为 [(type_label, desc, tid, task_dict), ...]，completed_tasks 为已完成任务 dict 列表。
+    已完成段默认折叠，只放一个可点击展开的分段行；展开后最多显示 completed_limit 条，其余由「显示更多」行加载。
+    没有匹配的已完成任务时不显示该分段；已完成任务只转换实际显示的那一页。"""
+    def to_row(type_label, desc, tid, task_dict, is_pending):
+        pri = max(1, min(3, int(task_dict.get("priority", 2))))
+        return TaskRow((_PRIORITY_TEXT[pri], type_label, desc, ""), tid, is_pending)
+
+    rows = [
+        to_row(type_label, desc or "", tid, task_dict, True)
+        for type_label, desc, tid, task_dict in pending_rows
+        if not keyword or keyword in (desc or "").lower()
+    ]
+    matched = (
+        task for task in completed_tasks
+        if not keyword or keyword in (task.get("description") or "").lower()
+    )
+    if not completed_expanded:
+        if next(matched, None) is not None:
+            rows.append(SectionRow(t("task_section_done_collapsed"), SECTION_EXPAND_DONE))
+        return rows
+    page = list(islice(matched, completed_limit))
+    if not page:
+        return rows
+    timed_label, rec_label = t_many("task_type_timed", "task_type_recurring")
+    rows.append(SectionRow(t("task_section_done"), SECTION_COLLAPSE_DONE))
+    for task in page:
+        label = timed_label if task.get("type") == "timed" else rec_label
+        rows.append(to_row(label, task.get("description") or "", task.get("id"), task, False))
+    remaining = sum(1 for _ in matched)
+    if remaining:
+        rows.append(SectionRow(t("task_completed_more_fmt") % remaining, SECTION_MORE_DONE))
+    return rows
+
+
 class TaskEditDialog(QDialog):
     """增加/修改任务对话框。task 可为本地任务 dict 或 Gateway cron job dict（含 id/name/schedule/payload）。task_manager 可为 None（仅 Gateway 模式）。支持 Gateway schedule.kind 为 at/every/cron（expr+tz）。"""
     def __init__(self, task_manager, parent=None, task=None):
@@ -48,18 +132,10 @@ class TaskEditDialog(QDialog):
         self.dt_edit.setDisplayFormat("yyyy-MM-dd HH:mm")
         self.dt_edit.setDateTime(QDateTime.currentDateTime().addSecs(3600))
         layout.addRow(t("task_target_time_label"), self.dt_edit)
-        self.interval_spin = QSpinBox()
-        self.interval_spin.setRange(1, 99999)
-        self.interval_spin.setSuffix(t("interval_minutes_suffix"))
-        self.interval_spin.setValue(60)
-        layout.addRow(t("task_interval_label"), self.interval_spin)
-        self.cron_expr_edit = QLineEdit()
-        self.cron_expr_edit.setPlaceholderText(t("task_cron_expr_placeholder"))
-        layout.addRow(t("task_cron_expr_label"), self.cron_expr_edit)
-        self.cron_tz_edit = QLineEdit()
-        self.cron_tz_edit.setPlaceholderText(t("task_cron_tz_placeholder"))
-        self.cron_tz_edit.setText("UTC")
-        layout.addRow(t("task_cron_tz_label"), self.cron_tz_edit)
+        # 周期间隔与 cron 输入框按需创建（_ensure_interval_widgets / _ensure_cron_widgets），未选对应类型时不构建
+        self.interval_spin = None
+        self.cron_expr_edit = None
+        self.cron_tz_edit = None
         self.priority_combo = QComboBox()
         self.priority_combo.addItems([t("task_priority_1"), t("task_priority_2"), t("task_priority_3")])
         self.priority_combo.setToolTip(t("task_priority_tooltip"))
@@ -79,10 +155,12 @@ class TaskEditDialog(QDialog):
                     self.type_combo.setCurrentIndex(0)  # timed
                 elif kind == "cron" and self._gateway_mode:
                     self.type_combo.setCurrentIndex(2)  # cron
+                    self._ensure_cron_widgets()
                     self.cron_expr_edit.setText((sched.get("expr") or "").strip())
                     self.cron_tz_edit.setText((sched.get("tz") or "UTC").strip())
                 else:
                     every_ms = sched.get("everyMs") or 3600000
+                    self._ensure_interval_widgets()
                     self.interval_spin.setValue(max(1, int(every_ms) // 60000))
                     self.type_combo.setCurrentIndex(1)  # recurring
                 self.priority_combo.setCurrentIndex(1)
@@ -96,6 +174,7 @@ class TaskEditDialog(QDialog):
                 else:
                     self.type_combo.setCurrentIndex(1)
                     sec = task.get("interval_seconds", 3600)
+                    self._ensure_interval_widgets()
                     self.interval_spin.setValue(max(1, sec // 60))
                 pri = max(1, min(3, int(task.get("priority", 2))))
                 self.priority_combo.setCurrentIndex(pri - 1)
@@ -115,22 +194,55 @@ class TaskEditDialog(QDialog):
         btns.rejected.connect(self.reject)
         layout.addRow(btns)
 
+    def _ensure_interval_widgets(self):
+        """首次需要时创建周期间隔输入框，插在目标时间行之后。"""
+        if self.interval_spin is not None:
+            return
+        self.interval_spin = QSpinBox()
+        self.interval_spin.setRange(1, 99999)
+        self.interval_spin.setSuffix(t("interval_minutes_suffix"))
+        self.interval_spin.setValue(60)
+        row, _ = self._form_layout.getWidgetPosition(self.dt_edit)
+        self._form_layout.insertRow(row + 1, t("task_interval_label"), self.interval_spin)
+
+    def _ensure_cron_widgets(self):
+        """首次需要时创建 cron 表达式与时区输入框，插在重要级别行之前。"""
+        if self.cron_expr_edit is not None:
+            return
+        self.cron_expr_edit = QLineEdit()
+        self.cron_expr_edit.setPlaceholderText(t("task_cron_expr_placeholder"))
+        self.cron_tz_edit = QLineEdit()
+        self.cron_tz_edit.setPlaceholderText(t("task_cron_tz_placeholder"))
+        self.cron_tz_edit.setText("UTC")
+        row, _ = self._form_layout.getWidgetPosition(self.priority_combo)
+        self._form_layout.insertRow(row, t("task_cron_expr_label"), self.cron_expr_edit)
+        self._form_layout.insertRow(row + 1, t("task_cron_tz_label"), self.cron_tz_edit)
+
     def _on_type_changed(self):
         idx = self.type_combo.currentIndex()
         is_timed = idx == 0
         is_recurring = idx == 1
         is_cron = self._gateway_mode and idx == 2
-        self.dt_edit.setVisible(is_timed)
-        self.interval_spin.setVisible(is_recurring)
-        self.cron_expr_edit.setVisible(is_cron)
-        self.cron_tz_edit.setVisible(is_cron)
-        try:
-            for w in (self.dt_edit, self.interval_spin, self.cron_expr_edit, self.cron_tz_edit):
+        if is_recurring:
+            self._ensure_interval_widgets()
+        if is_cron:
+            self._ensure_cron_widgets()
+        visible = (
+            (self.dt_edit, is_timed),
+            (self.interval_spin, is_recurring),
+            (self.cron_expr_edit, is_cron),
+            (self.cron_tz_edit, is_cron),
+        )
+        for w, on in visible:
+            if w is None:
+                continue
+            w.setVisible(on)
+            try:
                 lbl = self._form_layout.labelForField(w)
                 if lbl is not None:
-                    lbl.setVisible(w.isVisible())
-        except Exception:
-            pass
+                    lbl.setVisible(on)
+            except Exception:
+                pass
 
     def get_type(self):
         idx = self.type_combo.currentIndex()
@@ -145,12 +257,18 @@ class TaskEditDialog(QDialog):
         return self.dt_edit.dateTime().toSecsSinceEpoch()
 
     def get_interval_seconds(self):
+        if self.interval_spin is None:
+            return 3600
         return self.interval_spin.value() * 60
 
     def get_cron_expr(self):
+        if self.cron_expr_edit is None:
+            return "0 0 * * *"
         return (self.cron_expr_edit.text() or "").strip() or "0 0 * * *"
 
     def get_cron_tz(self):
+        if self.cron_tz_edit is None:
+            return "UTC"
         return (self.cron_tz_edit.text() or "").strip() or "UTC"
 
     def get_priority(self):
@@ -158,6 +276,169 @@ class TaskEditDialog(QDialog):
         return self.priority_combo.currentIndex() + 1
 
 
+class TaskTableModel(QAbstractTableModel):
+    """任务列表模型：第 0 列为勾选（CheckStateRole），1~4 列为文本。
+    每行为 TaskRow(cells, tid, extra) 或分段行 SectionRow（由视图 setSpan 跨整行，外观经 Background/Font 等角色给出）。不创建任何单元格控件。
+    行数多时分页暴露给视图：先给 FETCH_BATCH 行，滚动到底部时视图经 canFetchMore/fetchMore 再取下一批。"""
+
+    FETCH_BATCH = 100
+    _SEP_BG = QColor("#e5e7eb")
+    _SEP_FG = QColor("#374151")
+
+    def __init__(self, headers, parent=None):
+        super().__init__(parent)
+        self._headers = list(headers)
+        self._rows = []
+        self._checked_ids = set()  # 勾选中的 tid，随勾选增删，批量删除时无需逐行扫描
+        self._visible = 0  # 已暴露给视图的行数（分页）
+        self._sep_font = QFont()
+        self._sep_font.setWeight(QFont.DemiBold)
+
+    @staticmethod
+    def _row_key(row):
+        return row.action if isinstance(row, SectionRow) else row.tid
+
+    def set_rows(self, rows):
+        """替换行数据，尽量增量更新：行 id 序列不变时只对内容变化的行发 dataChanged；
+        仅有行被删除时逐段 removeRows；其余情况（新增、重排等）整体 reset 并清空勾选。"""
+        rows = list(rows)
+        new_keys = [self._row_key(row) for row in rows]
+        old_keys = [self._row_key(row) for row in self._rows]
+        if new_keys != old_keys and not self._remove_vanished(set(new_keys), new_keys):
+            self.beginResetModel()
+            self._rows = rows
+            self._checked_ids.clear()
+            self._visible = min(len(rows), self.FETCH_BATCH)
+            self.endResetModel()
+            return
+        last_col = self.columnCount() - 1
+        for r, (old, new) in enumerate(zip(self._rows, rows)):
+            if old != new:
+                self._rows[r] = new
+                if r < self._visible:
+                    self.dataChanged.emit(self.index(r, 0), self.index(r, last_col))
+
+    def _remove_vanished(self, keep, new_keys):
+        """若 new_keys 恰为当前行去掉若干行后的结果，则就地删除这些行并返回 True；否则不改动并返回 False。"""
+        survivors = [i for i, row in enumerate(self._rows) if self._row_key(row) in keep]
+        if [self._row_key(self._rows[i]) for i in survivors] != new_keys:
+            return False
+        self._checked_ids &= keep
+        gone = sorted(set(range(len(self._rows))) - set(survivors), reverse=True)
+        while gone:
+            # 从后往前按连续段删除，保持前面行的下标不变
+            last = first = gone.pop(0)
+            while gone and gone[0] == first - 1:
+                first = gone.pop(0)
+            # 尚未暴露给视图的部分直接删除，不发信号
+            shown_last = min(last, self._visible - 1)
+            if first <= shown_last:
+                self.beginRemoveRows(QModelIndex(), first, shown_last)
+            del self._rows[first:last + 1]
+            if first <= shown_last:
+                self._visible -= shown_last - first + 1
+                self.endRemoveRows()
+        return True
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._visible
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._visible < len(self._rows)
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        end = min(len(self._rows), self._visible + self.FETCH_BATCH)
+        if end <= self._visible:
+            return
+        self.beginInsertRows(QModelIndex(), self._visible, end - 1)
+        self._visible = end
+        self.endInsertRows()
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._headers)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole and 0 <= section < len(self._headers):
+            return self._headers[section]
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        if isinstance(self._rows[index.row()], SectionRow):
+            return Qt.ItemIsEnabled
+        if index.column() == 0:
+            return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsUserCheckable
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self._rows[index.row()]
+        if isinstance(row, SectionRow):
+            if role == Qt.DisplayRole:
+                return row.text if index.column() == 0 else None
+            if role == Qt.TextAlignmentRole:
+                return Qt.AlignCenter
+            if role == Qt.BackgroundRole:
+                return self._SEP_BG
+            if role == Qt.ForegroundRole:
+                return self._SEP_FG
+            if role == Qt.FontRole:
+                return self._sep_font
+            return None
+        col = index.column()
+        if col == 0:
+            if role == Qt.CheckStateRole:
+                return Qt.Checked if row.tid in self._checked_ids else Qt.Unchecked
+            return None
+        if role == Qt.DisplayRole:
+            return row.cells[col - 1]
+        return None
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or index.column() != 0 or role != Qt.CheckStateRole:
+            return False
+        row = self._rows[index.row()]
+        if isinstance(row, SectionRow) or not row.tid:
+            return False
+        if value == Qt.Checked:
+            self._checked_ids.add(row.tid)
+        else:
+            self._checked_ids.discard(row.tid)
+        self.dataChanged.emit(index, index, [Qt.CheckStateRole])
+        return True
+
+    def section_rows(self):
+        """已暴露行中分段行的下标列表。"""
+        return [i for i in range(self._visible) if isinstance(self._rows[i], SectionRow)]
+
+    def row_action(self, row):
+        """分段行的 action；普通行或越界返回 None。"""
+        if 0 <= row < self._visible and isinstance(self._rows[row], SectionRow):
+            return self._rows[row].action
+        return None
+
+    def _task_row(self, row):
+        if 0 <= row < self._visible and not isinstance(self._rows[row], SectionRow):
+            return self._rows[row]
+        return None
+
+    def row_tid(self, row):
+        entry = self._task_row(row)
+        return entry.tid if entry is not None else None
+
+    def row_extra(self, row):
+        entry = self._task_row(row)
+        return entry.extra if entry is not None else None
+
+    def checked_ids(self):
+        """所有勾选行的 tid（不含分段行、空 id）；未勾选任何行时不扫描。"""
+        return list(self._checked_ids)
+
+
 class TaskManagerWindow(QMainWindow):
     """任务管理窗口：搜索、列表（任务类型、描述）、查询/增加/修改/删除。支持 Gateway cron.*。"""
 
@@ -166,8 +447,31 @@ class TaskManagerWindow(QMainWindow):
         self.assistant_window = assistant_window
         self.gateway_client = getattr(assistant_window, "gateway_client", None) if assistant_window else None
         self.task_manager = getattr(assistant_window, "task_manager", None) if assistant_window else None
+        self._completed_expanded = False  # 本地模式已完成段是否展开；折叠时只判断有无匹配的已完成任务，不转换行
+        self._completed_shown = _COMPLETED_PAGE
         self._gateway_jobs = []  # Gateway cron.list 返回的 jobs 列表
+        self._gateway_cron_cached = None  # _use_gateway_cron 的缓存结果，None 表示需重新计算
+        self._watched_gateway_client = None  # 已注册连接/断开回调的 gateway_client
+        self._cron_list_in_flight = False  # 是否有未返回的 cron.list
+        self._reload_again = False  # cron.list 在途期间又有刷新请求，返回后再拉一次
+        self._cron_list_seq = 0  # 当前在途 cron.list 的序号，超时后迟到的响应按序号丢弃
+        # cron.list 响应超时：Gateway 客户端无逐请求超时，响应丢失时清除在途标记并重拉，避免列表再也不刷新
+        self._cron_list_timer = QTimer(self)
+        self._cron_list_timer.setSingleShot(True)
+        self._cron_list_timer.setInterval(_CRON_LIST_TIMEOUT_MS)
+        self._cron_list_timer.timeout.connect(self._on_cron_list_timeout)
+        # 增删改回调的刷新合并：短时间内多个操作完成只发一次 cron.list
+        self._reload_timer = QTimer(self)
+        self._reload_timer.setSingleShot(True)
+        self._reload_timer.setInterval(20)
+        self._reload_timer.timeout.connect(self._reload_jobs)
+        self._watch_gateway_client()
         self.setWindowTitle(t("task_manager_title"))
+        # 几何保存防抖：拖动/缩放期间复用同一个单次定时器，停下 400ms 后保存一次
+        self._geometry_save_timer = QTimer(self)
+        self._geometry_save_timer.setSingleShot(True)
+        self._geometry_save_timer.setInterval(400)
+        self._geometry_save_timer.timeout.connect(self._save_geometry)
         try:
             from ui.ui_settings_loader import get_ui_setting, save_ui_settings_geometry
             geom = get_ui_setting("task_manager_window.geometry") or {}
@@ -177,17 +481,15 @@ class TaskManagerWindow(QMainWindow):
                 int(geom.get("width", 640)),
                 int(geom.get("height", 420)),
             )
-            self._geometry_save_timer = None
         except Exception:
             self.setGeometry(320, 200, 640, 420)
-            self._geometry_save_timer = None
         self.setAttribute(Qt.WA_DeleteOnClose, False)
         if is_macos():
             self.setUnifiedTitleAndToolBarOnMac(True)
         ff, fs, bg = ui_font_family(), ui_font_size_body(), ui_window_bg()
         self.setStyleSheet(f"QMainWindow {{ font-family: '{ff}'; font-size: {fs}px; background: {bg}; }}")
-        if os.path.exists(_svg("task_windows_task.svg")):
-            self.setWindowIcon(QIcon(_svg("task_windows_task.svg")))
+        if _HAS_TASK_ICON:
+            self.setWindowIcon(QIcon(_TASK_ICON))
 
         c = QWidget()
         self.setCentralWidget(c)
@@ -212,25 +514,40 @@ class TaskManagerWindow(QMainWindow):
         search_layout.addWidget(QLabel(t("task_search_label")))
         self.search_edit = QLineEdit()
         self.search_edit.setPlaceholderText(t("task_search_placeholder"))
-        self.search_edit.textChanged.connect(self._refresh_table)
+        # 输入防抖：连续输入只在停顿 250ms 后刷新一次；回车立即刷新
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(250)
+        self._search_timer.timeout.connect(self._apply_filter)
+        self.search_edit.textChanged.connect(lambda _text: self._search_timer.start())
+        self.search_edit.returnPressed.connect(self._on_search_return)
         search_layout.addWidget(self.search_edit)
         layout.addLayout(search_layout)
 
         # 表格：勾选、级别、任务类型、描述（本地）或 勾选、启用、类型、描述、最后状态（Gateway）
-        self.table = QTableWidget(0, 5)
-        self.table.setHorizontalHeaderLabels([t("task_header_check"), t("task_header_level"), t("task_header_type"), t("task_header_desc"), t("task_header_status")])
+        self._model = TaskTableModel(
+            [t("task_header_check"), t("task_header_level"), t("task_header_type"), t("task_header_desc"), t("task_header_status")],
+            self,
+        )
+        self.table = QTableView()
+        self.table.setModel(self._model)
+        # 分页取到更多行后，分段行可能刚进入视图，需重新设置 span
+        self._model.rowsInserted.connect(lambda *_: self._update_separator_span())
+        self.table.clicked.connect(self._on_table_clicked)
+        self.table.verticalHeader().setVisible(False)
         self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeToContents)
         self.table.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeToContents)
         self.table.horizontalHeader().setSectionResizeMode(3, QHeaderView.Stretch)
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.table.setSelectionMode(QTableWidget.SingleSelection)
-        self.table.cellDoubleClicked.connect(self._on_cell_double_clicked)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.doubleClicked.connect(self._on_cell_double_clicked)
         layout.addWidget(self.table)
 
         # 按钮：查询、增加、修改、删除、批量删除、运行一次
         btn_layout = QHBoxLayout()
         query_btn = QPushButton(t("task_btn_query"))
-        query_btn.clicked.connect(self._refresh_table)
+        query_btn.clicked.connect(self._reload_jobs)
         add_btn = QPushButton(t("task_btn_add"))
         add_btn.clicked.connect(self._on_add)
         edit_btn = QPushButton(t("task_btn_edit"))
@@ -251,7 +568,7 @@ class TaskManagerWindow(QMainWindow):
         layout.addLayout(btn_layout)
         self._run_btn = run_btn
 
-        self._refresh_table()
+        self._reload_jobs()
 
     def showEvent(self, event):
         """窗口显示时同步 gateway_client / task_manager 引用并刷新列表"""
@@ -259,85 +576,119 @@ class TaskManagerWindow(QMainWindow):
         if getattr(self, "assistant_window", None):
             self.gateway_client = getattr(self.assistant_window, "gateway_client", None) or self.gateway_client
             self.task_manager = getattr(self.assistant_window, "task_manager", None) or self.task_manager
-        self._refresh_table()
+        self._watch_gateway_client()
+        self._gateway_cron_cached = None
+        self._reload_jobs()
         if getattr(self, "table", None) and self.table.viewport():
             self.table.viewport().update()
 
     def _use_gateway_cron(self):
-        """当前是否使用 Gateway cron（已连接且支持 cron.list）。"""
+        """当前是否使用 Gateway cron（已连接且支持 cron.list）。结果缓存，连接/断开或窗口重新显示时失效。"""
+        if self._gateway_cron_cached is None:
+            gc = getattr(self, "gateway_client", None)
+            if not gc or not getattr(gc, "is_connected", lambda: False)():
+                self._gateway_cron_cached = False
+            else:
+                self._gateway_cron_cached = bool(getattr(gc, "supports_method", lambda _: False)("cron.list"))
+        return self._gateway_cron_cached
+
+    def _watch_gateway_client(self):
+        """对当前 gateway_client 注册一次连接/断开回调，用于让 _use_gateway_cron 的缓存失效。"""
         gc = getattr(self, "gateway_client", None)
-        if not gc or not getattr(gc, "is_connected", lambda: False)():
-            return False
-        return getattr(gc, "supports_method", lambda _: False)("cron.list")
+        if gc is None or gc is self._watched_gateway_client:
+            return
+        self._watched_gateway_client = gc
+        self._gateway_cron_cached = None
+        for name in ("register_on_connected", "register_on_disconnected"):
+            register = getattr(gc, name, None)
+            if callable(register):
+                register(self._invalidate_gateway_cron)
 
-    def _on_cron_list_loaded(self, ok, payload, error):
-        """cron.list 回调：更新 _gateway_jobs 并刷新表格。"""
+    def _invalidate_gateway_cron(self):
+        self._gateway_cron_cached = None
+
+    def _on_cron_list_timeout(self):
+        """cron.list 超时未返回：作废该请求并重新拉取。"""
+        logger.debug("任务管理: cron.list 响应超时，重新拉取")
+        self._cron_list_seq += 1
+        self._cron_list_in_flight = False
+        self._reload_again = False
+        self._schedule_reload()
+
+    def _on_cron_list_loaded(self, ok, payload, error, seq=None):
+        """cron.list 回调：更新 _gateway_jobs 并刷新表格。名称的小写形式在此预先算好，供搜索过滤复用。"""
+        if seq is not None and seq != self._cron_list_seq:
+            return
+        self._cron_list_timer.stop()
+        self._cron_list_in_flight = False
+        if self._reload_again:
+            # 在途期间又有变更，结果可能已过时：再拉一次（本次结果仍先显示）
+            self._reload_again = False
+            self._schedule_reload()
         if ok and isinstance(payload, dict):
-            self._gateway_jobs = payload.get("jobs") if isinstance(payload.get("jobs"), list) else []
+            jobs = payload.get("jobs") if isinstance(payload.get("jobs"), list) else []
         else:
-            self._gateway_jobs = []
+            jobs = []
+        jobs = [job for job in jobs if isinstance(job, dict)]
+        for job in jobs:
+            job["_name_lc"] = (job.get("name") or "").strip().lower()
+        self._gateway_jobs = jobs
+        self._fill_table_from_gateway()
+
+    @staticmethod
+    def _job_from_payload(payload):
+        """从 cron.* 响应中取出 job dict：payload.job 或 payload 本身即为 job；取不到返回 None。"""
+        if not isinstance(payload, dict):
+            return None
+        job = payload.get("job") if isinstance(payload.get("job"), dict) else payload
+        return job if job.get("id") and "schedule" in job else None
+
+    def _patch_gateway_job(self, job, append=False):
+        """用 job 替换 _gateway_jobs 中同 id 的条目（append 为 True 时找不到则追加）并重绘表格；返回是否已写入。"""
+        job_id = job.get("id")
+        job["_name_lc"] = (job.get("name") or "").strip().lower()
+        for i, old in enumerate(self._gateway_jobs):
+            if old.get("id") == job_id:
+                self._gateway_jobs[i] = job
+                break
+        else:
+            if not append:
+                return False
+            self._gateway_jobs.append(job)
+        self._fill_table_from_gateway()
+        return True
+
+    def _drop_gateway_jobs(self, job_ids):
+        """从 _gateway_jobs 移除指定 id 并重绘（表格模型只删除对应行，不整体重建）。"""
+        job_ids = set(job_ids)
+        self._gateway_jobs = [job for job in self._gateway_jobs if job.get("id") not in job_ids]
         self._fill_table_from_gateway()
 
     def _fill_table_from_gateway(self):
         """根据 _gateway_jobs 填充表格（Gateway 模式）。"""
         keyword = (self.search_edit.text() or "").strip().lower()
-        rows = []
-        for job in self._gateway_jobs:
-            if not isinstance(job, dict):
-                continue
-            name = (job.get("name") or "").strip() or t("task_unnamed")
-            if keyword and keyword not in name.lower():
-                continue
-            sched = job.get("schedule") or {}
-            kind = (sched.get("kind") or "").strip()
-            if kind == "at":
-                type_label = t("task_type_timed")
-            elif kind == "cron":
-                type_label = t("task_type_cron")
-            else:
-                type_label = t("task_type_recurring")
-            enabled = job.get("enabled", True)
-            state = job.get("state") or {}
-            last_status = (state.get("lastStatus") or "").strip() or "-"
-            rows.append((job, enabled, type_label, name, last_status))
-        self.table.setRowCount(len(rows))
-        for r, (job, enabled, type_label, name, last_status) in enumerate(rows):
-            cb = QCheckBox()
-            self.table.setCellWidget(r, 0, cb)
-            self.table.setItem(r, 1, QTableWidgetItem(t("task_enabled") if enabled else t("task_disabled")))
-            self.table.setItem(r, 2, QTableWidgetItem(type_label))
-            self.table.setItem(r, 3, QTableWidgetItem(name))
-            self.table.setItem(r, 4, QTableWidgetItem(last_status))
-            self.table.item(r, 2).setData(Qt.UserRole, job.get("id"))
-            self.table.item(r, 2).setData(Qt.UserRole + 1, job)
+        self._set_table_rows(_build_gateway_rows(self._gateway_jobs, keyword))
         if getattr(self, "_run_btn", None):
             self._run_btn.setEnabled(True)
         self._banner_label.setText("")
         self._banner_label.setVisible(False)
 
     def _pending_and_completed_lists(self):
-        """未完成任务与已完成任务 [(type_label, desc, tid, task_dict), ...] 各一段。"""
+        """未完成任务 [(type_label, desc, tid, task_dict), ...] 与已完成任务 dict 列表（原样返回，由 _build_local_rows 按需转换）。"""
         if not self.task_manager:
             return [], []
+        # 循环变量不能叫 t，否则会遮蔽翻译函数 t()
+        timed_label, rec_label = t_many("task_type_timed", "task_type_recurring")
         pending = self.task_manager.get_pending_tasks()
         pending_rows = []
-        for t in pending.get("timed", []):
-            pending_rows.append((t("task_type_timed"), t.get("description", ""), t.get("id"), t))
-        for t in pending.get("recurring", []):
-            pending_rows.append((t("task_type_recurring"), t.get("description", ""), t.get("id"), t))
-        completed_rows = []
-        for t in self.task_manager.get_completed_tasks():
-            label = t("task_type_timed") if t.get("type") == "timed" else t("task_type_recurring")
-            completed_rows.append((label, t.get("description", ""), t.get("id"), t))
-        return pending_rows, completed_rows
+        for task in pending.get("timed", []):
+            pending_rows.append((timed_label, task.get("description", ""), task.get("id"), task))
+        for task in pending.get("recurring", []):
+            pending_rows.append((rec_label, task.get("description", ""), task.get("id"), task))
+        return pending_rows, self.task_manager.get_completed_tasks() or []
 
     def _schedule_save_geometry(self):
-        if getattr(self, "_geometry_save_timer", None):
-            self._geometry_save_timer.stop()
-        self._geometry_save_timer = QTimer(self)
-        self._geometry_save_timer.setSingleShot(True)
-        self._geometry_save_timer.timeout.connect(self._save_geometry)
-        self._geometry_save_timer.start(400)
+        self._geometry_save_timer.start()
 
     def _save_geometry(self):
         try:
@@ -355,115 +706,120 @@ class TaskManagerWindow(QMainWindow):
         super().moveEvent(event)
         self._schedule_save_geometry()
 
-    def _refresh_table(self):
+    def _reload_jobs(self):
+        """重新获取任务：Gateway 模式发 cron.list（回调中填表）；本地模式直接按当前任务重建表格。"""
         if self._use_gateway_cron():
-            gc = self.gateway_client
-            l2s.send_cron_list(gc, include_disabled=True, callback=self._on_cron_list_loaded)
             self._banner_label.setVisible(False)
             self._banner_label.setText("")
+            if self._cron_list_in_flight:
+                self._reload_again = True
+                return
+            self._cron_list_in_flight = True
+            self._cron_list_seq += 1
+            seq = self._cron_list_seq
+            self._cron_list_timer.start()
+            gc = self.gateway_client
+            l2s.send_cron_list(
+                gc, include_disabled=True,
+                callback=lambda ok, payload, error: self._on_cron_list_loaded(ok, payload, error, seq),
+            )
+            return
+        self._apply_filter()
+
+    def _schedule_reload(self):
+        """Gateway 增删改完成后调用：20ms 内的多次请求合并为一次 _reload_jobs。"""
+        self._reload_timer.start()
+
+    def _apply_filter(self):
+        """按搜索关键字重建表格：Gateway 模式只过滤已拉取的 _gateway_jobs，不再请求 cron.list。"""
+        if self._use_gateway_cron():
+            self._fill_table_from_gateway()
             return
         # 本地模式或无 Gateway
         if not self.task_manager:
             self._banner_label.setText(t("task_banner_no_cron"))
             self._banner_label.setVisible(True)
-            self.table.setRowCount(0)
+            self._set_table_rows([])
             if getattr(self, "_run_btn", None):
                 self._run_btn.setEnabled(False)
             return
         self._banner_label.setVisible(False)
         self._banner_label.setText("")
         keyword = (self.search_edit.text() or "").strip().lower()
-        pending_rows, completed_rows = self._pending_and_completed_lists()
-        if keyword:
-            pending_rows = [(a, b, c, d) for a, b, c, d in pending_rows if keyword in (b or "").lower()]
-            completed_rows = [(a, b, c, d) for a, b, c, d in completed_rows if keyword in (b or "").lower()]
-        rows = []
-        for _, (a, b, c, task_dict) in enumerate(pending_rows):
-            pri = max(1, min(3, int(task_dict.get("priority", 2))))
-            rows.append((a, b, c, True, pri))
-        sep_row_index = len(rows)
-        for (a, b, c, task_dict) in completed_rows:
-            pri = max(1, min(3, int(task_dict.get("priority", 2))))
-            rows.append((a, b, c, False, pri))
-        need_sep = len(completed_rows) > 0
-        n = len(rows) + (1 if need_sep else 0)
-        self.table.setRowCount(n)
-        r = 0
-        for type_label, desc, tid, is_pending, priority in rows:
-            if need_sep and r == sep_row_index:
-                self.table.setSpan(r, 0, 1, 5)
-                sep = QLabel(t("task_section_done"))
-                sep.setAlignment(Qt.AlignCenter)
-                sep.setStyleSheet("background: #e5e7eb; color: #374151; font-weight: 600; padding: 8px;")
-                self.table.setCellWidget(r, 0, sep)
-                r += 1
-            cb = QCheckBox()
-            self.table.setCellWidget(r, 0, cb)
-            self.table.setItem(r, 1, QTableWidgetItem(str(priority)))
-            self.table.setItem(r, 2, QTableWidgetItem(type_label))
-            self.table.setItem(r, 3, QTableWidgetItem(desc or ""))
-            self.table.setItem(r, 4, QTableWidgetItem(""))
-            self.table.item(r, 2).setData(Qt.UserRole, tid)
-            self.table.item(r, 2).setData(Qt.UserRole + 1, is_pending)
-            r += 1
+        pending_rows, completed_tasks = self._pending_and_completed_lists()
+        rows = _build_local_rows(
+            pending_rows, completed_tasks, keyword,
+            completed_expanded=self._completed_expanded, completed_limit=self._completed_shown,
+        )
+        self._set_table_rows(rows, select_first=True)
         if getattr(self, "_run_btn", None):
             self._run_btn.setEnabled(False)
-        if r > 0 and self.table.rowCount() > 0:
-            self.table.selectRow(0)
 
-    def _on_cell_double_clicked(self, row, column):
+    def _set_table_rows(self, rows, select_first=False):
+        """替换模型数据；分隔行跨整行显示（由模型角色着色，不放控件）。
+        填充期间暂停重绘与排序，span/选中等全部设置完后只重绘一次。"""
+        table = self.table
+        sorting = table.isSortingEnabled()
+        table.setUpdatesEnabled(False)
+        table.setSortingEnabled(False)
+        try:
+            self._model.set_rows(rows)
+            self._update_separator_span()
+            if select_first and rows:
+                table.selectRow(0)
+        finally:
+            table.setSortingEnabled(sorting)
+            table.setUpdatesEnabled(True)
+
+    def _update_separator_span(self):
+        """分段行跨整行；仅对已暴露给视图的分段行设置。"""
+        self.table.clearSpans()
+        for sep_row in self._model.section_rows():
+            self.table.setSpan(sep_row, 0, 1, self._model.columnCount())
+
+    def _on_table_clicked(self, index):
+        """点击分段行：展开/折叠已完成任务，或再多显示一页。"""
+        action = self._model.row_action(index.row())
+        if action is None:
+            return
+        if action == SECTION_EXPAND_DONE:
+            self._completed_expanded = True
+            self._completed_shown = _COMPLETED_PAGE
+        elif action == SECTION_COLLAPSE_DONE:
+            self._completed_expanded = False
+        elif action == SECTION_MORE_DONE:
+            self._completed_shown += _COMPLETED_PAGE
+        self._apply_filter()
+
+    def _on_search_return(self):
+        self._search_timer.stop()
+        self._apply_filter()
+
+    def _on_cell_double_clicked(self, index):
         """双击行打开任务详情（编辑）。"""
-        self.table.setCurrentCell(row, 0)
+        self.table.setCurrentIndex(self._model.index(index.row(), 0))
         if self._use_gateway_cron():
             if self._selected_gateway_job():
                 self._on_edit()
         else:
-            tid = self._selected_task_id()
-            if tid and self.table.item(row, 2) is not None:
+            if self._selected_task_id():
                 self._on_edit()
 
     def _selected_task_id(self):
-        row = self.table.currentRow()
-        if row < 0:
-            return None
-        it = self.table.item(row, 2)
-        return it.data(Qt.UserRole) if it else None
+        return self._model.row_tid(self.table.currentIndex().row())
 
     def _selected_gateway_job(self):
         """当前选中行的 Gateway job 对象（仅 Gateway 模式有效）。"""
-        row = self.table.currentRow()
-        if row < 0:
-            return None
-        it = self.table.item(row, 2)
-        if not it:
-            return None
-        job = it.data(Qt.UserRole + 1)
+        job = self._model.row_extra(self.table.currentIndex().row())
         return job if isinstance(job, dict) and job.get("id") else None
 
     def _selected_is_pending(self):
-        """当前选中行是否为未完成任务（分隔行或无 item 则为 False）"""
-        row = self.table.currentRow()
-        if row < 0:
-            return False
-        it = self.table.item(row, 2)
-        if not it:
-            return False
-        return bool(it.data(Qt.UserRole + 1))
+        """当前选中行是否为未完成任务（分隔行或未选中则为 False）"""
+        return bool(self._model.row_extra(self.table.currentIndex().row()))
 
     def _get_checked_task_ids(self):
         """返回所有勾选行的 task_id 或 job_id 列表（不含分隔行）。本地为 task_id，Gateway 为 job.id。"""
-        ids = []
-        for row in range(self.table.rowCount()):
-            it = self.table.item(row, 2)
-            if not it:
-                continue
-            tid = it.data(Qt.UserRole)
-            if not tid:
-                continue
-            w = self.table.cellWidget(row, 0)
-            if isinstance(w, QCheckBox) and w.isChecked():
-                ids.append(tid)
-        return ids
+        return self._model.checked_ids()
 
     def _on_add(self):
         if self._use_gateway_cron():
@@ -482,9 +838,12 @@ class TaskManagerWindow(QMainWindow):
                 schedule = {"kind": "every", "everyMs": int(interval_sec) * 1000}
             payload = {"kind": "systemEvent", "text": desc}
 
-            def on_done(ok_res, _pl, err):
+            def on_done(ok_res, pl, err):
                 if ok_res:
-                    self._refresh_table()
+                    # 响应带回新 job 时直接加入列表；否则（拿不到 id）才重新拉取 cron.list
+                    added = self._job_from_payload(pl)
+                    if added is None or not self._patch_gateway_job(added, append=True):
+                        self._schedule_reload()
                     QMessageBox.information(self, t("done_title"), t("task_done_added"))
                 else:
                     msg = (err or {}).get("message", str(err)) if isinstance(err, dict) else str(err)
@@ -540,7 +899,7 @@ class TaskManagerWindow(QMainWindow):
             return ok
         def done(ok):
             if ok:
-                self._refresh_table()
+                self._reload_jobs()
                 QMessageBox.information(self, t("done_title"), t("task_done_added"))
             else:
                 QMessageBox.warning(self, t("fail_title"), t("task_fail_add_id_conflict"))
@@ -567,18 +926,25 @@ class TaskManagerWindow(QMainWindow):
                 schedule = {"kind": "every", "everyMs": int(interval_sec) * 1000}
             payload = {"kind": "systemEvent", "text": desc}
 
-            def on_done(ok_res, _pl, err):
+            def on_done(ok_res, pl, err):
                 if ok_res:
-                    self._refresh_table()
+                    # 优先用响应中的 job；否则把已提交的 patch 合并到本地副本，不再请求 cron.list
+                    updated = self._job_from_payload(pl)
+                    if updated is None:
+                        updated = dict(job)
+                        updated.update(patch)
+                    if not self._patch_gateway_job(updated):
+                        self._schedule_reload()
                     QMessageBox.information(self, t("done_title"), t("task_done_updated"))
                 else:
                     msg = (err or {}).get("message", str(err)) if isinstance(err, dict) else str(err)
                     QMessageBox.warning(self, t("fail_title"), msg or t("task_fail_update"))
 
+            patch = {"name": desc, "schedule": schedule, "payload": payload}
             l2s.send_cron_update(
                 self.gateway_client,
                 job_id=job.get("id"),
-                patch={"name": desc, "schedule": schedule, "payload": payload},
+                patch=patch,
                 callback=on_done,
             )
             return
@@ -609,7 +975,7 @@ class TaskManagerWindow(QMainWindow):
             )
         def done(ok):
             if ok:
-                self._refresh_table()
+                self._reload_jobs()
                 QMessageBox.information(self, t("done_title"), t("task_done_updated"))
             else:
                 QMessageBox.warning(self, t("fail_title"), t("task_fail_update"))
@@ -631,7 +997,7 @@ class TaskManagerWindow(QMainWindow):
 
             def on_done(ok_res, _pl, err):
                 if ok_res:
-                    self._refresh_table()
+                    self._drop_gateway_jobs([job.get("id")])
                 else:
                     msg = (err or {}).get("message", str(err)) if isinstance(err, dict) else str(err)
                     QMessageBox.warning(self, t("fail_title"), msg or t("task_fail_del"))
@@ -651,7 +1017,7 @@ class TaskManagerWindow(QMainWindow):
             return
         ok = self.task_manager.delete_task(tid)
         if ok:
-            self._refresh_table()
+            self._reload_jobs()
             if getattr(self, "table", None) and self.table.viewport():
                 self.table.viewport().update()
         else:
@@ -666,9 +1032,12 @@ class TaskManagerWindow(QMainWindow):
             QMessageBox.information(self, t("tip_title"), t("task_please_select_to_run"))
             return
 
-        def on_done(ok_res, _pl, err):
+        def on_done(ok_res, pl, err):
             if ok_res:
-                self._refresh_table()
+                # 运行一次不改动任务定义；若响应带回最新 job 则就地更新，否则不再额外请求 cron.list（可点「查询」刷新状态）
+                updated = self._job_from_payload(pl)
+                if updated is not None:
+                    self._patch_gateway_job(updated)
                 QMessageBox.information(self, t("done_title"), t("task_done_run_once"))
             else:
                 msg = (err or {}).get("message", str(err)) if isinstance(err, dict) else str(err)
@@ -689,17 +1058,13 @@ class TaskManagerWindow(QMainWindow):
                 QMessageBox.No,
             ) != QMessageBox.Yes:
                 return
-            remaining = len(ids)
-            done = [0]
 
-            def per_done(ok_res, _pl, err):
-                done[0] += 1
-                if done[0] >= remaining:
-                    self._refresh_table()
-                    QMessageBox.information(self, t("done_title"), t("task_done_deleted_fmt") % remaining)
+            def on_done(_ok, result, _err):
+                removed = (result or {}).get("removed") or []
+                self._drop_gateway_jobs(removed)
+                QMessageBox.information(self, t("done_title"), t("task_done_deleted_fmt") % len(removed))
 
-            for jid in ids:
-                l2s.send_cron_remove(self.gateway_client, job_id=jid, callback=per_done)
+            l2s.send_cron_remove_many(self.gateway_client, ids, callback=on_done)
             return
         if not self.task_manager:
             QMessageBox.warning(self, t("tip_title"), t("task_no_manager_short"))
@@ -715,7 +1080,7 @@ class TaskManagerWindow(QMainWindow):
         for tid in ids:
             if self.task_manager.delete_task(tid):
                 ok_count += 1
-        self._refresh_table()
+        self._reload_jobs()
         if getattr(self, "table", None) and self.table.viewport():
             self.table.viewport().update()
         QMessageBox.information(self, t("done_title"), t("task_done_deleted_fmt") % ok_count)
@@ -2,167 +2,74 @@
 UI 配置加载与保存：从 config/ui_settings.json 读取窗口/弹窗/字体等参数，变更时写回文件。
 所有 UI 相关硬编码应改为通过 get_ui_setting / set_ui_setting_and_save 读写。
 """
+import atexit
 import json
 import os
-import copy
+from functools import lru_cache
 from typing import Any, Optional
 
 from utils.logger import logger
+from utils.json_io import write_json_atomic
 
 _ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 _UI_SETTINGS_FILE = os.path.join(_ROOT, "config", "ui_settings.json")
+_UI_SETTINGS_DEFAULT_FILE = os.path.join(_ROOT, "config", "ui_settings.default.json")
 _cache: Optional[dict] = None
+# _cache 对应的文件 (st_mtime_ns, st_size)；文件未变时 reload 跳过读盘解析
+_cache_stat: Optional[tuple] = None
+# get_ui_setting 的路径 -> 值缓存；_cache 被替换或写入时清空
+_path_values: dict = {}
+_path_values_src: Optional[dict] = None
+# 内存已改、尚未写盘；短时间内多次写入合并为一次 flush
+_save_pending = False
+_SAVE_DEBOUNCE_MS = 200
+
+
+def _load_default_ui_settings() -> dict:
+    """读取内置默认结构 config/ui_settings.default.json，用户文件缺失或损坏时使用。"""
+    try:
+        with open(_UI_SETTINGS_DEFAULT_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        logger.error(f"加载 config/ui_settings.default.json 失败: {e}")
+        return {}
+
+
+# 默认结构只在导入时读取一次，视为只读；需要修改时先 _json_clone
+_DEFAULT_UI_SETTINGS = _load_default_ui_settings()
+
 
+def _json_clone(x: Any) -> Any:
+    """复制纯 JSON 树（dict/list/标量），比 copy.deepcopy 少走 memo 分派。"""
+    t = type(x)
+    if t is dict:
+        return {k: _json_clone(v) for k, v in x.items()}
+    if t is list:
+        return [_json_clone(i) for i in x]
+    return x
 
-def _default_ui_settings() -> dict:
-    """内置默认结构，文件缺失或损坏时使用。"""
-    return {
-        "_version": "1.0",
-        "font": {
-            "chat": {
-                "default_pt": 15,
-                "min_pt": 10,
-                "max_pt": 28,
-                "options": [
-                    {"label": "小", "pt": 10},
-                    {"label": "中", "pt": 15},
-                    {"label": "大", "pt": 20},
-                    {"label": "超大", "pt": 26},
-                ],
-            },
-            "body_pt": {"macos": 11, "windows": 10},
-            "title_pt": {"macos": 12, "windows": 11},
-            "menu_pt": {"macos": 12, "windows": 10},
-            "small_pt": {"macos": 10, "windows": 9},
-            "bubble_default_pt": {"macos": 15, "windows": 14},
-        },
-        "chat_window": {
-            "geometry": {"x": 350, "y": 150, "width": 500, "height": 600},
-            "session_label": {"font_size_px": 12, "color": "#6b7280"},
-            "input_edit": {"max_height_px": 84},
-            "max_display_messages": 200,
-            "message_display": {
-                "msg_time_font_size_px": 11,
-                "msg_time_color": "#888",
-                "user_msg": {
-                    "background": "#90EE90",
-                    "padding": "8px 12px",
-                    "border_radius_px": 8,
-                    "max_width_pct": 80,
-                },
-                "system_msg_color": "#666",
-                "body_padding_px": 4,
-            },
-        },
-        "chat_window_popup": {
-            "size_presets": {
-                "small": {"min_width_px": 220, "max_height_px": 200},
-                "medium": {"min_width_px": 280, "max_height_px": 280},
-                "large": {"min_width_px": 360, "max_height_px": 360},
-            },
-            "default_size": "small",
-            "list_row_height_px": 24,
-            "list_padding_px": 2,
-            "style": {
-                "background": "#fff",
-                "border": "1px solid #e5e7eb",
-                "border_radius_px": 6,
-            },
-        },
-        "settings_window": {
-            "geometry": {"x": 400, "y": 200, "width": 480, "height": 560},
-            "title": {"font_size_px": 20, "font_weight": 600, "color": "#111827"},
-            "card": {
-                "border": "1px solid #e5e7eb",
-                "border_radius_px": 10,
-                "margin_top_px": 12,
-                "padding": "16px 14px 10px 14px",
-                "title_font_size_px": 13,
-                "title_color": "#374151",
-            },
-            "desc": {"font_size_px": 12, "color": "#6b7280"},
-            "button": {
-                "min_height_px": 40,
-                "primary": {"background": "#2563eb", "border_radius_px": 8},
-                "secondary": {
-                    "background": "#f3f4f6",
-                    "border": "1px solid #e5e7eb",
-                    "border_radius_px": 8,
-                },
-            },
-            "form_control": {
-                "padding": "6px 10px",
-                "border": "1px solid #e5e7eb",
-                "border_radius_px": 6,
-                "min_height_px": 20,
-            },
-        },
-        "gateway_settings_window": {
-            "title": {"font_size_px": 18, "font_weight": 600, "color": "#111827"},
-            "status_text": {"font_size_px": 13, "color": "#6b7280"},
-            "desc": {"font_size_px": 12, "color": "#6b7280"},
-        },
-        "session_list_window": {
-            "geometry": {"x": 300, "y": 200, "width": 520, "height": 560},
-            "list": {"max_height_px": 160, "font_size_px": 11},
-            "menubar_style": "QMenuBar::item { padding: 6px 14px; border-radius: 4px; }",
-        },
-        "task_manager_window": {
-            "geometry": {"x": 320, "y": 200, "width": 640, "height": 420},
-            "banner": {"font_size_px": 12, "color": "#6b7280", "padding_px": 8},
-        },
-        "config_setting_window": {
-            "geometry": {"x": 200, "y": 150, "width": 420, "height": 200},
-            "status_label": {"font_size_px": 12, "color": "#6b7280"},
-            "read_only_dialog": {"padding_px": 8, "border": "1px solid #e5e7eb", "border_radius_px": 6},
-            "edit_dialog": {"padding_px": 8, "border_radius_px": 6},
-        },
-        "log_tail_window": {
-            "geometry": {"x": 200, "y": 150, "width": 800, "height": 500},
-            "path_label": {"font_size_px": 11, "color": "#6b7280"},
-        },
-        "startup_dialog": {
-            "geometry": {"width": 520, "height": 480},
-            "min_size": {"width": 480, "height": 460},
-            "host_edit_min_width_px": 280,
-            "port_edit_max_width_px": 100,
-            "token_edit_min_width_px": 280,
-        },
-        "speech_bubble": {
-            "default_duration_ms": 15000,
-            "gap_above_assistant_px": 2,
-            "tail": {"width_px": 14, "height_px": 12},
-            "border_px": 2,
-            "radius_px": 8,
-            "chars_per_line": 22,
-            "lines_height": 10,
-            "close_button_size_px": 20,
-            "max_width_px": 400,
-        },
-        "colors": {
-            "window_bg": {"macos": "#f5f5f7", "windows": "#f0f0f0"},
-            "button_bg": {"macos": "#e8e8ed", "windows": "#e0e0e0"},
-            "card_border": "#e5e7eb",
-            "text_muted": "#6b7280",
-            "text_primary": "#111827",
-        },
-    }
-
-
-def _deep_merge(base: dict, override: dict) -> dict:
-    """递归合并 override 到 base，override 优先。不修改 base。"""
-    result = copy.deepcopy(base)
+
+def _deep_merge_into(base: dict, override: dict) -> dict:
+    """递归把 override 合并进 base（override 优先），原地修改并返回 base。
+    override 的值直接挂入 base 不再复制，调用方需保证两者都不再被别处引用。"""
     for k, v in override.items():
-        if k in result and isinstance(result[k], dict) and isinstance(v, dict):
-            result[k] = _deep_merge(result[k], v)
+        cur = base.get(k)
+        if isinstance(cur, dict) and isinstance(v, dict):
+            _deep_merge_into(cur, v)
         else:
-            result[k] = copy.deepcopy(v)
-    return result
+            base[k] = v
+    return base
+
+
+@lru_cache(maxsize=256)
+def _split_path(path: str) -> tuple:
+    """点分路径拆成键元组（缓存，UI 反复使用同一批字面量路径）。"""
+    return tuple(path.strip().split("."))
 
 
 def _get_by_path(data: dict, path: str) -> Any:
     """按点分路径取值，如 'chat_window.geometry.width'。"""
-    keys = path.strip().split(".")
+    keys = _split_path(path)
     cur = data
     for k in keys:
         if not isinstance(cur, dict) or k not in cur:
@@ -173,7 +80,7 @@ def _get_by_path(data: dict, path: str) -> Any:
 
 def _set_by_path(data: dict, path: str, value: Any) -> None:
     """按点分路径设值，缺失的中间层会建为 dict。"""
-    keys = path.strip().split(".")
+    keys = _split_path(path)
     cur = data
     for k in keys[:-1]:
         if k not in cur or not isinstance(cur.get(k), dict):
@@ -182,61 +89,127 @@ def _set_by_path(data: dict, path: str, value: Any) -> None:
     cur[keys[-1]] = value
 
 
+def _file_stat() -> Optional[tuple]:
+    """ui_settings.json 的 (st_mtime_ns, st_size)；文件不存在返回 None，其它错误抛 OSError。"""
+    try:
+        st = os.stat(_UI_SETTINGS_FILE)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
 def load_ui_settings(reload_from_disk: bool = False) -> dict:
-    """加载 UI 配置：先与默认合并，再返回。默认使用缓存；reload_from_disk=True 时强制从文件重读。"""
-    global _cache
-    if _cache is not None and not reload_from_disk:
+    """加载 UI 配置：先与默认合并，再返回。默认使用缓存；reload_from_disk=True 时仅在文件 mtime/大小变化时重读。"""
+    global _cache, _cache_stat
+    if _cache is not None and (not reload_from_disk or _save_pending):
+        # 有未写盘的修改时内存比文件新，不重读
+        return _cache
+    try:
+        stat = _file_stat()
+    except OSError as e:
+        if _cache is not None:
+            # stat 失败时沿用已有缓存
+            return _cache
+        logger.warning(f"读取 config/ui_settings.json 状态失败，使用默认: {e}")
+        stat = None
+    if _cache is not None and stat is not None and stat == _cache_stat:
         return _cache
-    default = _default_ui_settings()
-    if not os.path.isfile(_UI_SETTINGS_FILE):
-        _cache = default
+    _cache_stat = stat
+    if stat is None:
+        # 无文件时直接共享只读默认树，写入前再复制
+        _cache = _DEFAULT_UI_SETTINGS
         return _cache
     try:
         with open(_UI_SETTINGS_FILE, "r", encoding="utf-8") as f:
             file_data = json.load(f)
     except (OSError, json.JSONDecodeError) as e:
         logger.warning(f"加载 config/ui_settings.json 失败，使用默认: {e}")
-        _cache = default
+        _cache = _DEFAULT_UI_SETTINGS
         return _cache
     # 去掉注释类键再合并，避免写入时带注释
     file_data = {k: v for k, v in file_data.items() if not k.startswith("_") and k != "comment"}
-    _cache = _deep_merge(default, file_data)
+    if not file_data:
+        # 无有效覆盖项时与默认完全相同，免去复制与合并
+        _cache = _DEFAULT_UI_SETTINGS
+        return _cache
+    # 复制出的默认树与 file_data 均为本次新建，可原地合并
+    _cache = _deep_merge_into(_json_clone(_DEFAULT_UI_SETTINGS), file_data)
     return _cache
 
 
 def get_ui_setting(path: str, default: Any = None) -> Any:
     """按路径读取一项，如 get_ui_setting('chat_window.geometry.width')。"""
+    global _path_values_src
     data = load_ui_settings()
-    val = _get_by_path(data, path)
+    if data is not _path_values_src:
+        _path_values.clear()
+        _path_values_src = data
+    try:
+        val = _path_values[path]
+    except KeyError:
+        val = _path_values[path] = _get_by_path(data, path)
     return val if val is not None else default
 
 
-def set_ui_setting_and_save(path: str, value: Any) -> None:
-    """设置一项并立即写回 config/ui_settings.json。"""
-    global _cache
-    data = load_ui_settings()
-    _set_by_path(data, path, value)
-    _cache = data
+def flush_ui_settings() -> None:
+    """把待写入的 UI 配置立即写回 config/ui_settings.json；无待写内容时不操作。"""
+    global _save_pending, _cache_stat
+    if not _save_pending or _cache is None:
+        return
+    _save_pending = False
     try:
         # 写入时排除纯注释键
-        to_write = {k: v for k, v in data.items() if not k.startswith("_") and k != "comment"}
-        with open(_UI_SETTINGS_FILE, "w", encoding="utf-8") as f:
-            json.dump(to_write, f, indent=2, ensure_ascii=False)
+        to_write = {k: v for k, v in _cache.items() if not k.startswith("_") and k != "comment"}
+        # 先写临时文件再替换，写到一半中断不会留下残缺的 ui_settings.json
+        write_json_atomic(_UI_SETTINGS_FILE, to_write)
+        # 记录写后的文件状态，下次 reload 命中缓存
+        _cache_stat = _file_stat()
     except OSError as e:
         logger.warning(f"保存 config/ui_settings.json 失败: {e}")
 
 
+def _schedule_flush() -> None:
+    """有 Qt 事件循环时延迟 _SAVE_DEBOUNCE_MS 统一写盘；否则留给退出时的 atexit flush。"""
+    global _save_pending
+    if _save_pending:
+        return
+    _save_pending = True
+    try:
+        from PyQt5.QtCore import QCoreApplication, QTimer
+    except ImportError:
+        return
+    if QCoreApplication.instance() is not None:
+        QTimer.singleShot(_SAVE_DEBOUNCE_MS, flush_ui_settings)
+
+
+atexit.register(flush_ui_settings)
+
+
+def _writable_cache() -> dict:
+    """返回可原地修改的 _cache（仍共享只读默认树时先复制），并使路径取值缓存失效。"""
+    global _cache
+    data = load_ui_settings()
+    if data is _DEFAULT_UI_SETTINGS:
+        data = _cache = _json_clone(data)
+    _path_values.clear()
+    return data
+
+
+def set_ui_setting_and_save(path: str, value: Any) -> None:
+    """设置一项并写回 config/ui_settings.json（内存立即生效，写盘经短暂防抖合并）。"""
+    _set_by_path(_writable_cache(), path, value)
+    _schedule_flush()
+
+
 def save_ui_settings_geometry(section: str, x: int, y: int, width: int, height: int) -> None:
     """保存某窗口的 geometry 到 ui_settings（section 如 'chat_window'、'settings_window'）。"""
-    path = f"{section}.geometry"
-    data = load_ui_settings()
-    geom = _get_by_path(data, path)
+    data = _writable_cache()
+    sec = data.get(section)
+    if not isinstance(sec, dict):
+        sec = data[section] = {}
+    geom = sec.get("geometry")
     if isinstance(geom, dict):
-        geom = dict(geom)
+        geom.update(x=x, y=y, width=width, height=height)
     else:
-        geom = {}
-    geom["x"] = x
-    geom["y"] = y
-    geom["width"] = width
-    geom["height"] = height
-    set_ui_setting_and_save(path, geom)
+        sec["geometry"] = {"x": x, "y": y, "width": width, "height": height}
+    _schedule_flush()
@@ -2,12 +2,42 @@
 简单线程执行器：把阻塞任务放到后台线程，回调在主线程触发（如可用）。
 注意：从工作线程调用 QTimer.singleShot 会绑定到工作线程，因无事件循环回调永不执行，
 故使用主线程 QObject 的信号槽（QueuedConnection）将回调投递到主线程执行。
+回调先放入队列，同一批回调只发一次唤醒信号，主线程一次取空。
 """
+import queue
 import threading
+from concurrent.futures import Future
 from utils.logger import logger
 
 # 主线程中的 QObject，用于接收工作线程发来的回调并在主线程执行
 _main_thread_receiver = None
+# 待在主线程执行的回调；_wake_posted 表示已有唤醒信号在途，避免每个回调各投递一个事件
+_pending_callbacks = queue.SimpleQueue()
+_wake_lock = threading.Lock()
+_wake_posted = False
+# run_in_thread 共用的常驻工作线程：按需创建、最多 _MAX_WORKERS 个，空闲线程复用。
+# 使用 daemon 线程而非 ThreadPoolExecutor：后者退出时会等待正在执行的阻塞任务（如 SSH/Gateway 连接等待），导致退出卡住
+_work_queue = queue.SimpleQueue()
+_idle_workers = threading.Semaphore(0)
+_workers_lock = threading.Lock()
+_worker_count = 0
+_MAX_WORKERS = 8
+
+
+def _drain_pending_callbacks():
+    """主线程中依次执行队列内的全部回调。"""
+    global _wake_posted
+    with _wake_lock:
+        _wake_posted = False
+    while True:
+        try:
+            fn = _pending_callbacks.get_nowait()
+        except queue.Empty:
+            return
+        try:
+            fn()
+        except Exception as e:
+            logger.exception(f"主线程回调失败: {e}")
 
 
 def _get_main_thread_receiver():
@@ -18,16 +48,12 @@ def _get_main_thread_receiver():
             from PyQt5.QtCore import QObject, pyqtSignal
 
             class _CallbackReceiver(QObject):
-                run = pyqtSignal(object)  # 参数为可调用对象
+                wake = pyqtSignal()
 
                 def __init__(self):
                     super().__init__()
                     from PyQt5.QtCore import Qt
-                    self.run.connect(self._run, Qt.QueuedConnection)
-
-                def _run(self, fn):
-                    if callable(fn):
-                        fn()
+                    self.wake.connect(_drain_pending_callbacks, Qt.QueuedConnection)
             _main_thread_receiver = _CallbackReceiver()
         except Exception:
             pass
@@ -36,37 +62,71 @@ def _get_main_thread_receiver():
 
 def _invoke_on_main_thread(fn):
     """将 fn 投递到主线程执行。若在工作线程中调用，必须通过主线程 QObject 的信号，否则回调不会执行。"""
+    global _wake_posted
     try:
         rec = _get_main_thread_receiver()
-        if rec is not None:
-            rec.run.emit(fn)
-        else:
-            fn()
     except Exception:
+        rec = None
+    if rec is None:
         fn()
+        return
+    _pending_callbacks.put(fn)
+    with _wake_lock:
+        if _wake_posted:
+            return
+        _wake_posted = True
+    rec.wake.emit()
+
+
+def _run_and_report(func, on_done, on_error):
+    """在工作线程执行 func，结果/异常投递回主线程。"""
+    try:
+        result = func()
+    except Exception as exc:
+        if on_error:
+            _invoke_on_main_thread(lambda: on_error(exc))
+        else:
+            logger.exception(f"后台任务失败: {exc}")
+        return
+    if on_done:
+        _invoke_on_main_thread(lambda: on_done(result))
+
+
+def _worker_loop():
+    """工作线程：取任务执行，执行完标记空闲后继续等待。"""
+    while True:
+        future, args = _work_queue.get()
+        if future.set_running_or_notify_cancel():
+            try:
+                future.set_result(_run_and_report(*args))
+            except BaseException as exc:
+                future.set_exception(exc)
+        _idle_workers.release()
+
+
+def _submit(*args):
+    """投递任务：有空闲线程则复用，否则在上限内新建 daemon 线程。"""
+    global _worker_count
+    future = Future()
+    _work_queue.put((future, args))
+    if _idle_workers.acquire(blocking=False):
+        return future
+    with _workers_lock:
+        if _worker_count < _MAX_WORKERS:
+            _worker_count += 1
+            threading.Thread(
+                target=_worker_loop, name=f"claw-async_{_worker_count}", daemon=True
+            ).start()
+    return future
 
 
 def run_in_thread(func, on_done=None, on_error=None):
     """
-    在后台线程执行 func，并在主线程触发回调。
+    在后台线程（复用常驻 daemon 线程，不再每次新建线程）执行 func，并在主线程触发回调；返回 Future。
     - on_done(result)
     - on_error(exc)
     """
-    # 在启动线程前于当前线程（通常为主线程）创建 receiver，保证其属于主线程
+    # 在提交任务前于当前线程（通常为主线程）创建 receiver，保证其属于主线程
     _get_main_thread_receiver()
+    return _submit(func, on_done, on_error)
 
-    def _worker():
-        try:
-            result = func()
-        except Exception as exc:
-            if on_error:
-                _invoke_on_main_thread(lambda: on_error(exc))
-            else:
-                logger.exception(f"后台任务失败: {exc}")
-            return
-        if on_done:
-            _invoke_on_main_thread(lambda: on_done(result))
-
-    t = threading.Thread(target=_worker, daemon=True)
-    t.start()
-    return t
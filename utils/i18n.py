@@ -4,7 +4,7 @@
 get_locale() 带短时缓存，避免每次 t() 都读盘导致界面卡顿。
 """
 import time
-from typing import Optional
+from typing import Callable, Optional, Tuple
 
 # locale 缓存：避免每次 t() 都 Settings().load() 造成英文界面卡顿
 _LOCALE_CACHE: Optional[str] = None
@@ -390,6 +390,8 @@ _STRINGS = {
     "task_enabled": {"zh": "启用", "en": "Enabled"},
     "task_disabled": {"zh": "禁用", "en": "Disabled"},
     "task_section_done": {"zh": "————— 已完成任务 —————", "en": "——— Done ———"},
+    "task_section_done_collapsed": {"zh": "————— 已完成任务（点击展开）—————", "en": "——— Done (click to show) ———"},
+    "task_completed_more_fmt": {"zh": "显示更多（还有 %d 条）", "en": "Show more (%d left)"},
     "task_unnamed": {"zh": "(无名称)", "en": "(unnamed)"},
     "log_remote_saved_fmt": {"zh": "远程 Gateway（已落盘: %s）", "en": "Remote Gateway (saved: %s)"},
     "skill_detail_title": {"zh": "技能详情", "en": "Skill detail"},
@@ -459,10 +461,28 @@ def invalidate_locale_cache() -> None:
     _LOCALE_CACHE = None
 
 
+def _lookup(key: str, loc: str, fallback: Optional[str] = None) -> str:
+    row = _STRINGS.get(key)
+    if row is None:
+        return fallback if fallback is not None else key
+    return row.get(loc) or row.get("zh") or fallback or key
+
+
 def t(key: str, fallback: Optional[str] = None) -> str:
     """按当前语言返回 key 对应文案；无 key 时返回 fallback 或 key。"""
+    return _lookup(key, get_locale(), fallback)
+
+
+def t_many(*keys: str) -> Tuple[str, ...]:
+    """一次解析 locale，按顺序返回多个 key 的文案。"""
     loc = get_locale()
-    if key not in _STRINGS:
-        return fallback if fallback is not None else key
-    row = _STRINGS[key]
-    return row.get(loc) or row.get("zh") or fallback or key
+    return tuple(_lookup(k, loc) for k in keys)
+
+
+def translator() -> Callable[..., str]:
+    """返回绑定当前 locale 的 t()，供一次性构建大量界面文案时使用（如窗口 __init__），避免逐条解析 locale。"""
+    loc = get_locale()
+
+    def _t(key: str, fallback: Optional[str] = None) -> str:
+        return _lookup(key, loc, fallback)
+    return _t
@@ -0,0 +1,37 @@
+"""
+JSON 落盘工具：先写同目录临时文件再 os.replace 替换，避免写到一半崩溃留下残缺的配置文件。
+"""
+import json
+import os
+import tempfile
+
+
+def dumps_json(data) -> str:
+    """项目统一的 JSON 文本格式（2 空格缩进、保留中文）。"""
+    return json.dumps(data, indent=2, ensure_ascii=False)
+
+
+def write_text_atomic(path: str, text: str) -> None:
+    """将 text 原子写入 path；失败时抛出 OSError 并清理临时文件。
+    临时文件名唯一（同目录 mkstemp），多个线程同时写同一路径时不会互相截断或替换对方的临时文件。"""
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=os.path.dirname(path) or ".")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        try:
+            # mkstemp 建的文件为 0600；沿用原文件权限，避免每次保存改变权限
+            os.chmod(tmp_path, os.stat(path).st_mode & 0o7777)
+        except FileNotFoundError:
+            pass
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def write_json_atomic(path: str, data) -> None:
+    """序列化 data 并原子写入 path。"""
+    write_text_atomic(path, dumps_json(data))
@@ -9,21 +9,30 @@ import re
 import sys
 import os
 
+_RE_FRONTMATTER = re.compile(r"^---\s*\n(.*?)\n---\s*\n", re.DOTALL)
+_RE_KEY = re.compile(r"^\w[\w-]*\s*:")
+_RE_MENTION = re.compile(r'[Mm]ention\s+"([^"]+)"')
+_RE_TRIGGER = re.compile(r'-\s*"([^"]+)"')
+_RE_SLUG_STRIP = re.compile(r"[^\w\s-]")
+_RE_SLUG_SPACES = re.compile(r"[\s_]+")
+_RE_SLUG_DASHES = re.compile(r"-+")
+_RE_SLUG_WS = re.compile(r"\s+")
+
 
 def _slug(s):
     """将 name 转为 snake_case 技能 id，如 bash-script-helper -> bash_script_helper"""
     if not s:
         return "skill"
-    s = re.sub(r"[^\w\s-]", "", s)
-    s = re.sub(r"[\s_]+", " ", s)
-    s = re.sub(r"-+", "_", s.strip()).strip()
-    return re.sub(r"\s+", "_", s).lower() or "skill"
+    s = _RE_SLUG_STRIP.sub("", s)
+    s = _RE_SLUG_SPACES.sub(" ", s)
+    s = _RE_SLUG_DASHES.sub("_", s.strip()).strip()
+    return _RE_SLUG_WS.sub("_", s).lower() or "skill"
 
 
 def _parse_frontmatter(text):
     """解析 --- ... --- 中的 YAML 风格键值。"""
     fm = {}
-    m = re.match(r"^---\s*\n(.*?)\n---\s*\n", text, re.DOTALL)
+    m = _RE_FRONTMATTER.match(text)
     if not m:
         return fm, text
     block = m.group(1)
@@ -37,7 +46,7 @@ def _parse_frontmatter(text):
                 key = None
                 value_lines = []
             continue
-        if re.match(r"^\w[\w-]*\s*:", line):
+        if _RE_KEY.match(line):
             if key:
                 fm[key] = "\n".join(value_lines).strip()
                 value_lines = []
@@ -62,17 +71,17 @@ def _parse_sections(body):
     """按 ## 标题切分正文，返回 { "Section Title": "content..." }。"""
     sections = {}
     current = None
-    lines = []
-    for line in body.split("\n"):
+    # 首个 ## 标题之前 lines 为 None，标题前的正文直接丢弃
+    lines = None
+    for line in body.splitlines():
         if line.startswith("## "):
-            if current is not None:
+            if lines is not None:
                 sections[current] = "\n".join(lines).strip()
             current = line[3:].strip()
             lines = []
-        else:
-            if current is not None:
-                lines.append(line)
-    if current is not None:
+        elif lines is not None:
+            lines.append(line)
+    if lines is not None:
         sections[current] = "\n".join(lines).strip()
     return sections
 
@@ -81,11 +90,11 @@ def _extract_keywords(description, sections):
     """从 description 与 Example Triggers 等段落提取关键词列表。"""
     keywords = []
     # 从 description 中 "Mention \"...\" in your request" 提取
-    for m in re.finditer(r'[Mm]ention\s+"([^"]+)"', description or ""):
+    for m in _RE_MENTION.finditer(description or ""):
         keywords.append(m.group(1).strip())
     # Example Triggers 的列表项（- "xxx"）
     triggers = sections.get("Example Triggers") or sections.get("Example triggers") or ""
-    for m in re.finditer(r'-\s*"([^"]+)"', triggers):
+    for m in _RE_TRIGGER.finditer(triggers):
         keywords.append(m.group(1).strip())
     for line in (triggers or "").split("\n"):
         line = line.strip()
@@ -115,14 +124,11 @@ def md_skill_to_json(md_path, out_path=None):
     purpose = sections.get("Purpose", "").strip()
     when = sections.get("When to Use", "").strip()
     caps = sections.get("Capabilities", "").strip()
-    prompt_parts = []
-    if purpose:
-        prompt_parts.append(f"【目的】{purpose}")
-    if when:
-        prompt_parts.append(f"【适用场景】{when}")
-    if caps:
-        prompt_parts.append(f"【能力】{caps}")
-    prompt = "\n".join(prompt_parts) if prompt_parts else f"根据技能「{title}」的说明响应用户请求。"
+    prompt = (
+        (f"【目的】{purpose}\n" if purpose else "")
+        + (f"【适用场景】{when}\n" if when else "")
+        + (f"【能力】{caps}" if caps else "")
+    ).rstrip("\n") or f"根据技能「{title}」的说明响应用户请求。"
     prompt = f"【任务】{prompt}\n【要求】语气友好、简洁，直接输出回复内容，50–200 字；不要重复用户问题或加「好的」等前缀。"
     keywords = _extract_keywords(description, sections)
     if not keywords:
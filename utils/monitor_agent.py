@@ -8,17 +8,24 @@ import os
 import sqlite3
 import threading
 import time
+import weakref
+from collections import deque
 from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
-from typing import Callable, List, Optional
+from typing import Callable, Optional, Tuple
 
 from .logger import logger
 from .platform_adapter import is_macos
 
+# 大于该值的时间戳视为毫秒
+_MS_THRESHOLD = 10_000_000_000
+
 CURSOR_ACTIVITY_MESSAGE = "主人，检测到 Cursor 客户端干完活了，需要你去看一下噢？"
 
-# 进程内只允许启动一个 Cursor 监控线程，避免重复启动
-_cursor_monitor_started = False
+# find_cursor_dir 已找到的目录，按 search_roots 缓存；数据库打开失败时清除
+_cursor_dir_cache = {}
+_cursor_dir_lock = threading.Lock()
 
 TIME_CANDIDATES = [
     "created_at",
@@ -31,37 +38,115 @@ TIME_CANDIDATES = [
 ]
 
 
-def _cursor_dir_candidates() -> List[Path]:
-    """各平台下 Cursor 数据目录的候选路径（含 ai-tracking 的目录）。优先返回常见路径。"""
-    home = Path.home()
-    candidates = []
+@lru_cache(maxsize=1)
+def _cursor_dir_candidates() -> Tuple[str, ...]:
+    """各平台下 Cursor 数据目录的候选路径（str，含 ai-tracking 的目录）。优先返回常见路径。"""
+    home = os.fspath(Path.home())
     # 通用：用户主目录下的 .cursor
-    candidates.append(home / ".cursor")
+    candidates = [os.path.join(home, ".cursor")]
     if is_macos():
         # macOS：Application Support 下 Cursor 也常见
-        candidates.append(home / "Library" / "Application Support" / "Cursor")
-    return candidates
+        candidates.append(os.path.join(home, "Library", "Application Support", "Cursor"))
+    return tuple(candidates)
 
 
-def normalize_timestamp(value):
-    """将时间戳值规范化为 (raw_ts, seconds, local_dt)，支持秒/毫秒。"""
+# 递归查找 .cursor 时跳过的大目录（依赖、缓存、媒体库等，不会含 Cursor 数据）
+_SCAN_SKIP_DIRS = frozenset({
+    "node_modules", ".git", ".hg", ".svn", "__pycache__", ".venv", "venv",
+    ".cache", "Caches", "Pictures", "Movies", "Music", "Photos Library.photoslibrary",
+    "AppData",
+})
+
+
+def _scan_for_cursor_dir(root, max_depth=4, max_entries=20000):
+    """
+    在 root 下按层（BFS）查找 .cursor 目录，最多 max_depth 层、max_entries 个目录项，跳过 _SCAN_SKIP_DIRS。
+    返回 (含 ai-tracking 的 .cursor, 首个不含 ai-tracking 的 .cursor)，未找到为 None。
+    """
+    fallback = None
+    seen = 0
+    queue = deque([(os.fspath(root), 0)])
+    while queue:
+        path, depth = queue.popleft()
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    seen += 1
+                    if seen > max_entries:
+                        return None, fallback
+                    try:
+                        if not entry.is_dir(follow_symlinks=False):
+                            continue
+                    except OSError:
+                        continue
+                    if entry.name == ".cursor":
+                        c = Path(entry.path)
+                        if (c / "ai-tracking").exists():
+                            return c, fallback
+                        if fallback is None:
+                            fallback = c
+                    elif depth + 1 < max_depth and entry.name not in _SCAN_SKIP_DIRS:
+                        queue.append((entry.path, depth + 1))
+        except OSError:
+            continue
+    return None, fallback
+
+
+def _forget_cursor_dir(cursor_dir) -> None:
+    """从缓存中移除 cursor_dir（目录被移走或数据库不可用时），下次 find_cursor_dir 重新查找。"""
+    with _cursor_dir_lock:
+        for key in [k for k, v in _cursor_dir_cache.items() if v == cursor_dir]:
+            del _cursor_dir_cache[key]
+
+
+def _quote_ident(name):
+    """SQLite 标识符加双引号转义，表名/列名来自 sqlite_master，可能含空格或关键字。"""
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _timestamp_seconds(value):
+    """将时间戳值规范化为 (raw_ts, seconds)，支持秒/毫秒；不构造 datetime，供轮询比较使用。"""
     if value is None:
         return None
-    try:
-        ts = int(value)
-    except (TypeError, ValueError):
-        return None
-    if ts > 10_000_000_000:
-        seconds = ts / 1000
+    if isinstance(value, int):
+        ts = value
+    elif isinstance(value, str):
+        # 先做字符判断，非数字文本（如 ISO 日期）不走 int() 抛异常的路径
+        text = value.strip()
+        digits = text[1:] if text[:1] in "+-" else text
+        if not (digits.isascii() and digits.isdigit()):
+            return None
+        ts = int(text)
     else:
-        seconds = ts
-    local_dt = datetime.fromtimestamp(seconds, tz=timezone.utc).astimezone()
-    return ts, seconds, local_dt
+        try:
+            ts = int(value)
+        except (TypeError, ValueError, OverflowError):
+            return None
+    seconds = ts / 1000 if ts > _MS_THRESHOLD else ts
+    return ts, seconds
+
+
+def _local_datetime(seconds):
+    """秒级时间戳转本地时区 datetime。"""
+    return datetime.fromtimestamp(seconds, tz=timezone.utc).astimezone()
+
+
+def normalize_timestamp(value):
+    """将时间戳值规范化为 (raw_ts, seconds, local_dt)，支持秒/毫秒。"""
+    parsed = _timestamp_seconds(value)
+    if parsed is None:
+        return None
+    ts, seconds = parsed
+    return ts, seconds, _local_datetime(seconds)
 
 
 class CursorDbMonitor:
     """监控 Cursor ai-tracking 数据库，在时间戳发生较大变化时通过 logger 输出。"""
 
+    # 正在后台轮询的实例；进程内同时只允许一个，避免重复启动
+    _running = weakref.WeakSet()
+    _running_lock = threading.Lock()
+
     def __init__(
         self,
         search_roots=None,
@@ -76,114 +161,170 @@ class CursorDbMonitor:
         self.min_delta_seconds = min_delta_seconds
         self.on_activity = on_activity
         self.base_seconds = None
+        self._stop = threading.Event()
+        # 轮询期间复用的只读连接，及其上发现的 (表, 时间列, 列名列表, 取整行 SQL) 与一次取出各列最大值的 SQL；出错时重置后重新发现
+        self._conn = None
+        self._conn_path = None
+        self._time_columns = None
+        self._max_sql = None
+        # 上次 get_latest_row 的结果；最大时间戳未前进时直接复用，不再取整行
+        self._last_latest = None
 
     def find_cursor_dir(self):
-        """查找 Cursor 数据目录（含 ai-tracking）。优先平台候选路径，再 search_roots 下 .cursor，避免 os.walk 主目录导致卡顿。"""
+        """查找 Cursor 数据目录（含 ai-tracking）。优先平台候选路径，再 search_roots 下 .cursor，避免 os.walk 主目录导致卡顿。
+        找到的结果进程内缓存，重复创建监控不再访问文件系统。"""
+        key = tuple(str(root) for root in self.search_roots)
+        with _cursor_dir_lock:
+            cached = _cursor_dir_cache.get(key)
+        if cached is not None:
+            return cached
+        found = self._find_cursor_dir_uncached()
+        if found is not None:
+            with _cursor_dir_lock:
+                _cursor_dir_cache[key] = found
+        return found
+
+    def _find_cursor_dir_uncached(self):
+        """实际查找 Cursor 数据目录（不读写缓存）。"""
         # 1）先检查平台候选：~/.cursor，macOS 下还有 ~/Library/Application Support/Cursor
         for candidate in _cursor_dir_candidates():
-            if candidate.exists() and (candidate / "ai-tracking").exists():
-                return candidate
-        # 2）再检查 search_roots 下的 .cursor
+            if os.path.exists(os.path.join(candidate, "ai-tracking")):
+                return Path(candidate)
+        # 2）再检查 search_roots 下的 .cursor，一次遍历同时收集无 ai-tracking 的目录作兜底
         target = ".cursor"
-        for root in self.search_roots:
-            root = Path(root)
-            direct = root / target
-            if direct.exists() and (direct / "ai-tracking").exists():
-                return direct
         candidates = []
         for root in self.search_roots:
-            root = Path(root)
-            direct = root / target
+            direct = Path(root) / target
+            if (direct / "ai-tracking").exists():
+                return direct
             if direct.exists():
                 candidates.append(direct)
         if not candidates:
-            # 直接路径都没有，再尝试递归（较慢，可能卡顿）
+            # 直接路径都没有，再在 search_roots 下有限深度地逐层查找
             for root in self.search_roots:
-                root = Path(root)
-                for current_root, dirs, _ in os.walk(root):
-                    if target in dirs:
-                        c = Path(current_root) / target
-                        if (c / "ai-tracking").exists():
-                            return c
-                        candidates.append(c)
-        if not candidates:
-            return None
-        for c in candidates:
-            if (c / "ai-tracking").exists():
-                return c
-        return candidates[0]
+                hit, fallback = _scan_for_cursor_dir(root)
+                if hit is not None:
+                    return hit
+                if fallback is not None:
+                    candidates.append(fallback)
+        return candidates[0] if candidates else None
 
     def find_db_path(self, cursor_dir):
         """返回 ai-code-tracking.db 路径，不存在则 None。"""
-        db_path = cursor_dir / "ai-tracking" / "ai-code-tracking.db"
-        return db_path if db_path.exists() else None
+        db_path = os.path.join(cursor_dir, "ai-tracking", "ai-code-tracking.db")
+        return Path(db_path) if os.path.exists(db_path) else None
+
+    def _ensure_connection(self, db_path):
+        """打开（或复用）db_path 的只读连接，并在首次打开时发现各表的时间戳列。"""
+        if self._conn is not None and self._conn_path == db_path:
+            return self._conn
+        self._close_connection()
+        conn = sqlite3.connect(db_path.as_uri() + "?mode=ro", uri=True, timeout=2)
+        try:
+            conn.execute("PRAGMA query_only=1;")
+            conn.execute("PRAGMA cache_size=-2000;")
+            conn.execute("PRAGMA temp_store=memory;")
+            # 通过 mmap 读页，跨轮询复用系统页缓存
+            conn.execute("PRAGMA mmap_size=67108864;")
+            cur = conn.cursor()
+            tables = [
+                t[0]
+                for t in cur.execute(
+                    "SELECT name FROM sqlite_master WHERE type='table';"
+                ).fetchall()
+            ]
+            time_columns = []
+            for table in tables:
+                cols = cur.execute(f"PRAGMA table_info({_quote_ident(table)});").fetchall()
+                col_names = [c[1] for c in cols]
+                col_set = frozenset(col_names)
+                for col in TIME_CANDIDATES:
+                    if col in col_set:
+                        # 取整行的 SQL 在发现时生成一次，之后每次轮询复用同一文本，命中连接的语句缓存
+                        row_sql = f"SELECT * FROM {_quote_ident(table)} WHERE {_quote_ident(col)} = ? LIMIT 1;"
+                        time_columns.append((table, col, col_names, row_sql))
+        except sqlite3.Error:
+            conn.close()
+            raise
+        self._conn = conn
+        self._conn_path = db_path
+        self._time_columns = time_columns
+        # 各 (表, 列) 的 MAX 合并为一条 UNION ALL，首列为 time_columns 下标
+        self._max_sql = " UNION ALL ".join(
+            f"SELECT {i}, MAX({_quote_ident(col)}) FROM {_quote_ident(table)}"
+            for i, (table, col, _, _) in enumerate(time_columns)
+        )
+        return conn
+
+    def _close_connection(self):
+        """关闭复用的连接并清空表结构缓存。"""
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except sqlite3.Error:
+                pass
+        self._conn = None
+        self._conn_path = None
+        self._time_columns = None
+        self._max_sql = None
+        self._last_latest = None
 
     def get_latest_row(self, db_path):
         """从数据库中按时间戳字段取最新一行，返回字典或 None。"""
-        db_uri = db_path.as_uri() + "?mode=ro"
         best_seconds = None
-        best_table = None
-        best_col = None
-        best_cols = None
-        best_row = None
+        best_idx = None
+        best_value = None
         best_raw_ts = None
-        best_local_dt = None
         try:
-            with sqlite3.connect(db_uri, uri=True, timeout=2) as conn:
-                cur = conn.cursor()
-                tables = [
-                    t[0]
-                    for t in cur.execute(
-                        "SELECT name FROM sqlite_master WHERE type='table';"
-                    ).fetchall()
-                ]
-                for table in tables:
-                    cols = cur.execute(f"PRAGMA table_info({table});").fetchall()
-                    col_names = [c[1] for c in cols]
-                    for col in TIME_CANDIDATES:
-                        if col not in col_names:
-                            continue
-                        row = cur.execute(
-                            f"SELECT * FROM {table} ORDER BY {col} DESC LIMIT 1;"
-                        ).fetchone()
-                        if not row:
-                            continue
-                        value = row[col_names.index(col)]
-                        parsed = normalize_timestamp(value)
-                        if not parsed:
-                            continue
-                        raw_ts, seconds, local_dt = parsed
-                        if best_seconds is None or seconds > best_seconds:
-                            best_seconds = seconds
-                            best_table = table
-                            best_col = col
-                            best_cols = col_names
-                            best_row = row
-                            best_raw_ts = raw_ts
-                            best_local_dt = local_dt
+            conn = self._ensure_connection(db_path)
+            if not self._time_columns:
+                return None
+            for idx, value in conn.execute(self._max_sql).fetchall():
+                parsed = _timestamp_seconds(value)
+                if not parsed:
+                    continue
+                raw_ts, seconds = parsed
+                if best_seconds is None or seconds > best_seconds:
+                    best_seconds = seconds
+                    best_idx = idx
+                    best_value = value
+                    best_raw_ts = raw_ts
+            if best_seconds is None:
+                return None
+            last = self._last_latest
+            table, col, col_names, row_sql = self._time_columns[best_idx]
+            if last and last["table"] == table and last["column"] == col and last["timestamp"] == best_raw_ts:
+                return last
+            best_row = conn.execute(row_sql, (best_value,)).fetchone()
         except sqlite3.Error as e:
             logger.debug(f"数据库操作失败: {e}")
+            # 连接或表结构可能已失效，下次轮询重新打开并发现
+            self._close_connection()
+            if isinstance(e, sqlite3.OperationalError) and not db_path.exists():
+                _forget_cursor_dir(db_path.parent.parent)
             return None
-        if best_seconds is None:
+        if best_row is None:
             return None
-        return {
+        self._last_latest = {
             "timestamp": best_raw_ts,
             "seconds": best_seconds,
-            "local_dt": best_local_dt,
-            "table": best_table,
-            "column": best_col,
-            "columns": best_cols,
+            # 只为最终胜出且有变化的时间戳构造一次本地时间
+            "local_dt": _local_datetime(best_seconds),
+            "table": table,
+            "column": col,
+            "columns": col_names,
             "row": best_row,
         }
+        return self._last_latest
 
     def set_base_timestamp(self, latest):
         """根据 initial_timestamp 或 latest 设置基准时间。"""
         if self.initial_timestamp is None:
             self.base_seconds = latest["seconds"]
             return
-        parsed = normalize_timestamp(self.initial_timestamp)
+        parsed = _timestamp_seconds(self.initial_timestamp)
         if parsed:
-            _, seconds, _ = parsed
+            _, seconds = parsed
             self.base_seconds = seconds
         else:
             self.base_seconds = latest["seconds"]
@@ -194,15 +335,38 @@ class CursorDbMonitor:
         for k, v in zip(latest["columns"], latest["row"]):
             logger.debug(f"{k}: {v}")
 
+    @staticmethod
+    def _db_file_state(db_path):
+        """数据库文件及其 -wal 文件的 (mtime_ns, size)；Cursor 写入任何一行都会改变其一。"""
+        state = []
+        for path in (db_path, db_path.with_name(db_path.name + "-wal")):
+            try:
+                st = os.stat(path)
+            except OSError:
+                state.append(None)
+            else:
+                state.append((st.st_mtime_ns, st.st_size))
+        return tuple(state)
+
     def _run_loop(self, db_path):
-        """轮询循环（在后台线程中调用）。"""
+        """轮询循环（在后台线程中调用），stop() 后退出并关闭连接。数据库文件未变化的轮次只做 stat，不查询。"""
+        try:
+            self._poll(db_path)
+        finally:
+            self._close_connection()
+
+    def _poll(self, db_path):
         last_message_time = time.time()
         is_first_update = True
-        while True:
-            time.sleep(self.poll_interval)
+        last_state = None
+        while not self._stop.wait(self.poll_interval):
+            state = self._db_file_state(db_path)
+            if state == last_state:
+                continue
             latest = self.get_latest_row(db_path)
             if not latest:
                 continue
+            last_state = state
             self.base_seconds = latest["seconds"]
             delta = time.time() - self.base_seconds
             if delta > self.min_delta_seconds and self.base_seconds != last_message_time:
@@ -215,7 +379,10 @@ class CursorDbMonitor:
                         self.on_activity(CURSOR_ACTIVITY_MESSAGE)
                     except Exception as e:
                         logger.debug(f"on_activity 回调异常: {e}")
-                
+
+    def stop(self):
+        """请求停止轮询；后台线程在当前等待结束后退出。"""
+        self._stop.set()
 
     def start(self):
         """同步轮询（阻塞）；一般用 start_in_thread 在后台运行。"""
@@ -238,31 +405,38 @@ class CursorDbMonitor:
     def start_in_thread(self) -> Optional[threading.Thread]:
         """
         仅在检测到 Cursor DB 时启动后台线程轮询，不阻塞主线程。
-        进程内只启动一次，重复调用直接返回 None。
+        进程内同时只运行一个监控，已有监控在运行时直接返回 None；stop() 且线程退出后可再次启动。
         返回已启动的线程，未检测到 DB 时返回 None。
         """
-        global _cursor_monitor_started
-        if _cursor_monitor_started:
-            logger.debug(f"Cursor 监控已在运行，跳过重复启动")
-            return None
-        cursor_dir = self.find_cursor_dir()
-        if not cursor_dir:
-            logger.debug(f"未找到 .cursor 目录，跳过 Cursor 监控")
-            return None
-        db_path = self.find_db_path(cursor_dir)
-        if not db_path:
-            logger.debug(f"未找到 Cursor 数据库，跳过监控")
-            return None
-        _cursor_monitor_started = True
+        cls = type(self)
+        with cls._running_lock:
+            if len(cls._running):
+                logger.debug(f"Cursor 监控已在运行，跳过重复启动")
+                return None
+            cursor_dir = self.find_cursor_dir()
+            if not cursor_dir:
+                logger.debug(f"未找到 .cursor 目录，跳过 Cursor 监控")
+                return None
+            db_path = self.find_db_path(cursor_dir)
+            if not db_path:
+                logger.debug(f"未找到 Cursor 数据库，跳过监控")
+                return None
+            self._stop.clear()
+            cls._running.add(self)
 
         def _thread_entry():
-            latest = self.get_latest_row(db_path)
-            if not latest:
-                logger.warning(f"未找到可用的时间戳字段，监控退出")
-                return
-            self.set_base_timestamp(latest)
-            logger.info(f"Cursor 监控已启动（数据库: {db_path}，轮询 {self.poll_interval} 秒）")
-            self._run_loop(db_path)
+            try:
+                latest = self.get_latest_row(db_path)
+                if not latest:
+                    logger.warning(f"未找到可用的时间戳字段，监控退出")
+                    self._close_connection()
+                    return
+                self.set_base_timestamp(latest)
+                logger.info(f"Cursor 监控已启动（数据库: {db_path}，轮询 {self.poll_interval} 秒）")
+                self._run_loop(db_path)
+            finally:
+                with cls._running_lock:
+                    cls._running.discard(self)
 
         t = threading.Thread(target=_thread_entry, daemon=True)
         t.start()
@@ -4,6 +4,7 @@
 """
 import sys
 import platform
+from collections import deque
 from utils.logger import logger
 
 
@@ -153,17 +154,15 @@ def bind_mousewheel(canvas, scroll_unit=3, add_to_children=True):
                 canvas.yview_scroll(scroll_unit, "units")
         return "break"
 
-    for ev in mousewheel_bindings():
-        canvas.bind(ev, on_mousewheel, add="+")
-
-    def bind_recursive(widget):
-        for ev in mousewheel_bindings():
+    events = mousewheel_bindings()
+    # 逐层遍历 canvas 及其子组件（add_to_children 为 False 时只处理 canvas），不走递归
+    pending = deque([canvas])
+    while pending:
+        widget = pending.popleft()
+        for ev in events:
             widget.bind(ev, on_mousewheel, add="+")
-        for child in widget.winfo_children():
-            bind_recursive(child)
-
-    if add_to_children:
-        bind_recursive(canvas)
+        if add_to_children:
+            pending.extend(widget.winfo_children())
 
 
 def focus_input(widget):
@@ -189,16 +188,20 @@ def app_resources_dir():
 # ---------------------------------------------------------------------------
 
 def _get_font_settings():
-    """延迟加载 Settings，避免循环导入"""
+    """延迟加载 Settings，避免循环导入；用进程内共享实例，配置文件未变时不重读"""
     try:
-        from config.settings import Settings
-        s = Settings()
-        s.load()
-        return s
+        from config.settings import shared_settings
+        return shared_settings()
     except Exception:
         return None
 
 
+# 系统已安装字体族，首次成功枚举后缓存（需已创建 QApplication）
+_font_families = None
+# get_ui_config 的结果，按其依赖的配置值缓存
+_ui_config_cache = None
+
+
 def ui_font_family():
     """正文/标题字体：优先读配置 font_family，空则按平台默认"""
     s = _get_font_settings()
@@ -221,11 +224,13 @@ def ui_font_family_fallback():
 
 def _pick_available_font(candidates, fallback):
     """仅在 Qt 环境中选择可用字体；无 Qt 时直接回退"""
+    global _font_families
     try:
-        from PyQt5.QtGui import QFontDatabase
-        families = set(QFontDatabase().families())
+        if _font_families is None:
+            from PyQt5.QtGui import QFontDatabase
+            _font_families = frozenset(QFontDatabase().families())
         for name in candidates:
-            if name in families:
+            if name in _font_families:
                 return name
     except Exception:
         pass
@@ -322,9 +327,14 @@ def ui_menu_active_fg():
 
 def get_ui_config():
     """
-    返回当前平台 UI 配置字典，供各界面按需读取
+    返回当前平台 UI 配置字典，供各界面按需读取。结果按 font_family / bubble_font_size 配置缓存，返回副本。
     """
-    return {
+    global _ui_config_cache
+    s = _get_font_settings()
+    key = (s.get("font_family"), s.get("bubble_font_size")) if s else None
+    if _ui_config_cache is not None and _ui_config_cache[0] == key:
+        return dict(_ui_config_cache[1])
+    config = {
         "font_family": ui_font_family(),
         "font_family_fallback": ui_font_family_fallback(),
         "font_size_body": ui_font_size_body(),
@@ -344,3 +354,5 @@ def get_ui_config():
         "menu_fg": ui_menu_fg(),
         "menu_active_fg": ui_menu_active_fg(),
     }
+    _ui_config_cache = (key, config)
+    return dict(config)
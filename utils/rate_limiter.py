@@ -3,7 +3,7 @@ API 限流模块：滑动窗口 + 指数退让。
 限制请求速度，超限时提醒「超速了」并给出建议等待时间。
 """
 import time
-from collections import deque
+from array import array
 from threading import Lock
 
 
@@ -12,15 +12,21 @@ class RateLimiter:
     限流器：核心为限制请求速度。
     - 滑动窗口：窗口内最多 max_per_minute 次请求。
     - 超限时采用指数退让：建议等待 2^连续超限次数 秒（有上限），超限时返回「超速了」提示。
+    时间统一用 time.monotonic_ns()，不受系统校时回拨影响。
     """
 
     def __init__(self, max_per_minute=10, window_seconds=60, max_backoff_seconds=60):
         self.max_per_minute = max_per_minute
         self.window_seconds = window_seconds
         self.max_backoff_seconds = max_backoff_seconds
-        self._timestamps = deque()
+        self._window_ns = int(window_seconds * 1_000_000_000)
+        # 最近 max_per_minute 次放行时间的环形缓冲；_head 指向最早一条（已满时）或下一个写入位置
+        self._capacity = max(0, int(max_per_minute))
+        self._buf = array("q", [0] * self._capacity)
+        self._head = 0
+        self._count = 0
         self._consecutive_over = 0
-        self._backoff_until = 0.0
+        self._backoff_until = 0
         self._lock = Lock()
 
     def try_acquire(self):
@@ -32,21 +38,32 @@ class RateLimiter:
             - allowed=True 时 message 为空，可继续请求。
             - allowed=False 时 message 为「超速了，请 X 秒后再试」，不应发起请求。
         """
+        now = time.monotonic_ns()
+        # 指数退让：若尚在退让期内，直接拒绝。只读一个整数，无需加锁；
+        # 与其它线程并发时最坏读到旧值，锁内会再确认一次
+        backoff_until = self._backoff_until
+        if now < backoff_until:
+            wait = max(1, (backoff_until - now) // 1_000_000_000)
+            return (False, f"超速了，请 {wait} 秒后再试")
         with self._lock:
-            now = time.time()
-            # 指数退让：若尚在退让期内，直接拒绝
+            # 锁内重新取时间，保证环形缓冲中的时间按写入顺序递增
+            now = time.monotonic_ns()
             if now < self._backoff_until:
-                wait = max(1, int(self._backoff_until - now))
+                wait = max(1, (self._backoff_until - now) // 1_000_000_000)
                 return (False, f"超速了，请 {wait} 秒后再试")
-            # 滑动窗口：丢弃窗口外的记录
-            while self._timestamps and self._timestamps[0] < now - self.window_seconds:
-                self._timestamps.popleft()
-            if len(self._timestamps) >= self.max_per_minute:
+            # 滑动窗口：已满且最早一条仍在窗口内即超限
+            if self._count >= self._capacity and (
+                self._capacity == 0 or now - self._buf[self._head] <= self._window_ns
+            ):
                 self._consecutive_over += 1
                 backoff = min(2 ** self._consecutive_over, self.max_backoff_seconds)
-                self._backoff_until = now + backoff
+                self._backoff_until = now + int(backoff * 1_000_000_000)
                 wait = max(1, int(backoff))
                 return (False, f"超速了，请 {wait} 秒后再试")
-            self._timestamps.append(now)
+            # 写入最早一条的位置（未满时为下一个空位）
+            self._buf[self._head] = now
+            self._head = (self._head + 1) % self._capacity
+            if self._count < self._capacity:
+                self._count += 1
             self._consecutive_over = 0
             return (True, "")
@@ -6,9 +6,20 @@ import random
 from typing import Optional, Any
 
 
+def _skill_weight(skill: dict) -> float:
+    """技能的抽取权重：priority 为正数时取其值，缺省或非法为 1，非正数表示不参与抽取。"""
+    priority = skill.get("priority")
+    if priority is None or isinstance(priority, bool):
+        return 1.0
+    try:
+        return float(priority)
+    except (TypeError, ValueError):
+        return 1.0
+
+
 def extract_random_skill(assistant_data: Optional[Any] = None) -> Optional[str]:
     """
-    从助手的已启用技能中随机选一条，返回其 prompt；无助手或无启用技能则返回 None。
+    从助手的已启用技能中按 priority 加权随机选一条，返回其 prompt；无助手或无启用技能则返回 None。
 
     assistant_data: 助手数据对象，需有 get_skills() 且每项有 enabled、prompt 字段。
     """
@@ -20,9 +31,20 @@ def extract_random_skill(assistant_data: Optional[Any] = None) -> Optional[str]:
     raw = skills()
     if not isinstance(raw, dict):
         return None
-    enabled = {k: v for k, v in raw.items() if isinstance(v, dict) and v.get("enabled", False)}
-    if not enabled:
+    # 单次遍历的加权水塘抽样（A-Res）：每项取 u^(1/w)，保留最大者，不复制技能列表
+    skill = None
+    best_key = -1.0
+    for v in raw.values():
+        if not isinstance(v, dict) or not v.get("enabled", False):
+            continue
+        weight = _skill_weight(v)
+        if weight <= 0:
+            continue
+        key = random.random() ** (1.0 / weight)
+        if key > best_key:
+            best_key = key
+            skill = v
+    if skill is None:
         return None
-    skill = random.choice(list(enabled.values()))
     prompt = (skill.get("prompt") or "").strip()
     return prompt if prompt else None
@@ -13,8 +13,12 @@
 - max_length：回复字数上限
 """
 import random
-import copy
-from typing import Any, List, Dict, Union, Optional
+from itertools import islice
+from typing import Any, Callable, List, Dict, Union, Optional
+
+# function_params 编译结果缓存：id(params) -> (params, builder)；保留 params 引用保证 id 不被复用
+_compiled_params: Dict[int, tuple] = {}
+_COMPILED_PARAMS_MAX = 256
 
 
 class SkillUtils:
@@ -44,48 +48,54 @@ class SkillUtils:
         if isinstance(source, dict):
             if not source:
                 raise ValueError("random_pick: dict 不能为空")
-            return random.choice(list(source.values()))
+            # 直接定位第 i 个 value，不为抽一个元素复制整份 values 列表
+            return next(islice(source.values(), random.randrange(len(source)), None))
         raise ValueError("random_pick: 只支持 list 或 dict，当前类型为 {}".format(type(source).__name__))
 
     @staticmethod
-    def _resolve_param_value(val: Any, skill: Dict[str, Any], context: Optional[Dict[str, Any]]) -> Any:
-        """解析单个参数：若为以 $ 开头的字符串则从 skill/context 取值，否则原样返回。"""
-        if not isinstance(val, str) or not val.startswith("$"):
-            return val
-        key = val[1:].strip()
-        if not key:
-            return val
-        if key.startswith("context."):
-            k = key[8:]
-            return (context or {}).get(k) if context is not None else val
-        if key.startswith("skill."):
-            k = key[6:]
-            return skill.get(k) if isinstance(skill, dict) else val
-        return skill.get(key, val) if isinstance(skill, dict) else val
+    def _compile_params(params: Any) -> Callable[[Any, Optional[Dict[str, Any]]], Any]:
+        """
+        把 function_params 模板预编译为 builder(skill, context)：占位符的解析分支在编译时确定，
+        执行时只按固定结构取值、新建 dict/list。
+        占位符规则：$context.xxx 取 context[xxx]（无 context 时原样保留）；$skill.xxx 与 $xxx 取 skill[xxx]
+        （$xxx 取不到时原样保留）；非 $ 开头或 $ 后为空的值原样返回。
+        """
+        if isinstance(params, str) and params.startswith("$"):
+            key = params[1:].strip()
+            if not key:
+                return lambda skill, context: params
+            if key.startswith("context."):
+                k = key[8:]
+                return lambda skill, context: context.get(k) if context is not None else params
+            if key.startswith("skill."):
+                k = key[6:]
+                return lambda skill, context: skill.get(k) if isinstance(skill, dict) else params
+            return lambda skill, context: skill.get(key, params) if isinstance(skill, dict) else params
+        if isinstance(params, dict):
+            items = [(k, SkillUtils._compile_params(v)) for k, v in params.items()]
+            return lambda skill, context: {k: build(skill, context) for k, build in items}
+        if isinstance(params, list):
+            builders = [SkillUtils._compile_params(v) for v in params]
+            return lambda skill, context: [build(skill, context) for build in builders]
+        return lambda skill, context: params
 
     @staticmethod
     def _resolve_params(params: Any, skill: Dict[str, Any], context: Optional[Dict[str, Any]]) -> Any:
-        """递归解析 function_params 中的 $ 占位符。"""
+        """解析 function_params 中的 $ 占位符；同一份 params 只编译一次。"""
         if params is None:
             return None
-        if isinstance(params, str) and params.startswith("$"):
-            return SkillUtils._resolve_param_value(params, skill, context)
-        if isinstance(params, dict):
-            return {k: SkillUtils._resolve_params(v, skill, context) for k, v in params.items()}
-        if isinstance(params, list):
-            return [SkillUtils._resolve_params(v, skill, context) for v in params]
-        return params
+        entry = _compiled_params.get(id(params))
+        if entry is None or entry[0] is not params:
+            if len(_compiled_params) >= _COMPILED_PARAMS_MAX:
+                _compiled_params.clear()
+            entry = (params, SkillUtils._compile_params(params))
+            _compiled_params[id(params)] = entry
+        return entry[1](skill, context)
 
     @staticmethod
     def _get_callable(func_name: str):
-        """根据函数名字符串解析可调用对象，支持 SkillUtils.xxx。"""
-        name = (func_name or "").strip()
-        if not name:
-            return None
-        parts = name.split(".")
-        if len(parts) == 2 and parts[0] == "SkillUtils":
-            return getattr(SkillUtils, parts[1], None)
-        return None
+        """根据函数名字符串（如 SkillUtils.random_pick）从 _SKILL_REGISTRY 取可调用对象。"""
+        return _SKILL_REGISTRY.get((func_name or "").strip())
 
     @staticmethod
     def execute_skill(
@@ -129,8 +139,8 @@ class SkillUtils:
         func = SkillUtils._get_callable(name)
         if not callable(func):
             return {**empty_result, "success": False, "error": "未找到可调用: {}".format(name)}
-        raw_params = skill.get("function_params")
-        params = SkillUtils._resolve_params(copy.deepcopy(raw_params), skill, context)
+        # _resolve_params 会为每层 dict/list 新建容器，无需先深拷贝 function_params
+        params = SkillUtils._resolve_params(skill.get("function_params"), skill, context)
         return_result_usage = skill.get("return_result_usage", "none")
         if not isinstance(return_result_usage, str):
             return_result_usage = "none"
@@ -192,3 +202,11 @@ class SkillUtils:
         if usage == "prompt_placeholder":
             return base.replace(placeholder, str(result))
         return base
+
+
+# 技能 function_name -> 可调用对象，导入时由 SkillUtils 的公开方法生成
+_SKILL_REGISTRY: Dict[str, Callable] = {
+    "SkillUtils.{}".format(n): getattr(SkillUtils, n)
+    for n in vars(SkillUtils)
+    if not n.startswith("_") and callable(getattr(SkillUtils, n))
+}
@@ -2,7 +2,7 @@
 精灵图工具 - 批量替换等。支持 sprites/ 下平铺或按动作子文件夹（idle/、walk/ 等）结构。
 """
 import os
-import shutil
+import tempfile
 
 
 # 默认源图：assistants 下某助手的 paused/1.png（子文件夹结构）或 paused_1.png（平铺）
@@ -13,6 +13,28 @@ if not os.path.isfile(DEFAULT_SOURCE):
     DEFAULT_SOURCE = os.path.join(_DEFAULT_PAUSED, "paused_1.png")
 
 
+def copy_file_replace(source_path, dst, data=None, source_stat=None):
+    """把 source_path 的内容（可传入已读好的 data/source_stat 以免重复读取）复制为 dst：
+    先写同目录临时文件再 os.replace，dst 若是旧版本留下的硬链接则只断开链接、不改写共享内容；
+    source_path 与 dst 为同一文件时也安全。保留源文件的权限与修改时间。"""
+    if data is None:
+        with open(source_path, "rb") as f:
+            data = f.read()
+    if source_stat is None:
+        source_stat = os.stat(source_path)
+    fd, tmp = tempfile.mkstemp(prefix=os.path.basename(dst) + ".", suffix=".tmp", dir=os.path.dirname(dst) or ".")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(tmp, source_stat.st_mode & 0o7777)
+        os.utime(tmp, ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns))
+        os.replace(tmp, dst)
+    except OSError:
+        if os.path.lexists(tmp):
+            os.remove(tmp)
+        raise
+
+
 def replace_all_sprites_with(source_path=None, target_dir=None):
     """
     将目标目录下所有 png 替换为同一张源图的内容，文件名不变。
@@ -31,21 +53,29 @@ def replace_all_sprites_with(source_path=None, target_dir=None):
         return []
     source_name = os.path.basename(source_path)
     replaced = []
-    for name in os.listdir(target_dir):
-        path = os.path.join(target_dir, name)
-        if os.path.isdir(path):
-            for sub in os.listdir(path):
-                if sub.lower().endswith(".png"):
-                    dst = os.path.join(path, sub)
-                    if dst != source_path:
-                        shutil.copy2(source_path, dst)
-                        replaced.append(dst)
+    # 源图只读一次，各目标写入同一份字节；各 sprite 为独立副本，不与源图共享硬链接
+    with open(source_path, "rb") as f:
+        source_data = f.read()
+    source_stat = os.stat(source_path)
+
+    def place(dst):
+        copy_file_replace(source_path, dst, source_data, source_stat)
+
+    with os.scandir(target_dir) as it:
+        entries = list(it)
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            with os.scandir(entry.path) as sub_it:
+                for sub in sub_it:
+                    if sub.name.lower().endswith(".png") and sub.path != source_path:
+                        place(sub.path)
+                        replaced.append(sub.path)
             continue
-        if not name.lower().endswith(".png"):
+        if not entry.name.lower().endswith(".png"):
             continue
-        if name == source_name:
+        if entry.name == source_name:
             continue
-        if os.path.isfile(path):
-            shutil.copy2(source_path, path)
-            replaced.append(path)
+        if entry.is_file():
+            place(entry.path)
+            replaced.append(entry.path)
     return replaced
@@ -4,7 +4,10 @@ SSH 本地端口转发隧道：在后台线程执行 ssh -N -L {port}:127.0.0.1:
 程序退出时通过 atexit 自动断开隧道（subprocess 终止、paramiko 连接关闭）。
 """
 import atexit
+import os
+import selectors
 import socket
+import tempfile
 import threading
 import time
 from typing import Optional, Tuple
@@ -17,22 +20,38 @@ _ssh_process_lock = threading.Lock()
 # paramiko 隧道引用，供退出时关闭
 _paramiko_client = None
 _paramiko_server_sock = None
+# 唤醒 accept_loop 的 socketpair 写端：写入一个字节即让其 select 立即返回并退出
+_paramiko_wakeup = None
 _paramiko_lock = threading.Lock()
 
+# 转发单次读取上限：与 SSH 通道窗口同量级，减少大流量时的系统调用与加锁次数
+RELAY_BUF = 128 * 1024
+# 本地转发连接的收发缓冲区大小
+_RELAY_SOCK_BUF = 4 * 1024 * 1024
+# paramiko 默认通道窗口仅 2 MiB，高延迟链路下单连接吞吐受限；放大窗口并调高重协商阈值
+_SSH_WINDOW_SIZE = 2 ** 27
+_SSH_REKEY_LIMIT = 2 ** 40
+_SSH_SOCK_BUF = 32 * 1024 * 1024
 
-def _wait_port_ready(host: str, port: int, timeout_sec: float = 15.0, interval_sec: float = 0.3) -> bool:
-    """等待本地端口可连接，返回是否就绪。"""
+
+def _wait_port_ready(host: str, port: int, timeout_sec: float = 15.0, interval_sec: float = 0.2, proc=None) -> bool:
+    """等待本地端口可连接，返回是否就绪。重试间隔从 20ms 指数增长，上限 interval_sec。
+    传入 proc 时，进程提前退出即返回 False。"""
     deadline = time.monotonic() + timeout_sec
-    while time.monotonic() < deadline:
+    delay = 0.02
+    while True:
         try:
-            s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            s.settimeout(1.0)
-            s.connect((host, port))
-            s.close()
+            socket.create_connection((host, port), timeout=0.2).close()
             return True
-        except (socket.error, OSError):
-            time.sleep(interval_sec)
-    return False
+        except OSError:
+            pass
+        if proc is not None and proc.poll() is not None:
+            return False
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, interval_sec)
 
 
 def start_ssh_tunnel(
@@ -67,90 +86,195 @@ def start_ssh_tunnel(
 
 
 def _start_tunnel_subprocess(port: int, username: str, server: str) -> Tuple[bool, str]:
-    """使用 subprocess 执行 ssh -N -L，后台线程挂机。"""
+    """使用 subprocess 执行 ssh -N -L；不另起等待线程，进程由 stop_ssh_tunnel 终止并回收。"""
     import subprocess
     global _ssh_process
     cmd = [
         "ssh", "-N", "-L", f"{port}:127.0.0.1:{port}",
         "-o", "StrictHostKeyChecking=accept-new",
         "-o", "ConnectTimeout=10",
+        # 半开连接约 45 秒内判定断开退出；本地端口转发失败时立即退出而非挂着空进程
+        "-o", "ServerAliveInterval=15",
+        "-o", "ServerAliveCountMax=3",
+        "-o", "TCPKeepAlive=yes",
+        "-o", "ExitOnForwardFailure=yes",
         f"{username}@{server}",
     ]
     logger.info(f"SSH 隧道启动: {' '.join(cmd)}")
 
-    def run():
-        global _ssh_process
+    # stderr 写临时文件而非管道：无人读取时管道写满会阻塞 ssh；启动失败时从中读取错误信息
+    with tempfile.TemporaryFile() as err_file:
         try:
-            with _ssh_process_lock:
-                _ssh_process = subprocess.Popen(
-                    cmd,
-                    stdin=subprocess.DEVNULL,
-                    stdout=subprocess.DEVNULL,
-                    stderr=subprocess.PIPE,
-                )
-            _ssh_process.wait()
-        except Exception as e:
-            logger.debug(f"SSH 隧道进程结束: {e}")
-        finally:
-            with _ssh_process_lock:
-                _ssh_process = None
-
-    t = threading.Thread(target=run, daemon=True)
-    t.start()
-    if not _wait_port_ready("127.0.0.1", port, timeout_sec=15.0):
+            p = subprocess.Popen(
+                cmd,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=err_file,
+                start_new_session=True,
+            )
+        except OSError as e:
+            return False, f"SSH 启动失败: {e}"
         with _ssh_process_lock:
-            p = _ssh_process
-        if p:
-            try:
-                p.terminate()
-            except Exception:
-                pass
-        return False, "SSH 隧道端口就绪超时，请检查用户名、服务器与密钥"
-    return True, ""
+            _ssh_process = p
+        if _wait_port_ready("127.0.0.1", port, timeout_sec=15.0, proc=p):
+            return True, ""
+        exited = p.poll() is not None
+        err_file.seek(0)
+        err_text = err_file.read(4096).decode("utf-8", errors="replace").strip()
+    with _ssh_process_lock:
+        if _ssh_process is p:
+            _ssh_process = None
+    _terminate_process(p)
+    if exited and err_text:
+        logger.debug(f"SSH 隧道进程结束: {err_text}")
+        return False, f"SSH 隧道启动失败: {err_text}"
+    return False, "SSH 隧道端口就绪超时，请检查用户名、服务器与密钥"
 
 
-def _relay_sock_to_channel(sock, channel) -> None:
-    """单向：socket -> channel。"""
+def _terminate_process(p) -> None:
+    """终止子进程并回收，避免遗留僵尸进程。"""
     try:
-        while True:
-            data = sock.recv(4096)
-            if not data:
-                break
-            channel.send(data)
+        if p.poll() is None:
+            p.terminate()
+        p.wait(timeout=2)
     except Exception:
         pass
+
+
+def _tune_relay_socket(sock) -> None:
+    """本地转发连接：关闭 Nagle、开启 keepalive、放大收发缓冲区，避免小窗口下回环一侧阻塞。"""
     try:
-        channel.close()
-        sock.close()
-    except Exception:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, _RELAY_SOCK_BUF)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, _RELAY_SOCK_BUF)
+    except OSError:
         pass
 
 
-def _relay_channel_to_sock(channel, sock) -> None:
-    """单向：channel -> socket。"""
+class _RelayPair:
+    """一对转发端（本地 conn 与 paramiko channel，均为非阻塞）及两个方向上尚未写出的数据。"""
+    __slots__ = ("conn", "channel", "to_channel", "to_conn")
+
+    def __init__(self, conn, channel):
+        self.conn = conn
+        self.channel = channel
+        self.to_channel = b""
+        self.to_conn = b""
+
+
+def _flush_to_conn(pair, data=None) -> bool:
+    """尽量把 data（缺省为积压数据）写入 conn，写不完的留作积压；出错返回 False。"""
+    view = memoryview(pair.to_conn if data is None else data)
     try:
-        while True:
-            data = channel.recv(4096)
-            if not data:
-                break
-            sock.sendall(data)
-    except Exception:
+        while view:
+            view = view[pair.conn.send(view):]
+    except BlockingIOError:
+        pass
+    except OSError:
+        return False
+    pair.to_conn = bytes(view)
+    return True
+
+
+def _flush_to_channel(pair, data=None) -> bool:
+    """尽量把 data（缺省为积压数据）写入 channel，远端窗口耗尽时留作积压；通道关闭或出错返回 False。"""
+    view = memoryview(pair.to_channel if data is None else data)
+    try:
+        while view and pair.channel.send_ready():
+            sent = pair.channel.send(view)
+            if not sent:
+                return False
+            view = view[sent:]
+    except socket.timeout:
         pass
+    except Exception:
+        return False
+    pair.to_channel = bytes(view)
+    return True
+
+
+def _pump_conn(pair, view) -> bool:
+    """conn 可读：读入复用的 view（RELAY_BUF 大小）并转发到 channel；对端关闭或出错返回 False。"""
     try:
-        channel.close()
-        sock.close()
+        n = pair.conn.recv_into(view)
+    except BlockingIOError:
+        return True
+    except OSError:
+        return False
+    return bool(n) and _flush_to_channel(pair, view[:n])
+
+
+def _pump_channel(pair) -> bool:
+    """channel 可读：读一次并转发到 conn（paramiko 通道无 recv_into）；对端关闭或出错返回 False。"""
+    try:
+        data = pair.channel.recv(RELAY_BUF)
+    except socket.timeout:
+        return True
     except Exception:
+        return False
+    return bool(data) and _flush_to_conn(pair, data)
+
+
+def _relay_register(sel, pair) -> None:
+    """按积压情况更新关注的事件：某方向有积压时停读其来源，conn 有积压时关注可写。
+    paramiko 通道没有可写事件，写 channel 的积压由 accept_loop 短超时重试。"""
+    conn_events = (0 if pair.to_channel else selectors.EVENT_READ) | (selectors.EVENT_WRITE if pair.to_conn else 0)
+    channel_events = 0 if pair.to_conn else selectors.EVENT_READ
+    for obj, events in ((pair.conn, conn_events), (pair.channel, channel_events)):
+        registered = obj in sel.get_map()
+        if events and registered:
+            sel.modify(obj, events, pair)
+        elif events:
+            sel.register(obj, events, pair)
+        elif registered:
+            sel.unregister(obj)
+
+
+def _wake_accept_loop(wake_w) -> None:
+    """通知 accept_loop 退出并关闭唤醒写端。"""
+    try:
+        wake_w.send(b"\0")
+    except OSError:
         pass
+    try:
+        wake_w.close()
+    except OSError:
+        pass
+
+
+def _relay_close(sel, pair) -> None:
+    """从 selector 注销一对转发端并关闭两端（未写出的积压随之丢弃）。"""
+    for obj in (pair.conn, pair.channel):
+        try:
+            sel.unregister(obj)
+        except (KeyError, ValueError):
+            pass
+    for obj in (pair.channel, pair.conn):
+        try:
+            obj.close()
+        except Exception:
+            pass
 
 
 def _start_tunnel_paramiko(port: int, username: str, server: str, password: str) -> Tuple[bool, str]:
     """使用 paramiko 建立本地端口转发（-L，支持密码）：本地监听 port，转发到远程 127.0.0.1:port。"""
     import paramiko
-    global _paramiko_client, _paramiko_server_sock
+    global _paramiko_client, _paramiko_server_sock, _paramiko_wakeup
     logger.info(f"SSH 隧道启动(paramiko): {username}@{server} -> 127.0.0.1:{port}")
 
     client = paramiko.SSHClient()
     client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+    try:
+        ssh_sock = socket.create_connection((server, 22), timeout=10)
+    except OSError as e:
+        return False, f"SSH 连接失败: {e}"
+    try:
+        ssh_sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        ssh_sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, _SSH_SOCK_BUF)
+        ssh_sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, _SSH_SOCK_BUF)
+    except OSError:
+        pass
     try:
         client.connect(
             hostname=server,
@@ -160,55 +284,125 @@ def _start_tunnel_paramiko(port: int, username: str, server: str, password: str)
             timeout=10,
             allow_agent=False,
             look_for_keys=False,
+            sock=ssh_sock,
+            compress=bool(os.environ.get("CLAW_SSH_COMPRESS")),
         )
     except Exception as e:
+        ssh_sock.close()
         return False, f"SSH 连接失败: {e}"
 
     transport = client.get_transport()
     if not transport:
         client.close()
         return False, "SSH 连接无 transport"
+    transport.window_size = _SSH_WINDOW_SIZE
+    packetizer = getattr(transport, "packetizer", None)
+    if packetizer is not None:
+        packetizer.REKEY_BYTES = _SSH_REKEY_LIMIT
+        packetizer.REKEY_PACKETS = _SSH_REKEY_LIMIT
 
     server_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
     server_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
     try:
         server_sock.bind(("", port))
-        server_sock.listen(5)
+        server_sock.listen(128)
         server_sock.settimeout(1.0)
     except Exception as e:
         client.close()
         return False, f"本地端口 {port} 绑定失败: {e}"
 
+    pairs = set()
+    # 写 channel 有积压的连接：paramiko 通道无可写事件，需定时重试
+    stalled = set()
+
+    def accept_new(sel):
+        try:
+            conn, addr = server_sock.accept()
+        except socket.timeout:
+            return
+        _tune_relay_socket(conn)
+        try:
+            channel = transport.open_channel(
+                "direct-tcpip", ("127.0.0.1", port), addr,
+                window_size=_SSH_WINDOW_SIZE,
+            )
+        except Exception:
+            conn.close()
+            return
+        conn.setblocking(False)
+        channel.setblocking(0)
+        pair = _RelayPair(conn, channel)
+        pairs.add(pair)
+        _relay_register(sel, pair)
+
+    def settle(sel, pair, ok):
+        if not ok:
+            pairs.discard(pair)
+            stalled.discard(pair)
+            _relay_close(sel, pair)
+            return
+        if pair.to_channel:
+            stalled.add(pair)
+        else:
+            stalled.discard(pair)
+        _relay_register(sel, pair)
+
     def accept_loop():
+        # 单线程多路复用：监听 socket 与所有 (conn, channel) 对共用一个 selector；两端均非阻塞，
+        # 某个连接写不动时只积压该连接的数据并停读其来源，不阻塞其它连接与新连接
+        sel = selectors.DefaultSelector()
+        # 单线程依次处理事件，所有连接共用一块读缓冲
+        view = memoryview(bytearray(RELAY_BUF))
         try:
-            while True:
+            sel.register(server_sock, selectors.EVENT_READ)
+            # 无积压时无超时阻塞：空闲时不周期唤醒，停止时由 wake_r 可读唤醒
+            sel.register(wake_r, selectors.EVENT_READ)
+            while server_sock.fileno() != -1:
                 try:
-                    conn, addr = server_sock.accept()
-                except socket.timeout:
-                    continue
-                except Exception:
+                    events = sel.select(0.05 if stalled else None)
+                except (OSError, ValueError):
                     break
-                try:
-                    channel = transport.open_channel(
-                        "direct-tcpip", ("127.0.0.1", port), addr
-                    )
-                except Exception:
-                    conn.close()
-                    continue
-                t1 = threading.Thread(target=_relay_sock_to_channel, args=(conn, channel), daemon=True)
-                t2 = threading.Thread(target=_relay_channel_to_sock, args=(channel, conn), daemon=True)
-                t1.start()
-                t2.start()
+                for key, mask in events:
+                    if key.fileobj is wake_r:
+                        return
+                    if key.fileobj is server_sock:
+                        try:
+                            accept_new(sel)
+                        except Exception:
+                            return
+                        continue
+                    pair = key.data
+                    if pair not in pairs:
+                        continue
+                    if key.fileobj is pair.conn:
+                        ok = True
+                        if mask & selectors.EVENT_WRITE:
+                            ok = _flush_to_conn(pair)
+                        if ok and mask & selectors.EVENT_READ and not pair.to_channel:
+                            ok = _pump_conn(pair, view)
+                    else:
+                        ok = _pump_channel(pair)
+                    settle(sel, pair, ok)
+                for pair in list(stalled):
+                    settle(sel, pair, _flush_to_channel(pair))
         finally:
+            for pair in pairs:
+                _relay_close(sel, pair)
+            pairs.clear()
+            stalled.clear()
+            sel.close()
+            wake_r.close()
             try:
                 server_sock.close()
                 client.close()
             except Exception:
                 pass
 
+    wake_r, wake_w = socket.socketpair()
     t = threading.Thread(target=accept_loop, daemon=True)
     t.start()
     if not _wait_port_ready("127.0.0.1", port, timeout_sec=5.0):
+        _wake_accept_loop(wake_w)
         try:
             server_sock.close()
             client.close()
@@ -219,29 +413,31 @@ def _start_tunnel_paramiko(port: int, username: str, server: str, password: str)
     with _paramiko_lock:
         _paramiko_client = client
         _paramiko_server_sock = server_sock
+        _paramiko_wakeup = wake_w
     return True, ""
 
 
 def stop_ssh_tunnel() -> None:
     """停止当前 SSH 隧道：终止 subprocess 或关闭 paramiko 连接。程序退出时由 atexit 自动调用。"""
-    global _ssh_process, _paramiko_client, _paramiko_server_sock
+    global _ssh_process, _paramiko_client, _paramiko_server_sock, _paramiko_wakeup
 
     # 终止 subprocess 隧道
     with _ssh_process_lock:
         p = _ssh_process
         _ssh_process = None
-    if p is not None and getattr(p, "terminate", None):
-        try:
-            p.terminate()
-        except Exception:
-            pass
+    if p is not None:
+        _terminate_process(p)
 
-    # 关闭 paramiko 隧道（先关 server_sock 让 accept_loop 退出，再关 client）
+    # 关闭 paramiko 隧道（先唤醒 accept_loop 退出并关 server_sock，再关 client）
     with _paramiko_lock:
         sock = _paramiko_server_sock
         client = _paramiko_client
+        wakeup = _paramiko_wakeup
         _paramiko_server_sock = None
         _paramiko_client = None
+        _paramiko_wakeup = None
+    if wakeup is not None:
+        _wake_accept_loop(wakeup)
     if sock is not None:
         try:
             sock.close()
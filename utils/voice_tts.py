@@ -3,7 +3,10 @@
 轻量、无需本地大模型，音质自然；输出 MP3，Windows 下用 MCI 播放，其它平台用 playsound。
 """
 import asyncio
+import hashlib
 import os
+import queue
+import re
 import tempfile
 import threading
 import time
@@ -16,46 +19,74 @@ except ImportError:
     EDGE_TTS_AVAILABLE = False
     logger.warning("edge-tts 未安装，语音功能不可用。可执行: pip install edge-tts")
 
+# Windows MCI：模块加载时取一次 mciSendStringW 并声明参数类型，播放/停止时直接调用
+_MCI_SEND = None
+if os.name == "nt":
+    import ctypes
+    try:
+        _MCI_SEND = ctypes.windll.winmm.mciSendStringW
+        _MCI_SEND.argtypes = [ctypes.c_wchar_p, ctypes.c_wchar_p, ctypes.c_uint, ctypes.c_void_p]
+        _MCI_SEND.restype = ctypes.c_uint
+    except (AttributeError, OSError):
+        _MCI_SEND = None
+
+
+def _mci_remaining_sec(length_cmd, position_cmd, buf) -> float:
+    """MCI 当前剩余播放时长（秒）；查询失败返回 0。需已设置 time format milliseconds。"""
+    try:
+        if _MCI_SEND(length_cmd, buf, 64, None) != 0:
+            return 0.0
+        length = int(buf.value or 0)
+        if _MCI_SEND(position_cmd, buf, 64, None) != 0:
+            return 0.0
+        return max(length - int(buf.value or 0), 0) / 1000.0
+    except (ValueError, OSError):
+        return 0.0
+
 
 def _play_mp3_win(path: str) -> bool:
-    """仅 Windows：用 winmm.mciSendString 播放 mp3。play 不带 wait + 轮询，以便点关闭时同线程内 stop/close 可立即停声。"""
-    if os.name != "nt":
+    """仅 Windows：用 winmm.mciSendString 播放 mp3。play 不带 wait，按剩余时长等待停止事件，点关闭时可立即停声。"""
+    if _MCI_SEND is None:
         return False
-    global _CURRENT_MCI_ALIAS, _STOP_FLAG
+    global _CURRENT_MCI_ALIAS
     alias = None
     try:
-        import ctypes
-        winmm = ctypes.windll.winmm
         alias = "assistant_voice_" + str(time.time_ns() % 1000000)
         path_n = os.path.normpath(os.path.abspath(path))
         path_esc = path_n.replace("\\", "\\\\")
-        winmm.mciSendStringW("close " + alias, None, 0, None)
-        err = winmm.mciSendStringW(f'open "{path_esc}" type mpegvideo alias {alias}', None, 0, None)
+        _MCI_SEND("close " + alias, None, 0, None)
+        err = _MCI_SEND(f'open "{path_esc}" type mpegvideo alias {alias}', None, 0, None)
         if err != 0:
             return False
         with _MCI_ALIAS_LOCK:
             _CURRENT_MCI_ALIAS = alias
-        err = winmm.mciSendStringW("play " + alias, None, 0, None)
+        _MCI_SEND("set " + alias + " time format milliseconds", None, 0, None)
+        err = _MCI_SEND("play " + alias, None, 0, None)
         if err != 0:
             return False
+        # 轮询用的命令预先建成 unicode 缓冲区，循环内不再拼接字符串与转码
+        mode_cmd = ctypes.create_unicode_buffer("status " + alias + " mode")
+        length_cmd = ctypes.create_unicode_buffer("status " + alias + " length")
+        position_cmd = ctypes.create_unicode_buffer("status " + alias + " position")
         buf = ctypes.create_unicode_buffer(64)
         while True:
             if _STOP_FLAG.is_set():
                 try:
-                    winmm.mciSendStringW("stop " + alias, None, 0, None)
-                    winmm.mciSendStringW("close " + alias, None, 0, None)
+                    _MCI_SEND("stop " + alias, None, 0, None)
+                    _MCI_SEND("close " + alias, None, 0, None)
                 except Exception:
                     pass
                 return True
             try:
-                winmm.mciSendStringW("status " + alias + " mode", buf, 64, None)
+                _MCI_SEND(mode_cmd, buf, 64, None)
                 if (buf.value or "").strip().lower() in ("stopped", "not ready", ""):
                     break
             except Exception:
                 break
-            time.sleep(0.08)
+            # 睡到预计播完为止，stop_speech 置位停止标志时立即唤醒；到点后短间隔确认状态
+            _STOP_FLAG.wait(max(_mci_remaining_sec(length_cmd, position_cmd, buf), 0.02))
         try:
-            winmm.mciSendStringW("close " + alias, None, 0, None)
+            _MCI_SEND("close " + alias, None, 0, None)
         except Exception:
             pass
         return True
@@ -65,10 +96,9 @@ def _play_mp3_win(path: str) -> bool:
         with _MCI_ALIAS_LOCK:
             if _CURRENT_MCI_ALIAS == alias:
                 _CURRENT_MCI_ALIAS = None
-        if alias and os.name == "nt":
+        if alias:
             try:
-                import ctypes as _ct
-                _ct.windll.winmm.mciSendStringW("close " + alias, None, 0, None)
+                _MCI_SEND("close " + alias, None, 0, None)
             except Exception:
                 pass
 
@@ -80,20 +110,59 @@ except ImportError:
     logger.warning("playsound 未安装，语音播放不可用。可执行: pip install playsound")
 
 
-def _get_mp3_duration_seconds(path: str) -> float:
-    """获取 mp3 时长（秒），失败时按默认估计返回。"""
+try:
+    from mutagen.mp3 import MP3
+except ImportError:
+    MP3 = None
+
+# MPEG Audio Layer III 比特率表（kbps，按 bitrate_index 取值）：MPEG-1 / MPEG-2 与 2.5
+_MP3_BITRATES_V1 = (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320)
+_MP3_BITRATES_V2 = (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160)
+
+
+def _fast_mp3_duration(path: str):
+    """按首帧头部的比特率估算 CBR mp3 时长（edge-tts 输出固定码率）；非 Layer III、VBR 或头部异常时返回 None。"""
     try:
-        from mutagen.mp3 import MP3
-        return MP3(path).info.length
-    except Exception:
-        pass
+        with open(path, "rb") as f:
+            head = f.read(10)
+            start = 0
+            if head[:3] == b"ID3" and len(head) == 10:
+                start = 10 + ((head[6] << 21) | (head[7] << 14) | (head[8] << 7) | head[9])
+            f.seek(start)
+            frame = f.read(64)
+        size = os.path.getsize(path)
+    except OSError:
+        return None
+    if len(frame) < 4 or frame[0] != 0xFF or (frame[1] & 0xE0) != 0xE0:
+        return None
+    version = (frame[1] >> 3) & 0x3
+    layer = (frame[1] >> 1) & 0x3
+    index = frame[2] >> 4
+    if version == 1 or layer != 1 or index in (0, 15):
+        return None
+    if b"Xing" in frame or b"VBRI" in frame:
+        return None
+    kbps = (_MP3_BITRATES_V1 if version == 3 else _MP3_BITRATES_V2)[index]
+    return (size - start) * 8 / (kbps * 1000.0)
+
+
+def _get_mp3_duration_seconds(path: str) -> float:
+    """获取 mp3 时长（秒），优先读帧头估算，否则用 mutagen；失败时按默认估计返回。"""
+    duration = _fast_mp3_duration(path)
+    if duration is not None:
+        return duration
+    if MP3 is not None:
+        try:
+            return MP3(path).info.length
+        except Exception:
+            pass
     return 15.0
 
 
 DEFAULT_VOICE = "zh-CN-XiaoxiaoNeural"
 
 # 备选音色：(voice_id, 菜单显示名)，Microsoft 神经语音，见 https://speech.microsoft.com/portal/voicegallery
-VOICE_OPTIONS = [
+VOICE_OPTIONS = (
     # 中文（普通话）
     ("zh-CN-XiaoxiaoNeural", "晓晓（女）"),
     ("zh-CN-XiaoyiNeural", "晓伊（女）"),
@@ -133,139 +202,252 @@ VOICE_OPTIONS = [
     # 西班牙语
     ("es-ES-ElviraNeural", "Elvira（西，女）"),
     ("es-ES-AlvaroNeural", "Alvaro（西，男）"),
-]
+)
+VOICE_ID_SET = frozenset(v for v, _ in VOICE_OPTIONS)
+VOICE_LABEL_BY_ID = dict(VOICE_OPTIONS)
+
+# 长文本先合成首句并开播，其余部分在播放首句期间合成；剩余不足此长度时不拆分
+_SENTENCE_END_RE = re.compile(r"[。！？!?；;\n]|\.(?=\s)")
+_SPLIT_MIN_REST = 40
+# 无声卡/设备未就绪等 MCI 报错特征，命中时按“无声音”处理
+_MCI_BENIGN_RE = re.compile(r"277|263|MCI|初始化|未打开|设备")
+
+
+def _split_head(text: str):
+    """拆出首句：返回 (head, rest)；无需拆分时 rest 为空。"""
+    m = _SENTENCE_END_RE.search(text)
+    if not m:
+        return text, ""
+    head, rest = text[:m.end()].strip(), text[m.end():].strip()
+    if not head or len(rest) < _SPLIT_MIN_REST:
+        return text, ""
+    return head, rest
+
+
+# 合成结果磁盘缓存：按 (voice, text) 哈希命名，超出上限时按最近使用时间淘汰
+# 放在应用目录（与 logs/、config/ 同级）而非共享的系统临时目录：后者路径可预测，其他用户可抢先创建以阻断或替换音频
+_VOICE_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cache", "voice")
+_VOICE_CACHE_MAX = 200
+
+
+def _voice_cache_path(text: str, voice: str) -> str:
+    key = hashlib.blake2b(f"{voice}\0{text}".encode("utf-8"), digest_size=16).hexdigest()
+    return os.path.join(_VOICE_CACHE_DIR, key + ".mp3")
+
+
+def _trim_voice_cache() -> None:
+    """缓存文件数超过上限时删除最久未用的（以 mtime 记录使用时间，atime 在多数系统上不可靠）。"""
+    try:
+        entries = [e for e in os.scandir(_VOICE_CACHE_DIR) if e.name.endswith(".mp3")]
+    except OSError:
+        return
+    excess = len(entries) - _VOICE_CACHE_MAX
+    if excess <= 0:
+        return
+
+    def _mtime(entry):
+        try:
+            return entry.stat().st_mtime
+        except OSError:
+            return 0.0
+
+    entries.sort(key=_mtime)
+    for entry in entries[:excess]:
+        try:
+            os.remove(entry.path)
+        except OSError:
+            pass
+
+
+async def _synthesize_cached(text: str, voice: str) -> str:
+    """返回 text 的 mp3 路径：命中缓存直接复用，否则合成到临时文件后移入缓存。"""
+    cache_path = _voice_cache_path(text, voice)
+    try:
+        os.utime(cache_path)
+        return cache_path
+    except OSError:
+        pass
+    os.makedirs(_VOICE_CACHE_DIR, mode=0o700, exist_ok=True)
+    tmp = tempfile.NamedTemporaryFile(prefix="claw_voice_", suffix=".part", dir=_VOICE_CACHE_DIR, delete=False)
+    tmp_path = tmp.name
+    try:
+        tmp.close()
+        await _synthesize(text, voice, tmp_path)
+        os.replace(tmp_path, cache_path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    _trim_voice_cache()
+    return cache_path
+
+
+async def _synthesize(text: str, voice: str, out_path: str) -> None:
+    """edge-tts 合成到 out_path：边合成边写盘，不在内存中攒整段 mp3。"""
+    communicate = edge_tts.Communicate(text=text, voice=voice)
+    with open(out_path, "wb") as f:
+        async for chunk in communicate.stream():
+            if chunk["type"] == "audio":
+                f.write(chunk["data"])
 
-# 防止并发播放冲突
-_PLAY_LOCK = threading.Lock()
+
+def _play_file(path: str) -> None:
+    """阻塞播放 mp3：Windows 优先 MCI，否则 playsound；已请求停止时直接返回。"""
+    if _STOP_FLAG.is_set():
+        return
+    played = False
+    if os.name == "nt":
+        played = _play_mp3_win(path)
+    if not played and PLAYSOUND_AVAILABLE and not _STOP_FLAG.is_set():
+        play_path = path.replace("\\", "/") if os.name == "nt" else path
+        playsound(play_path, block=True)
+
+
+# 单槽待播队列 + 常驻播放线程：同一时刻只播一条，播放期间新请求覆盖未开播的旧请求
+_SPEAK_Q = queue.Queue(maxsize=1)
+_SPEAK_WORKER = None
+_SPEAK_WORKER_LOCK = threading.Lock()
 _STOP_FLAG = threading.Event()
-_CURRENT_VOICE_THREAD = None
 _CURRENT_MCI_ALIAS = None
 _MCI_ALIAS_LOCK = threading.Lock()
 
 
+_TTS_LOOP = None
+_TTS_LOOP_LOCK = threading.Lock()
+
+
+def _get_tts_loop():
+    """常驻后台事件循环：首次使用时创建，之后各次合成复用，避免每次 asyncio.run 新建循环与线程池。"""
+    global _TTS_LOOP
+    with _TTS_LOOP_LOCK:
+        if _TTS_LOOP is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="claw-tts-loop", daemon=True).start()
+            _TTS_LOOP = loop
+        return _TTS_LOOP
+
+
 def _run_async_speak(text: str, voice: str = DEFAULT_VOICE, on_duration_ready=None, on_playback_finished=None) -> None:
-    """在独立事件循环中执行 edge-tts 合成 + 播放（供子线程调用）。"""
+    """在常驻事件循环中执行 edge-tts 合成，当前线程阻塞等待并播放（由播放线程逐条调用）。"""
     if not text or not text.strip():
         return
     if not EDGE_TTS_AVAILABLE:
         return
-    if not _PLAY_LOCK.acquire(blocking=False):
-        logger.debug("语音正在播放中，跳过本次 speak")
-        return
     _STOP_FLAG.clear()
-    out_path = None
 
-    async def _do():
-        nonlocal out_path
+    async def _synthesize_all():
+        """返回 (待播放路径, 该段时长)；已停止时路径为 None。长文本的首句在返回前已播完，时长只计剩余部分。"""
+        head, rest = _split_head(text.strip())
+        head_path = await _synthesize_cached(head, voice)
+        if _STOP_FLAG.is_set():
+            return None, 0.0
+        if not rest:
+            return head_path, _get_mp3_duration_seconds(head_path)
+        # 首句在线程池中开播，同时合成剩余部分
+        head_play = asyncio.get_running_loop().run_in_executor(None, _play_file, head_path)
         try:
-            tmp = tempfile.NamedTemporaryFile(prefix="claw_voice_", suffix=".mp3", delete=False)
-            out_path = tmp.name
-            try:
-                tmp.close()
-            except Exception:
-                pass
-            communicate = edge_tts.Communicate(text=text.strip(), voice=voice)
-            await communicate.save(out_path)
-            duration_sec = _get_mp3_duration_seconds(out_path)
+            rest_path = await _synthesize_cached(rest, voice)
+        finally:
+            await head_play
+        return rest_path, _get_mp3_duration_seconds(rest_path)
+
+    try:
+        play_path, duration_sec = asyncio.run_coroutine_threadsafe(_synthesize_all(), _get_tts_loop()).result()
+        if play_path:
             if callable(on_duration_ready):
                 try:
                     on_duration_ready(duration_sec)
                 except Exception:
                     pass
-            if _STOP_FLAG.is_set():
-                return
-            played = False
-            if os.name == "nt" and not _STOP_FLAG.is_set():
-                played = _play_mp3_win(out_path)
-            if not played and PLAYSOUND_AVAILABLE and not _STOP_FLAG.is_set():
-                play_path = out_path.replace("\\", "/") if os.name == "nt" else out_path
-                playsound(play_path, block=True)
-        except Exception as e:
-            err_text = str(e).strip()
-            if not err_text or "277" in err_text or "263" in err_text or "MCI" in err_text or "初始化" in err_text or "未打开" in err_text or "设备" in err_text:
-                logger.info("未检测到声音或声音已关闭，跳过播放")
-            else:
-                logger.debug(f"语音播放跳过: {e}")
-        finally:
-            if out_path:
-                try:
-                    if os.path.exists(out_path):
-                        os.remove(out_path)
-                except OSError:
-                    pass
-            if callable(on_playback_finished):
-                try:
-                    on_playback_finished()
-                except Exception:
-                    pass
-            try:
-                _PLAY_LOCK.release()
-            except Exception:
-                pass
-
-    try:
-        asyncio.run(_do())
+            _play_file(play_path)
     except Exception as e:
         err_text = str(e).strip()
-        if "277" in err_text or "263" in err_text or "MCI" in err_text or "初始化" in err_text or "未打开" in err_text or "设备" in err_text:
+        if not err_text or _MCI_BENIGN_RE.search(err_text):
             logger.info("未检测到声音或声音已关闭，跳过播放")
         else:
-            logger.debug(f"语音模块执行跳过: {e}")
+            logger.debug(f"语音播放跳过: {e}")
+    finally:
         if callable(on_playback_finished):
             try:
                 on_playback_finished()
             except Exception:
                 pass
+
+
+def _speak_worker() -> None:
+    """常驻播放线程：依次取出待播请求并同步合成、播放。"""
+    while True:
+        args = _SPEAK_Q.get()
         try:
-            _PLAY_LOCK.release()
-        except Exception:
-            pass
+            _run_async_speak(*args)
+        except Exception as e:
+            logger.debug(f"语音模块执行跳过: {e}")
+
+
+def _ensure_speak_worker():
+    global _SPEAK_WORKER
+    with _SPEAK_WORKER_LOCK:
+        if _SPEAK_WORKER is None:
+            _SPEAK_WORKER = threading.Thread(target=_speak_worker, name="claw-tts-speak", daemon=True)
+            _SPEAK_WORKER.start()
+        return _SPEAK_WORKER
 
 
 def speak(text: str, voice: str = DEFAULT_VOICE, on_duration_ready=None, on_playback_finished=None) -> None:
     """
     异步播放文字语音（不阻塞调用线程）。
-    在后台线程中执行 edge-tts 合成；Windows 优先用 MCI 播放 mp3，否则用 playsound。
-    on_duration_ready(duration_seconds): 合成完成、播放前回调。
+    在常驻播放线程中执行 edge-tts 合成；Windows 优先用 MCI 播放 mp3，否则用 playsound。
+    正在播放时新请求进入单槽队列，未开播的旧请求被最新一条替换（被替换的请求不再回调）。
+    长文本先合成首句并开播，其余部分在播放首句期间合成。
+    on_duration_ready(duration_seconds): 最后一段开播前回调，参数为从此刻起的剩余播放时长（拆分时不含已播完的首句）。
     on_playback_finished(): 播放结束后回调，用于在播毕后再关闭气泡。
     """
     if not EDGE_TTS_AVAILABLE:
         return
     if not PLAYSOUND_AVAILABLE and os.name != "nt":
         return
-    global _CURRENT_VOICE_THREAD
-    t = threading.Thread(
-        target=_run_async_speak,
-        args=(text, voice),
-        kwargs={"on_duration_ready": on_duration_ready, "on_playback_finished": on_playback_finished},
-        daemon=True,
-    )
-    _CURRENT_VOICE_THREAD = t
-    t.start()
+    if voice not in VOICE_ID_SET:
+        voice = DEFAULT_VOICE
+    item = (text, voice, on_duration_ready, on_playback_finished)
+    _ensure_speak_worker()
+    with _SPEAK_WORKER_LOCK:
+        try:
+            _SPEAK_Q.put_nowait(item)
+        except queue.Full:
+            try:
+                _SPEAK_Q.get_nowait()
+            except queue.Empty:
+                pass
+            _SPEAK_Q.put_nowait(item)
 
 
 def stop_speech():
-    """停止当前语音播放：设置停止标志并关闭当前 MCI 别名。"""
-    global _STOP_FLAG
+    """停止当前语音播放：丢弃尚未开播的请求，设置停止标志并关闭当前 MCI 别名。"""
+    global _CURRENT_MCI_ALIAS
+    with _SPEAK_WORKER_LOCK:
+        try:
+            _SPEAK_Q.get_nowait()
+        except queue.Empty:
+            pass
     _STOP_FLAG.set()
-    if os.name == "nt":
+    if _MCI_SEND is not None:
         try:
             with _MCI_ALIAS_LOCK:
                 alias = _CURRENT_MCI_ALIAS
                 if alias:
                     _CURRENT_MCI_ALIAS = None
             if alias:
-                import ctypes
-                winmm = ctypes.windll.winmm
-                winmm.mciSendStringW("stop " + alias + " wait", None, 0, None)
-                winmm.mciSendStringW("close " + alias + " wait", None, 0, None)
+                _MCI_SEND("stop " + alias + " wait", None, 0, None)
+                _MCI_SEND("close " + alias + " wait", None, 0, None)
         except Exception:
             pass
 
 
 def get_current_voice_process():
-    """获取当前语音播放线程（用于停止）。"""
-    return _CURRENT_VOICE_THREAD
+    """获取语音播放线程（用于停止）。"""
+    return _SPEAK_WORKER
 
 
 def is_available() -> bool: